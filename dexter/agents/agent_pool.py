@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from smolagents import MultiStepAgent
+
+from dexter.agents.agents import AGENT_FACTORIES
+from dexter.agents.run_context import current_run
+from dexter.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_POLL_SECONDS = 0.5
+
+
+class AgentPool:
+    """
+    Pool of interchangeable agent instances of one type, built by a factory.
+
+    A smolagents agent keeps per-run state (memory, step counter, python executor
+    variables), so one instance must never serve two runs at once. Each run leases an
+    instance for its duration. Instances are created on demand up to `size` and reset
+    when they are returned. An instance whose reset fails is dropped and replaced later.
+    """
+
+    def __init__(self, agent_type: str, factory: Callable[[], MultiStepAgent], size: int):
+        self.agent_type = agent_type
+        self.factory = factory
+        self.size = size
+        self._idle: list[MultiStepAgent] = []
+        self._executor_state: Dict[int, dict] = {}
+        self._created = 0
+        self._leased = 0
+        self._waits = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float | None = None) -> MultiStepAgent:
+        """
+        Lease an idle instance, creating one if the pool is below its size, otherwise wait.
+        Raises TimeoutError after `timeout` seconds, and stops waiting if the current run is cancelled.
+        """
+        timeout = timeout if timeout is not None else settings.AGENT_POOL_ACQUIRE_TIMEOUT
+        deadline = time.monotonic() + timeout
+        run = current_run()
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No {self.agent_type} agent instance became available within {timeout:.0f} seconds")
+                self._waits += 1
+                self._cond.wait(min(remaining, ACQUIRE_POLL_SECONDS))
+                if run is not None:
+                    run.token.raise_if_cancelled()
+            if self._idle:
+                self._leased += 1
+                return self._idle.pop()
+            self._created += 1
+            self._leased += 1
+
+        try:
+            agent = self.factory()
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._leased -= 1
+                self._cond.notify()
+            raise
+        # Setup code run by the factory (e.g. imports) is restored on every reset
+        self._executor_state[id(agent)] = dict(getattr(getattr(agent, "python_executor", None), "state", {}))
+        logger.info(f"Created {self.agent_type} agent instance {self._created}/{self.size}")
+        return agent
+
+    def release(self, agent: MultiStepAgent) -> None:
+        """Reset an instance and return it to the pool."""
+        try:
+            self._reset(agent)
+        except Exception as e:
+            logger.warning(f"Dropping {self.agent_type} agent instance that failed to reset: {e}")
+            self._executor_state.pop(id(agent), None)
+            with self._cond:
+                self._created -= 1
+                self._leased -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append(agent)
+            self._leased -= 1
+            self._cond.notify()
+
+    def _reset(self, agent: MultiStepAgent) -> None:
+        agent.memory.reset()
+        agent.monitor.reset()
+        agent.state = {}
+        agent.interrupt_switch = False
+        executor = getattr(agent, "python_executor", None)
+        if executor is not None:
+            executor.state = dict(self._executor_state.get(id(agent), {"__name__": "__main__"}))
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[MultiStepAgent]:
+        agent = self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def run(self, task: str, additional_args: Dict[str, Any] | None = None) -> Any:
+        """Run `task` on a leased instance; same shape as the agent's own `run(task, additional_args)`."""
+        with self.lease() as agent:
+            return agent.run(task, additional_args=additional_args)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"size": self.size, "created": self._created, "idle": len(self._idle), "leased": self._leased, "waits": self._waits}
+
+
+_pools: Dict[str, AgentPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_agent_pool(agent_type: str) -> AgentPool:
+    """Return the pool for an agent type from AGENT_FACTORIES, creating it on first use."""
+    with _pools_lock:
+        if agent_type not in _pools:
+            size = settings.AGENT_POOL_SIZES.get(agent_type, settings.AGENT_POOL_SIZE)
+            _pools[agent_type] = AgentPool(agent_type, AGENT_FACTORIES[agent_type], size)
+        return _pools[agent_type]
+
+
+def agent_pool_stats() -> Dict[str, Any]:
+    with _pools_lock:
+        pools = dict(_pools)
+    return {agent_type: pool.stats() for agent_type, pool in sorted(pools.items())}
@@ -1,56 +1,97 @@
-from smolagents import CodeAgent, LiteLLMModel
-from dexter.agents.agents_utils import save_screenshot
+from smolagents import CodeAgent
+from dexter.agents.agents_utils import MemoryCompactor, save_screenshot, check_cancelled, note_cached_tool_calls, record_step
 from dexter.agents.tools import *
 from dexter.config.settings import settings
+from dexter.core.rate_limiter import RateLimitedLiteLLMModel
 
 api_key = settings.GEMINI_API_KEY
-model = LiteLLMModel(model_id="gemini/gemini-2.0-flash", api_key=api_key)
-    
-test_agent = CodeAgent(
-    tools=[], 
-    model=model, 
-    add_base_tools=True, 
-    max_steps=40,
-    verbosity_level=0,
-    managed_agents=[])
-test_agent.name = "test_agent"
-test_agent.description = "A mock agent for testing purposes."
-
-youtube_agent = CodeAgent(
-    tools=[search_youtube_videos, get_video_transcript, watch_youtube_video], 
-    model=model, 
-    add_base_tools=True, 
-    additional_authorized_imports=[],
-    step_callbacks=[],
-    max_steps=40,
-    verbosity_level=2,
-    managed_agents=[])
-youtube_agent.name = "youtube_agent"
-youtube_agent.description = "An agent for interacting with YouTube videos, including searching, watching, and extracting transcripts."
-
-auchan_agent = CodeAgent(
-    tools=[search_products, go_back, close_popups, extract_text_from_pdf], 
-    model=model, 
-    add_base_tools=True, 
-    additional_authorized_imports=["helium", "pypdf"],
-    step_callbacks=[save_screenshot],
-    max_steps=40,
-    verbosity_level=2,
-    managed_agents=[])
-auchan_agent.name = "auchan_agent"
-auchan_agent.description = "An agent for interacting with Auchan's website for grocery shopping."
-
-report_agent = CodeAgent(
-    tools=[download_image], 
-    model=model, 
-    add_base_tools=True, 
-    additional_authorized_imports=["plotly.*", "reportlab.*", "matplotlib.*",
-        "json",
-        "pandas",
-        "numpy"],
-    step_callbacks=[],
-    max_steps=40,
-    verbosity_level=2,
-    managed_agents=[])
-report_agent.name = "report_agent"
-report_agent.description = "An agent for generating reports and documents from web search data."
\ No newline at end of file
+model = RateLimitedLiteLLMModel(model_id="gemini/gemini-2.0-flash", api_key=api_key)
+
+# Each factory builds a fresh agent. Runs lease instances from dexter.agents.agent_pool,
+# because an agent's memory, step state and python executor must not be shared by
+# concurrent runs.
+
+def share_web_tools(agent: CodeAgent) -> CodeAgent:
+    """Replace the agent's own base web tools with the shared cached ones from tools.py."""
+    agent.tools["web_search"] = web_search
+    agent.tools["visit_webpage"] = visit_webpage
+    return agent
+
+def create_test_agent() -> CodeAgent:
+    agent = CodeAgent(
+        tools=[],
+        model=model,
+        add_base_tools=True,
+        step_callbacks=[check_cancelled, note_cached_tool_calls, MemoryCompactor(), record_step],
+        max_steps=40,
+        verbosity_level=0,
+        managed_agents=[])
+    agent.name = "test_agent"
+    agent.description = "A mock agent for testing purposes."
+    share_web_tools(agent)
+    return agent
+
+def create_youtube_agent() -> CodeAgent:
+    agent = CodeAgent(
+        tools=[search_youtube_videos, get_video_transcript, watch_youtube_video],
+        model=model,
+        add_base_tools=True,
+        additional_authorized_imports=[],
+        # Transcripts are long: keep more of them, but only in the last steps
+        step_callbacks=[check_cancelled, note_cached_tool_calls, MemoryCompactor(max_tokens=20000, old_text_chars=600), record_step],
+        max_steps=40,
+        verbosity_level=2,
+        managed_agents=[])
+    agent.name = "youtube_agent"
+    agent.description = "An agent for interacting with YouTube videos, including searching, watching, and extracting transcripts."
+    share_web_tools(agent)
+    return agent
+
+def create_auchan_agent() -> CodeAgent:
+    agent = CodeAgent(
+        tools=[search_products, go_back, close_popups, extract_text_from_pdf],
+        model=model,
+        add_base_tools=True,
+        additional_authorized_imports=["helium", "pypdf"],
+        # The current and previous screenshots are enough to follow the page
+        step_callbacks=[check_cancelled, note_cached_tool_calls, save_screenshot, MemoryCompactor(max_tokens=12000, keep_images=2), record_step],
+        max_steps=40,
+        verbosity_level=2,
+        managed_agents=[])
+    agent.name = "auchan_agent"
+    agent.description = "An agent for interacting with Auchan's website for grocery shopping."
+    share_web_tools(agent)
+    agent.python_executor("from helium import *")
+    agent.python_executor("from pypdf import *")
+    return agent
+
+def create_report_agent() -> CodeAgent:
+    agent = CodeAgent(
+        tools=[download_image, download_images],
+        model=model,
+        add_base_tools=True,
+        additional_authorized_imports=["plotly.*", "reportlab.*", "matplotlib.*",
+            "json",
+            "pandas",
+            "numpy"],
+        step_callbacks=[check_cancelled, note_cached_tool_calls, MemoryCompactor(), record_step],
+        max_steps=40,
+        verbosity_level=2,
+        managed_agents=[])
+    agent.name = "report_agent"
+    agent.description = "An agent for generating reports and documents from web search data."
+    share_web_tools(agent)
+    return agent
+
+AGENT_FACTORIES = {
+    "test": create_test_agent,
+    "youtube": create_youtube_agent,
+    "auchan": create_auchan_agent,
+    "report": create_report_agent,
+}
+
+# Reference instances describing each agent (name, description) for prompts; they are never run
+test_agent = create_test_agent()
+youtube_agent = create_youtube_agent()
+auchan_agent = create_auchan_agent()
+report_agent = create_report_agent()
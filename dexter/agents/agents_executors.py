@@ -1,21 +1,39 @@
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import Future
 from typing import Any, Dict
 import logging
 from datetime import datetime
-from selenium import webdriver
 
-from dexter.agents.agents import test_agent as _test_agent_obj, youtube_agent as _youtube_agent_obj, auchan_agent as _auchan_agent_obj, report_agent as _report_agent_obj
 from dexter.core.prompts import YOUTUBE_AGENT_INSTRUCTIONS, HELIUM_AGENT_INSTRUCTIONS, REPORT_AGENT_INSTRUCTIONS
+from dexter.agents.scheduler import AgentScheduler
+from dexter.agents.agent_pool import get_agent_pool
+from dexter.agents.process_pool import ProcessAgentRunner
+from dexter.agents.browser_pool import browser_pool
+from dexter.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-executor = ThreadPoolExecutor(max_workers=4)
+executor = AgentScheduler()
 
 current_date = datetime.now().strftime("%Y-%m-%d")
 
+def _agent_run(agent_type: str):
+    """
+    Return the callable to schedule for an agent run: `run` of the agent type's instance pool,
+    or a process-pool runner for agents listed in PROCESS_POOL_AGENTS. The auchan agent is
+    scheduled with _run_with_browser instead and always stays in-process.
+    """
+    if agent_type in settings.PROCESS_POOL_AGENTS:
+        return ProcessAgentRunner(agent_type).run
+    return get_agent_pool(agent_type).run
+
+def _run_with_browser(agent_type: str, task: str, additional_args: Dict[str, Any] | None = None) -> Any:
+    """Run a browser agent in-process with a browser leased from the pool for the run's duration."""
+    with browser_pool.lease():
+        return get_agent_pool(agent_type).run(task, additional_args)
+
 def test_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     """
-    Execute test_agent in a separate thread and return a Future.
+    Schedule test_agent on the agent scheduler and return a Future.
     
     Args:
         task: String description of the task
@@ -28,17 +46,19 @@ def test_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     if additional_args:
         logger.info(f"Additional arguments provided: {additional_args}")
     
+    run = _agent_run("test")
+    
     if additional_args is None:
-        future = executor.submit(_test_agent_obj.run, task)
+        future = executor.submit(run, task, agent_type="test")
     else:
-        future = executor.submit(_test_agent_obj.run, task, additional_args)
+        future = executor.submit(run, task, additional_args, agent_type="test")
     
     logger.info(f"Agent launched successfully, Future ID: {id(future)}")
     return future
 
 def youtube_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     """
-    Execute youtube_agent in a separate thread and return a Future.
+    Schedule youtube_agent on the agent scheduler and return a Future.
     Pre-pends YouTube-specific instructions to the task.
     
     Args:
@@ -54,17 +74,19 @@ def youtube_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     
     full_task = YOUTUBE_AGENT_INSTRUCTIONS.format(current_date=current_date) + "\n\n" + task
     
+    run = _agent_run("youtube")
+    
     if additional_args is None:
-        future = executor.submit(_youtube_agent_obj.run, full_task)
+        future = executor.submit(run, full_task, agent_type="youtube")
     else:
-        future = executor.submit(_youtube_agent_obj.run, full_task, additional_args)
+        future = executor.submit(run, full_task, additional_args, agent_type="youtube")
     
     logger.info(f"Agent launched successfully, Future ID: {id(future)}")
     return future
 
 def auchan_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     """
-    Execute auchan_agent in a separate thread and return a Future.
+    Schedule auchan_agent on the agent scheduler and return a Future.
     Pre-pends helium-specific instructions to the task.
     
     Args:
@@ -78,24 +100,12 @@ def auchan_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     if additional_args:
         logger.info(f"Additional arguments provided: {additional_args}")
     
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--force-device-scale-factor=1")
-    chrome_options.add_argument("--window-size=1000,1350")
-    chrome_options.add_argument("--disable-pdf-viewer")
-    chrome_options.add_argument("--window-position=0,0")
-
-    import helium
-    driver = helium.start_chrome(headless=False, options=chrome_options)
-    
-    _auchan_agent_obj.python_executor("from helium import *")
-    _auchan_agent_obj.python_executor("from pypdf import *")
-    
     full_task = HELIUM_AGENT_INSTRUCTIONS + "\n\n" + task
     
     if additional_args is None:
-        future = executor.submit(_auchan_agent_obj.run, full_task)
+        future = executor.submit(_run_with_browser, "auchan", full_task, agent_type="auchan")
     else:
-        future = executor.submit(_auchan_agent_obj.run, full_task, additional_args)
+        future = executor.submit(_run_with_browser, "auchan", full_task, additional_args, agent_type="auchan")
     
     logger.info(f"Agent launched successfully, Future ID: {id(future)}")
     return future
@@ -103,7 +113,7 @@ def auchan_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
 
 def report_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
     """
-    Execute report_agent in a separate thread and return a Future.
+    Schedule report_agent on the agent scheduler and return a Future.
     Pre-pends import instructions to the task.
     
     Args:
@@ -119,11 +129,12 @@ def report_agent(task: str, additional_args: Dict[str, Any] = None) -> Future:
         logger.info(f"Additional arguments provided: {additional_args}")
     
     full_task = REPORT_AGENT_INSTRUCTIONS + "\n\n" + task
+    run = _agent_run("report")
     
     if additional_args is None:
-        future = executor.submit(_report_agent_obj.run, full_task)
+        future = executor.submit(run, full_task, agent_type="report")
     else:
-        future = executor.submit(_report_agent_obj.run, full_task, additional_args)
+        future = executor.submit(run, full_task, additional_args, agent_type="report")
     
     logger.info(f"Agent launched successfully, Future ID: {id(future)}")
     return future
@@ -1,27 +1,98 @@
-from helium import *
+import base64
+import logging
 from smolagents import ActionStep
 from PIL import Image
 from io import BytesIO
-from time import sleep
+from time import monotonic, sleep
+from dexter.agents.run_context import current_run
+from dexter.agents.browser_pool import current_driver
+from dexter.config.settings import settings
+from dexter.service.agent_run_store import get_run_store
+from dexter.utils.tool_output import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PAGE_IDLE_POLL_SECONDS = 0.05
+
+def check_cancelled(memory_step: ActionStep, agent) -> None:
+    """Stop the run at the end of the current step if it has been cancelled."""
+    run = current_run()
+    if run is not None:
+        run.token.raise_if_cancelled()
+
+def note_cached_tool_calls(memory_step: ActionStep, agent) -> None:
+    """Tell the agent, in the step's observations, which of its tool calls returned a memoized result."""
+    run = current_run()
+    if run is None or not run.notes:
+        return
+    notes, run.notes = "\n".join(run.notes), []
+    memory_step.observations = notes if memory_step.observations is None else f"{memory_step.observations}\n{notes}"
+
+# Counts DOM mutations and loaded resources so page idleness can be checked in one round trip
+IDLE_PROBE_JS = """
+if (!window.__dexterIdle) {
+    window.__dexterIdle = {mutations: 0};
+    new MutationObserver(() => window.__dexterIdle.mutations++).observe(
+        document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return [document.readyState, performance.getEntriesByType("resource").length, window.__dexterIdle.mutations];
+"""
+
+# Aria labels of all visible clickable buttons, collected in the page instead of one WebDriver call per button
+CLICKABLE_LABELS_JS = """
+return Array.from(document.querySelectorAll('button, input[type="button"], input[type="submit"], [role="button"]'))
+    .filter(el => el.getClientRects().length > 0)
+    .map(el => el.getAttribute("aria-label"))
+    .filter(label => label);
+"""
+
+def wait_for_page_idle(driver, timeout: float | None = None, quiet: float | None = None) -> bool:
+    """
+    Wait until the page has loaded and neither its DOM nor its network requests have changed
+    for `quiet` seconds. Returns False if that did not happen within `timeout` seconds.
+    """
+    timeout = timeout if timeout is not None else settings.PAGE_IDLE_TIMEOUT
+    quiet = quiet if quiet is not None else settings.PAGE_IDLE_QUIET_SECONDS
+    deadline = monotonic() + timeout
+    last_state, stable_since = None, monotonic()
+    while monotonic() < deadline:
+        try:
+            state = driver.execute_script(IDLE_PROBE_JS)
+        except Exception as e:
+            logger.debug(f"Page idle probe failed: {e}")
+            return False
+        now = monotonic()
+        if state != last_state:
+            last_state, stable_since = state, now
+        elif state[0] == "complete" and now - stable_since >= quiet:
+            return True
+        sleep(PAGE_IDLE_POLL_SECONDS)
+    return False
+
+def capture_screenshot(driver) -> Image.Image:
+    """Capture the viewport as a downscaled JPEG image, using Chrome's JPEG capture when available."""
+    try:
+        data = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": settings.SCREENSHOT_JPEG_QUALITY})
+        image = Image.open(BytesIO(base64.b64decode(data["data"])))
+    except Exception:
+        image = Image.open(BytesIO(driver.get_screenshot_as_png()))
+    image = image.convert("RGB")
+    image.thumbnail((settings.SCREENSHOT_MAX_SIZE, settings.SCREENSHOT_MAX_SIZE))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=settings.SCREENSHOT_JPEG_QUALITY)
+    return Image.open(BytesIO(buffer.getvalue()))
 
 def save_screenshot(memory_step: ActionStep, agent) -> None:
     """Set up screenshot callback for web automation agents."""
-    sleep(1.0)  # Let JavaScript animations happen before taking the screenshot
-    driver = helium.get_driver()
-    current_step = memory_step.step_number
+    driver = current_driver()
     if driver is not None:
-        for previous_memory_step in agent.memory.steps:  # Remove previous screenshots for lean processing
-            if isinstance(previous_memory_step, ActionStep) and previous_memory_step.step_number <= current_step - 2:
-                previous_memory_step.observations_images = None
-        png_bytes = driver.get_screenshot_as_png()
-        image = Image.open(BytesIO(png_bytes))
-        print(f"Captured a browser screenshot: {image.size} pixels")
-        memory_step.observations_images = [image.copy()]  # Create a copy to ensure it persists
+        wait_for_page_idle(driver)  # Let JavaScript animations and requests settle before taking the screenshot
+        image = capture_screenshot(driver)
+        logger.info(f"Captured a browser screenshot: {image.size} pixels")
+        memory_step.observations_images = [image]
 
         # Get all clickable buttons
-        buttons = find_all(Button())
-        aria_labels = [b.web_element.get_attribute("aria-label") for b in buttons]
-        aria_labels = [label for label in aria_labels if label is not None]
+        aria_labels = driver.execute_script(CLICKABLE_LABELS_JS) or []
         buttons_text = "\nClickable buttons:\n" + str(aria_labels)
 
         # Update observations with current URL and buttons
@@ -30,3 +101,100 @@ def save_screenshot(memory_step: ActionStep, agent) -> None:
             f"{url_info}\n{buttons_text}" if memory_step.observations is None 
             else f"{memory_step.observations}\n{url_info}\n{buttons_text}"
         )
+
+class MemoryCompactor:
+    """
+    Step callback keeping an agent's memory under `max_tokens`, so late steps cost about as
+    much as early ones. Screenshots are kept for the newest `keep_images` steps only. When
+    the memory is over budget, the observations, model output and code of the oldest steps
+    are cut to their first and last `old_text_chars` characters until it fits again; the
+    newest `keep_recent_steps` steps are never touched. Register it after callbacks that
+    add to the step (e.g. save_screenshot).
+    """
+
+    IMAGE_TOKENS = 258  # Gemini's cost of an image of at most 384 pixels a side
+
+    def __init__(self, max_tokens: int | None = None, keep_recent_steps: int = 2, keep_images: int = 1, old_text_chars: int = 400):
+        self.max_tokens = max_tokens or settings.AGENT_MEMORY_TOKEN_BUDGET
+        self.keep_recent_steps = keep_recent_steps
+        self.keep_images = keep_images
+        self.old_text_chars = old_text_chars
+        self.compacted_steps = 0
+
+    def __call__(self, memory_step: ActionStep, agent) -> None:
+        steps = [step for step in agent.memory.steps if isinstance(step, ActionStep)]
+        for step in steps[:len(steps) - self.keep_images]:
+            step.observations_images = None
+
+        total = estimate_tokens(agent.task or "") + sum(self.step_tokens(step) for step in steps)
+        if total <= self.max_tokens:
+            return
+        start = total
+        for step in steps[:max(0, len(steps) - self.keep_recent_steps)]:
+            before = self.step_tokens(step)
+            self._shorten(step)
+            after = self.step_tokens(step)
+            if after < before:
+                self.compacted_steps += 1
+                total -= before - after
+            if total <= self.max_tokens:
+                break
+        logger.info(f"Compacted agent memory at step {memory_step.step_number} from ~{start} to ~{total} tokens")
+
+    def step_tokens(self, step: ActionStep) -> int:
+        tokens = estimate_tokens(step.model_output or "") + estimate_tokens(step.observations or "")
+        tokens += sum(estimate_tokens(str(tool_call.arguments)) for tool_call in step.tool_calls or [])
+        return tokens + self.IMAGE_TOKENS * len(step.observations_images or [])
+
+    def _elide(self, text: str | None) -> str | None:
+        if text is None or len(text) <= 2 * self.old_text_chars + 100:
+            return text
+        omitted = len(text) - 2 * self.old_text_chars
+        return f"{text[:self.old_text_chars]}\n[... {omitted} characters of this earlier step omitted to save context ...]\n{text[-self.old_text_chars:]}"
+
+    def _shorten(self, step: ActionStep) -> None:
+        step.observations = self._elide(step.observations)
+        if isinstance(step.model_output, str):
+            step.model_output = self._elide(step.model_output)
+        for tool_call in step.tool_calls or []:
+            if isinstance(tool_call.arguments, str):
+                tool_call.arguments = self._elide(tool_call.arguments)
+
+def _thumbnail(image: Image.Image) -> str:
+    """Downscale a screenshot to a base64 JPEG small enough to stream with step events."""
+    thumbnail = image.convert("RGB")
+    thumbnail.thumbnail((settings.AGENT_EVENT_THUMBNAIL_SIZE, settings.AGENT_EVENT_THUMBNAIL_SIZE))
+    buffer = BytesIO()
+    thumbnail.save(buffer, format="JPEG", quality=70)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+def step_event(memory_step: ActionStep, agent) -> dict:
+    """Summarize a finished step: tools it called, duration, token usage, observations and screenshot."""
+    code = memory_step.code_action or ""
+    tools = [name for name in agent.tools if name != "final_answer" and f"{name}(" in code]
+    if not tools and memory_step.tool_calls:
+        tools = [tool_call.name for tool_call in memory_step.tool_calls if tool_call.name != "python_interpreter"]
+    usage = memory_step.token_usage
+    observations = memory_step.observations or ""
+    return {
+        "step_number": memory_step.step_number,
+        "tools": tools,
+        "duration": memory_step.timing.duration,
+        "input_tokens": usage.input_tokens if usage else None,
+        "output_tokens": usage.output_tokens if usage else None,
+        "observations": observations[:settings.AGENT_EVENT_OBSERVATION_CHARS],
+        "error": str(memory_step.error) if memory_step.error else None,
+        "is_final_answer": memory_step.is_final_answer,
+        "screenshot": _thumbnail(memory_step.observations_images[-1]) if memory_step.observations_images else None,
+    }
+
+def record_step(memory_step: ActionStep, agent) -> None:
+    """Store the step as a progress event of the current run so clients can stream it."""
+    run = current_run()
+    if run is None:
+        return
+    try:
+        get_run_store().add_event(run.run_id, "step", step_event(memory_step, agent))
+    except Exception as e:
+        # Progress reporting must never fail the run itself
+        logger.warning(f"Could not record step {memory_step.step_number} of run {run.run_id}: {e}")
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator
+
+import helium
+from selenium import webdriver
+
+from dexter.agents.run_context import current_run
+from dexter.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_POLL_SECONDS = 0.5
+
+
+def start_browser() -> webdriver.Chrome:
+    """Start a Chrome instance with the options the auchan agent's tools and screenshots expect."""
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument("--force-device-scale-factor=1")
+    chrome_options.add_argument("--window-size=1000,1350")
+    chrome_options.add_argument("--disable-pdf-viewer")
+    chrome_options.add_argument("--window-position=0,0")
+    return helium.start_chrome(headless=settings.BROWSER_HEADLESS, options=chrome_options)
+
+
+@dataclass
+class _Browser:
+    driver: Any
+    created_at: float = field(default_factory=time.time)
+    uses: int = 0
+    owner: str | None = None
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` warm Chrome instances and leases one per agent run.
+
+    Returned browsers are reset (cookies cleared, extra tabs closed, blank page) so the next
+    run starts clean. A browser that crashed, fails to reset, is older than
+    BROWSER_MAX_AGE_SECONDS or has served BROWSER_MAX_USES runs is quit and replaced in the
+    background, so no Chrome process outlives its use.
+
+    Helium's API drives one process-global browser, so leasing also makes the leased
+    browser helium's current driver; auchan runs are limited to one at a time by the
+    scheduler's AGENT_CONCURRENCY_LIMITS.
+    """
+
+    def __init__(self, size: int | None = None, factory: Callable[[], Any] = start_browser):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.factory = factory
+        self._idle: list[_Browser] = []
+        self._count = 0
+        self._counters = {"started": 0, "leases": 0, "recycled": 0, "start_failures": 0}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def warm(self) -> None:
+        """Start browsers until the pool is full, without leasing them."""
+        while True:
+            with self._cond:
+                if self._closed or self._count >= self.size:
+                    return
+                self._count += 1
+            browser = self._start()
+            if browser is None:
+                return
+            with self._cond:
+                self._idle.append(browser)
+                self._cond.notify()
+
+    def _start(self) -> _Browser | None:
+        try:
+            driver = self.factory()
+        except Exception as e:
+            logger.error(f"Could not start a pooled browser: {e}")
+            with self._cond:
+                self._count -= 1
+                self._counters["start_failures"] += 1
+                self._cond.notify()
+            return None
+        with self._cond:
+            self._counters["started"] += 1
+        logger.info(f"Started pooled browser ({self._count}/{self.size})")
+        return _Browser(driver)
+
+    def _acquire(self, timeout: float) -> _Browser:
+        deadline = time.monotonic() + timeout
+        run = current_run()
+        with self._cond:
+            while not self._idle and self._count >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser became available within {timeout:.0f} seconds")
+                self._cond.wait(min(remaining, ACQUIRE_POLL_SECONDS))
+                if run is not None:
+                    run.token.raise_if_cancelled()
+            if self._idle:
+                browser = self._idle.pop()
+            else:
+                self._count += 1
+                browser = None
+
+        if browser is None:
+            browser = self._start()
+            if browser is None:
+                raise RuntimeError("Could not start a browser for the agent run")
+        elif not self._healthy(browser):
+            self._discard(browser, "crashed while idle")
+            return self._acquire(max(0.0, deadline - time.monotonic()))
+
+        browser.uses += 1
+        browser.owner = run.run_id if run is not None else None
+        with self._cond:
+            self._counters["leases"] += 1
+        return browser
+
+    @staticmethod
+    def _healthy(browser: _Browser) -> bool:
+        try:
+            browser.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _expired(self, browser: _Browser) -> str | None:
+        if time.time() - browser.created_at > settings.BROWSER_MAX_AGE_SECONDS:
+            return "reached its maximum age"
+        if browser.uses >= settings.BROWSER_MAX_USES:
+            return f"served {browser.uses} runs"
+        return None
+
+    @staticmethod
+    def _reset(browser: _Browser) -> None:
+        driver = browser.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _release(self, browser: _Browser) -> None:
+        browser.owner = None
+        reason = "outlived the pool" if self._closed else self._expired(browser)
+        if reason is None:
+            try:
+                self._reset(browser)
+            except Exception as e:
+                reason = f"failed to reset ({e})"
+        if reason is not None:
+            self._discard(browser, reason)
+            return
+        with self._cond:
+            self._idle.append(browser)
+            self._cond.notify()
+
+    def _discard(self, browser: _Browser, reason: str) -> None:
+        logger.info(f"Recycling pooled browser that {reason}")
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._count -= 1
+            self._counters["recycled"] += 1
+            self._cond.notify()
+        # Replace it off the request path so the next run finds a warm browser
+        threading.Thread(target=self.warm, name="browser-warmup", daemon=True).start()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[Any]:
+        """
+        Lease a browser for the current agent run and make it helium's driver and the run's
+        browser. Cancelling the run quits the browser at once; it is then replaced.
+        """
+        browser = self._acquire(timeout if timeout is not None else settings.BROWSER_ACQUIRE_TIMEOUT)
+        helium.set_driver(browser.driver)
+        run = current_run()
+        if run is not None:
+            owner = browser.owner
+            run.browser = browser.driver
+            # Only quit the browser if this run still holds it when the cancel arrives
+            run.token.add_callback(lambda: browser.owner == owner and browser.driver.quit())
+        try:
+            yield browser.driver
+        finally:
+            if run is not None:
+                run.browser = None
+            self._release(browser)
+
+    def shutdown(self) -> None:
+        """Quit all idle browsers and stop replacing recycled ones."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for browser in idle:
+            try:
+                browser.driver.quit()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._counters, "size": self.size, "browsers": self._count, "idle": len(self._idle)}
+
+
+browser_pool = BrowserPool()
+
+
+def current_driver() -> Any:
+    """Return the browser leased by the current agent run, falling back to helium's driver."""
+    run = current_run()
+    if run is not None and run.browser is not None:
+        return run.browser
+    return helium.get_driver()
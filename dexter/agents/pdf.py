@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from dexter.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def parse_page_range(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    Turn a 1-based page range such as "1-5,8,10-" into 0-based page indices. None or an
+    empty spec selects every page; pages past the end of the document are ignored.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+    pages: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        first = int(start) if start.strip() else 1
+        last = (int(end) if end.strip() else page_count) if sep else first
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range {part!r}")
+        pages.extend(range(first - 1, min(last, page_count)))
+    return list(dict.fromkeys(pages))
+
+
+def file_digest(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """
+    On-disk cache of extracted PDF text, one JSON file per document content hash holding
+    the pages extracted so far, so any later page range of the same file reuses them.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or settings.PDF_CACHE_DIR)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.json"
+
+    def _load(self, digest: str) -> Dict[int, str]:
+        try:
+            return {int(page): text for page, text in json.loads(self._path(digest).read_text(encoding="utf-8")).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, digest: str, pages: Sequence[int]) -> Dict[int, str]:
+        """Return the cached text of those `pages` that have been extracted before."""
+        cached = self._load(digest)
+        found = {page: cached[page] for page in pages if page in cached}
+        self.hits += len(found)
+        self.misses += len(pages) - len(found)
+        return found
+
+    def put(self, digest: str, texts: Dict[int, str]) -> None:
+        if not texts:
+            return
+        with self._lock:
+            merged = {**self._load(digest), **texts}
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp = self._path(digest).with_suffix(".tmp")
+                tmp.write_text(json.dumps(merged), encoding="utf-8")
+                tmp.replace(self._path(digest))
+            except OSError as e:
+                logger.warning(f"Could not cache PDF text of {digest[:12]}: {e}")
+
+
+pdf_cache = PdfTextCache()
+
+
+def page_count(path: str | Path) -> int:
+    import pypdf
+
+    with open(path, "rb") as f:
+        return len(pypdf.PdfReader(f).pages)
+
+
+def iter_pages(path: str | Path, pages: Sequence[int]) -> Iterator[str]:
+    import pypdf
+
+    with open(path, "rb") as f:
+        reader = pypdf.PdfReader(f)
+        for page in pages:
+            yield reader.pages[page].extract_text() or ""
+
+
+def extract_pages(path: str | Path, pages: Sequence[int]) -> List[str]:
+    """Extract the text of `pages` (0-based) from a PDF; runs in pool workers."""
+    return list(iter_pages(path, pages))
+
+
+def _extract_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the API process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_in_order(path: str | Path, pages: List[int]) -> Iterator[str]:
+    if len(pages) < settings.PDF_PARALLEL_MIN_PAGES or settings.PDF_EXTRACT_WORKERS < 2:
+        yield from iter_pages(path, pages)
+        return
+    batches = [pages[i:i + settings.PDF_PAGES_PER_TASK] for i in range(0, len(pages), settings.PDF_PAGES_PER_TASK)]
+    try:
+        futures = [_extract_pool().submit(extract_pages, str(path), batch) for batch in batches]
+    except Exception as e:
+        # e.g. inside a daemonic agent worker process, which cannot start children
+        logger.warning(f"Extracting PDF pages on one thread, the process pool is unavailable: {e}")
+        yield from iter_pages(path, pages)
+        return
+    for future in futures:
+        yield from future.result()
+
+
+def iter_pdf_text(path: str | Path, page_range: Optional[str] = None) -> Iterator[tuple[int, str]]:
+    """
+    Yield (page number, text) for the selected pages in order, as soon as each is available.
+    Cached pages are served from PdfTextCache; the rest are extracted, across the PDF
+    process pool for documents of PDF_PARALLEL_MIN_PAGES pages or more, then cached.
+    """
+    digest = file_digest(path)
+    pages = parse_page_range(page_range, page_count(path))
+    cached = pdf_cache.get(digest, pages)
+    missing = [page for page in pages if page not in cached]
+    source = _extract_in_order(path, missing) if missing else iter(())
+    extracted: Dict[int, str] = {}
+    try:
+        for page in pages:
+            if page not in cached:
+                extracted[page] = next(source)
+            yield page + 1, cached.get(page, extracted.get(page))
+    finally:
+        pdf_cache.put(digest, extracted)
+
+
+def pdf_stats() -> Dict[str, int]:
+    return {"cached_pages_served": pdf_cache.hits, "pages_extracted": pdf_cache.misses}
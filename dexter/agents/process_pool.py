@@ -0,0 +1,124 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict
+
+from dexter.agents.run_context import CancellationToken, RunContext, current_run, run_context
+from dexter.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CANCEL_POLL_SECONDS = 0.5
+
+_pool: ProcessPoolExecutor | None = None
+_pool_runs = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared agent process pool for a new run, creating it on first use.
+
+    Workers are spawned (not forked, the API process is multi-threaded). Once the pool has
+    taken PROCESS_POOL_MAX_RUNS_PER_WORKER runs per worker it is retired: new runs go to a
+    fresh pool while the old one finishes its runs and exits, capping memory growth.
+    ProcessPoolExecutor's own max_tasks_per_child is not used as it can deadlock on 3.11.
+    """
+    global _pool, _pool_runs
+    with _pool_lock:
+        if _pool is not None and _pool_runs >= settings.PROCESS_POOL_WORKERS * settings.PROCESS_POOL_MAX_RUNS_PER_WORKER:
+            logger.info(f"Recycling agent process pool after {_pool_runs} runs")
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            _pool_runs = 0
+            logger.info(f"Started agent process pool with {settings.PROCESS_POOL_WORKERS} workers")
+        _pool_runs += 1
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    """Discard a broken pool; a pool another thread already started in its place is kept."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool() -> None:
+    """Stop the process pool, waiting for running agents to finish."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _portable(result: Any) -> Any:
+    """Keep plain values as they are and turn agent output types into strings for pickling."""
+    if result is None or isinstance(result, (str, int, float, bool, list, dict)):
+        return result
+    return str(result)
+
+
+def _watch_cancel_file(cancel_file: str, token: CancellationToken, stop: threading.Event) -> None:
+    while not stop.wait(CANCEL_POLL_SECONDS):
+        if os.path.exists(cancel_file):
+            token.cancel("Agent run cancelled")
+            return
+
+
+def _run_in_worker(agent_name: str, task: str, additional_args: Dict[str, Any] | None, run_id: str, cancel_file: str) -> Any:
+    """Entry point executed inside a pool worker process."""
+    from dexter.agents.agent_pool import get_agent_pool
+
+    token = CancellationToken()
+    stop = threading.Event()
+    threading.Thread(target=_watch_cancel_file, args=(cancel_file, token, stop), daemon=True).start()
+    try:
+        with run_context(RunContext(run_id, agent_name, token)):
+            return _portable(get_agent_pool(agent_name).run(task, additional_args))
+    finally:
+        stop.set()
+
+
+class ProcessAgentRunner:
+    """
+    Runs an agent from dexter.agents.agents in the process pool, leasing the instance from
+    the worker's own agent pool.
+
+    `run` has the same shape as the agent's own `run(task, additional_args)` and blocks the
+    calling scheduler thread, which only waits, so the agent's CPU work does not hold the
+    API process's GIL. Cancellation of the scheduler run is forwarded to the worker
+    through a flag file checked by the worker's step callbacks.
+    """
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+
+    def run(self, task: str, additional_args: Dict[str, Any] | None = None) -> Any:
+        run = current_run()
+        run_id = run.run_id if run is not None else str(uuid.uuid4())
+        cancel_file = Path(tempfile.gettempdir()) / f"dexter-cancel-{run_id}"
+        if run is not None:
+            run.token.add_callback(cancel_file.touch)
+
+        logger.info(f"Running {self.agent_name} agent run {run_id} in the process pool")
+        pool = get_pool()
+        try:
+            future = pool.submit(_run_in_worker, self.agent_name, task, additional_args, run_id, str(cancel_file))
+            return future.result()
+        except BrokenProcessPool:
+            logger.error(f"Agent process pool broke during {self.agent_name} run {run_id}, restarting it")
+            _reset_pool(pool)
+            raise
+        finally:
+            cancel_file.unlink(missing_ok=True)
@@ -0,0 +1,91 @@
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class AgentCancelledError(Exception):
+    """Raised inside an agent run once its cancellation token has been triggered."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag for one agent run.
+
+    Cancelling runs the registered teardown callbacks (e.g. closing the run's browser)
+    immediately; the run itself stops at its next checkpoint via `raise_if_cancelled`.
+    """
+
+    def __init__(self):
+        self.reason: str | None = None
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Agent run cancelled") -> bool:
+        """Trigger the token; returns False if it was already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run_callback(callback)
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Register teardown to run on cancel, or run it now if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    @staticmethod
+    def _run_callback(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Cancellation callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise AgentCancelledError(self.reason)
+
+
+@dataclass
+class RunContext:
+    """Per-run state visible to tools and step callbacks running on the run's worker thread."""
+    run_id: str
+    agent_type: str
+    token: CancellationToken
+    browser: Any = None  # Selenium driver leased from the browser pool, for browser agents
+    tool_results: dict = field(default_factory=dict)  # Memoized tool calls, see dexter.agents.tool_memo
+    notes: list[str] = field(default_factory=list)  # Messages for the agent, added to the current step's observations
+
+
+_local = threading.local()
+
+
+def current_run() -> RunContext | None:
+    """Return the context of the agent run executing on this thread, if any."""
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def run_context(context: RunContext) -> Iterator[RunContext]:
+    """Make `context` the current run for this thread while the block executes."""
+    previous = current_run()
+    _local.run = context
+    try:
+        yield context
+    finally:
+        _local.run = previous
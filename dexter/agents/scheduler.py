@@ -0,0 +1,268 @@
+import itertools
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, run_context
+from dexter.config.settings import settings
+from dexter.core.model_router import ModelStats
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerSaturatedError(RuntimeError):
+    """Raised when a run is submitted while the scheduler can neither queue nor defer it."""
+
+
+class AgentFuture(Future):
+    """Future for a scheduled agent run, carrying its id, cancellation token and scheduling timestamps."""
+
+    def __init__(self, agent_type: str):
+        super().__init__()
+        self.run_id = str(uuid.uuid4())
+        self.agent_type = agent_type
+        self.token = CancellationToken()
+        self.enqueued_at = time.time()
+        self.started_at: float | None = None
+        self._start_callbacks: list[Callable[["AgentFuture"], None]] = []
+        self._start_lock = threading.Lock()
+
+    def add_start_callback(self, fn: Callable[["AgentFuture"], None]) -> None:
+        """Call `fn(future)` when a worker picks the run up, or now if it already has."""
+        with self._start_lock:
+            if self.started_at is None:
+                self._start_callbacks.append(fn)
+                return
+        self._invoke_start_callback(fn)
+
+    def _mark_started(self) -> None:
+        with self._start_lock:
+            self.started_at = time.time()
+            callbacks, self._start_callbacks = self._start_callbacks, []
+        for fn in callbacks:
+            self._invoke_start_callback(fn)
+
+    def _invoke_start_callback(self, fn: Callable[["AgentFuture"], None]) -> None:
+        try:
+            fn(self)
+        except Exception as e:
+            logger.warning(f"Start callback for run {self.run_id} failed: {e}")
+
+
+@dataclass
+class _Job:
+    future: AgentFuture
+    fn: Callable[..., Any]
+    args: tuple
+    kwargs: dict[str, Any]
+    priority: int
+    seq: int
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class AgentScheduler:
+    """
+    Runs agent jobs on a fixed pool of worker threads, replacing a FIFO ThreadPoolExecutor.
+
+    - Priority: each agent type has a priority (lower runs first); queued jobs gain one
+      level every AGENT_PRIORITY_AGING_SECONDS so low-priority work is never starved.
+    - Per-type limits: at most AGENT_CONCURRENCY_LIMITS[agent_type] runs of a type at once;
+      a job whose type is at its limit waits without blocking other types.
+    - Admission control: once AGENT_MAX_QUEUE_DEPTH jobs are waiting, background jobs
+      (priority AGENT_DEFER_MIN_PRIORITY or above) are deferred, up to AGENT_MAX_DEFERRED,
+      and enter the queue in submission order as it drains. Anything else, or a background
+      job past that bound, makes submit raise SchedulerSaturatedError.
+
+    `submit` keeps the ThreadPoolExecutor call shape (fn, *args) with scheduling options
+    as keyword arguments.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_queue_depth: int | None = None,
+                 priorities: dict[str, int] | None = None, limits: dict[str, int] | None = None,
+                 max_deferred: int | None = None):
+        self._max_workers = max_workers or settings.AGENT_MAX_WORKERS
+        self.max_queue_depth = max_queue_depth or settings.AGENT_MAX_QUEUE_DEPTH
+        self.max_deferred = max_deferred if max_deferred is not None else settings.AGENT_MAX_DEFERRED
+        self.priorities = priorities if priorities is not None else settings.AGENT_PRIORITIES
+        self.limits = limits if limits is not None else settings.AGENT_CONCURRENCY_LIMITS
+        self._queue: list[_Job] = []
+        self._deferred: list[_Job] = []
+        self._running: dict[str, int] = {}
+        self._workers: list[threading.Thread] = []
+        self._seq = itertools.count()
+        self._shutdown = False
+        self._wait_times: dict[str, ModelStats] = {}
+        self._counters = {"submitted": 0, "deferred": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        self._cond = threading.Condition()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, agent_type: str = "default", priority: int | None = None, **kwargs: Any) -> AgentFuture:
+        """Queue `fn(*args, **kwargs)` as a run of `agent_type` and return its future."""
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new agent runs after shutdown")
+            self._purge_cancelled()
+            if priority is None:
+                priority = self.priorities.get(agent_type, max(self.priorities.values(), default=0))
+            defer = len(self._queue) >= self.max_queue_depth
+            if defer and (priority < settings.AGENT_DEFER_MIN_PRIORITY or len(self._deferred) >= self.max_deferred):
+                self._counters["rejected"] += 1
+                raise SchedulerSaturatedError(f"Agent queue is full ({len(self._queue) + len(self._deferred)} runs waiting), try again later")
+
+            future = AgentFuture(agent_type)
+            job = _Job(future, fn, args, kwargs, priority, next(self._seq), future.enqueued_at)
+            if defer:
+                self._deferred.append(job)
+                self._counters["deferred"] += 1
+            else:
+                self._queue.append(job)
+            self._counters["submitted"] += 1
+            self._start_workers()
+            self._cond.notify_all()
+        logger.info(f"{'Deferred' if defer else 'Queued'} {agent_type} run {future.run_id} with priority {priority} (queue depth {len(self._queue)}, deferred {len(self._deferred)})")
+        return future
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self._max_workers:
+            worker = threading.Thread(target=self._worker, name=f"agent-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _purge_cancelled(self) -> None:
+        for jobs in (self._queue, self._deferred):
+            cancelled = [job for job in jobs if job.future.cancelled()]
+            for job in cancelled:
+                jobs.remove(job)
+            self._counters["cancelled"] += len(cancelled)
+        self._promote_deferred()
+
+    def _promote_deferred(self) -> None:
+        """Move deferred jobs into the queue, oldest first, while it has room."""
+        while self._deferred and len(self._queue) < self.max_queue_depth:
+            self._queue.append(self._deferred.pop(0))
+
+    def _effective_priority(self, job: _Job, now: float) -> tuple[float, int]:
+        return job.priority - (now - job.enqueued_at) / settings.AGENT_PRIORITY_AGING_SECONDS, job.seq
+
+    def _dispatch_order(self) -> list[_Job]:
+        now = time.time()
+        return sorted(self._queue, key=lambda job: self._effective_priority(job, now))
+
+    def _has_capacity(self, agent_type: str) -> bool:
+        limit = self.limits.get(agent_type)
+        return limit is None or self._running.get(agent_type, 0) < limit
+
+    def _next_job(self) -> _Job | None:
+        """Pop the highest-priority job whose type is under its concurrency limit."""
+        self._purge_cancelled()
+        for job in self._dispatch_order():
+            if self._has_capacity(job.future.agent_type):
+                self._queue.remove(job)
+                self._promote_deferred()
+                return job
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                if not job.future.set_running_or_notify_cancel():
+                    self._counters["cancelled"] += 1
+                    continue
+                agent_type = job.future.agent_type
+                self._running[agent_type] = self._running.get(agent_type, 0) + 1
+                wait_time = time.time() - job.enqueued_at
+                self._wait_times.setdefault(agent_type, ModelStats(settings.ROUTER_LATENCY_WINDOW)).record(wait_time, success=True)
+
+            job.future._mark_started()
+            logger.info(f"Starting {agent_type} run {job.future.run_id} after waiting {wait_time:.2f} seconds")
+            try:
+                with run_context(RunContext(job.future.run_id, agent_type, job.future.token)):
+                    job.future.token.raise_if_cancelled()
+                    result = job.fn(*job.args, **job.kwargs)
+            except AgentCancelledError as e:
+                outcome = "cancelled"
+                logger.info(f"{agent_type} run {job.future.run_id} stopped: {e}")
+                job.future.set_exception(e)
+            except BaseException as e:
+                outcome = "failed"
+                job.future.set_exception(e)
+            else:
+                outcome = "completed"
+                job.future.set_result(result)
+            finally:
+                with self._cond:
+                    self._running[agent_type] -= 1
+                    self._counters[outcome] += 1
+                    self._cond.notify_all()
+
+    def cancel(self, future: Future, reason: str = "Agent run cancelled") -> bool:
+        """
+        Cancel a run: a queued run is dropped, a running one has its token triggered and
+        stops at its next step. Returns False if the run had already finished.
+        """
+        if future.cancel():
+            logger.info(f"Cancelled queued agent run {getattr(future, 'run_id', id(future))}")
+            return True
+        token = getattr(future, "token", None)
+        if future.done() or token is None:
+            return False
+        token.cancel(reason)
+        logger.info(f"Cancellation requested for running agent run {getattr(future, 'run_id', id(future))}")
+        return True
+
+    def queue_position(self, future: Future) -> int:
+        """1-based position of a queued run in dispatch order, deferred runs last, or 0 if it is no longer queued."""
+        with self._cond:
+            for position, job in enumerate(self._dispatch_order() + self._deferred, start=1):
+                if job.future is future:
+                    return position
+        return 0
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Stop accepting runs; workers exit once the queue is drained (or cancelled)."""
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for job in self._queue + self._deferred:
+                    job.future.cancel()
+                self._purge_cancelled()
+            self._cond.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth, running runs and wait-time percentiles per agent type."""
+        with self._cond:
+            queued: dict[str, int] = {}
+            for job in self._queue + self._deferred:
+                queued[job.future.agent_type] = queued.get(job.future.agent_type, 0) + 1
+            agent_types = set(queued) | set(self._running) | set(self._wait_times)
+            return {
+                **self._counters,
+                "workers": self._max_workers,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "deferred_depth": len(self._deferred),
+                "max_deferred": self.max_deferred,
+                "agents": {
+                    agent_type: {
+                        "queued": queued.get(agent_type, 0),
+                        "running": self._running.get(agent_type, 0),
+                        "limit": self.limits.get(agent_type),
+                        "wait_p50": self._wait_times[agent_type].percentile(50) if agent_type in self._wait_times else None,
+                        "wait_p95": self._wait_times[agent_type].percentile(95) if agent_type in self._wait_times else None,
+                    }
+                    for agent_type in sorted(agent_types)
+                },
+            }
@@ -0,0 +1,64 @@
+import copy
+import functools
+import inspect
+import json
+import logging
+from typing import Any, Callable, Optional
+
+from smolagents import Tool
+
+from dexter.agents.run_context import current_run
+
+logger = logging.getLogger(__name__)
+
+
+def _call_key(tool: Tool, signature: inspect.Signature, args: tuple, kwargs: dict) -> tuple[str, str]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tool.name, json.dumps(bound.arguments, default=repr)  # Bound arguments are in signature order
+
+
+def _describe(key: tuple[str, str]) -> str:
+    name, arguments = key
+    arguments = ", ".join(f"{arg}={value!r}" for arg, value in json.loads(arguments).items())
+    return f"{name}({arguments})"
+
+
+def memoize_per_run(tool: Tool, is_failure: Optional[Callable[[Any], bool]] = None) -> Tool:
+    """
+    Make repeated identical calls of `tool` within one agent run return the first call's
+    result instead of calling again, and leave the agent a note that the result was reused
+    (see note_cached_tool_calls). Only for idempotent tools; failed calls are not remembered
+    so they can be retried: calls that raise, return None, or whose result `is_failure`
+    flags (for tools that report errors as text). Calls outside an agent run are passed through.
+    """
+    if getattr(tool, "memoized_per_run", False):
+        return tool
+    forward = tool.forward
+    signature = inspect.signature(forward)
+    parameters = list(signature.parameters.values())
+    if parameters and parameters[0].name == "self":
+        # @tool functions are exposed as a staticmethod whose signature still lists `self`
+        signature = signature.replace(parameters=parameters[1:])
+
+    @functools.wraps(forward)
+    def memoized(*args, **kwargs):
+        run = current_run()
+        if run is None:
+            return forward(*args, **kwargs)
+        key = _call_key(tool, signature, args, kwargs)
+        if key in run.tool_results:
+            logger.info(f"Reusing result of {key[0]} within run {run.run_id}")
+            run.notes.append(
+                f"Note: {_describe(key)} was already called earlier in this run, so its previous result was returned. "
+                "Repeating the same call will not give new information."
+            )
+            return copy.deepcopy(run.tool_results[key])
+        result = forward(*args, **kwargs)
+        if result is not None and not (is_failure and is_failure(result)):
+            run.tool_results[key] = copy.deepcopy(result)
+        return result
+
+    tool.forward = memoized
+    tool.memoized_per_run = True
+    return tool
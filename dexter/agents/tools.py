@@ -1,20 +1,45 @@
 import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List
+from urllib.parse import urlparse
 import requests
-from smolagents import WebSearchTool, VisitWebpageTool, tool
-from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
-from google import genai
-from google.genai import types
+from smolagents import tool
 from typing import Optional
 from helium import *
+from selenium import webdriver
+from selenium.webdriver.common.keys import Keys
+from dexter.agents.browser_pool import current_driver
+from dexter.agents.pdf import iter_pdf_text
+from dexter.agents.tool_memo import memoize_per_run
+from dexter.agents.web_tools import CachedVisitWebpageTool, CachedWebSearchTool
+from dexter.utils.http import download_file
+from dexter.utils.tool_output import tool_outputs
+from dexter.agents.youtube import analyze_video, answer_from_summary, fetch_transcript, fetch_transcripts, transcript_languages, transcript_preview, youtube_request
 from dexter.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-web_search = WebSearchTool()
-visit_webpage = VisitWebpageTool()
+web_search = CachedWebSearchTool()
+visit_webpage = CachedVisitWebpageTool()
+
+@tool
+def read_tool_output(ref: str, page: int = 0) -> str:
+    """
+    Read the full text of a tool output that was shortened, one page at a time.
+
+    Args:
+        ref: The reference given in the shortened output, e.g. "out-1a2b3c4d5e".
+        page: Page to read, starting at 0.
+
+    Returns:
+        The requested page of the full output, with a pointer to the next page if there is one.
+    """
+    text = tool_outputs.read(ref, page)
+    if text is None:
+        return f"No stored output {ref}; it may have expired."
+    return text
 
 @tool
 def download_image(url: str, save_path: str) -> Optional[bool]:
@@ -32,17 +57,50 @@ def download_image(url: str, save_path: str) -> Optional[bool]:
         IOError: If saving the file fails
     """
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        with open(save_path, "wb") as f:
-            f.write(response.content)
+        download_file(url, save_path, settings.IMAGE_DOWNLOAD_MAX_BYTES, "image/", settings.IMAGE_DOWNLOAD_TIMEOUT)
         return True
-        
+
     except requests.exceptions.RequestException as e:
         raise Exception(f"Failed to download image from {url}: {str(e)}")
+    except ValueError as e:
+        raise Exception(f"Refused image from {url}: {str(e)}")
     except IOError as e:
         raise Exception(f"Failed to save image to {save_path}: {str(e)}")
+
+def _image_file_name(index: int, url: str) -> str:
+    name = Path(urlparse(url).path).name
+    return f"{index:02d}_{name}" if Path(name).suffix else f"{index:02d}_image"
+
+def _download_into(index: int, url: str, save_dir: Path) -> str:
+    path = save_dir / _image_file_name(index, url)
+    try:
+        _, content_type = download_file(url, path, settings.IMAGE_DOWNLOAD_MAX_BYTES, "image/", settings.IMAGE_DOWNLOAD_TIMEOUT)
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
+        return f"Error: {str(e)}"
+    if not path.suffix:
+        path = path.rename(path.with_suffix(mimetypes.guess_extension(content_type) or ".img"))
+    return str(path)
+
+@tool
+def download_images(urls: List[str], save_dir: str) -> Dict[str, str]:
+    """Downloads several images in parallel into a directory.
+
+    Args:
+        urls: The URLs of the images to download
+        save_dir: The local directory where the images should be saved; it is created if missing
+
+    Returns:
+        Dict[str, str]: For each URL, the path of the saved image, or a message starting with "Error:" if it failed
+    """
+    directory = Path(save_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    workers = min(settings.IMAGE_DOWNLOAD_CONCURRENCY, len(urls))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-downloads") as pool:
+        paths = pool.map(lambda item: _download_into(item[0], item[1], directory), enumerate(urls))
+        return dict(zip(urls, paths))
     
 @tool
 def search_products(product_name: str) -> str:
@@ -66,7 +124,7 @@ def search_products(product_name: str) -> str:
 @tool
 def go_back() -> None:
     """Goes back to previous page."""
-    driver.back()
+    current_driver().back()
 
 @tool
 def close_popups() -> str:
@@ -74,30 +132,24 @@ def close_popups() -> str:
     Closes any visible modal or pop-up on the page. Use this to dismiss pop-up windows!
     This does not work on cookie consent banners.
     """
-    webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    webdriver.ActionChains(current_driver()).send_keys(Keys.ESCAPE).perform()
 
 @tool
-def extract_text_from_pdf(pdf_path: str) -> str:
+def extract_text_from_pdf(pdf_path: str, pages: Optional[str] = None) -> str:
     """
     Extract text from any PDF file.
 
     Args:
         pdf_path: Path to the PDF file to extract text from
+        pages: Optional 1-based pages to extract, e.g. "1-5,8,10-"; all pages by default
 
     Returns:
         The extracted text content from the PDF as a string
     """
-    import pypdf
-    text = ""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = pypdf.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                text += page.extract_text()
+        return "\n".join(text for _, text in iter_pdf_text(pdf_path, pages))
     except Exception as e:
         return f"Error extracting text from PDF: {e}"
-    return text
 
 @tool
 def search_youtube_videos(
@@ -109,9 +161,12 @@ def search_youtube_videos(
     safe_search: str = "none",
     language: Optional[str] = None,
     include_transcripts: bool = True, 
+    full_transcripts: bool = False,
 ) -> List[Dict]:
     """
     Search YouTube for videos with optional filters, statistics, and transcripts.
+    Transcripts are shortened to a preview unless full_transcripts is True; use
+    get_video_transcript to read the full transcript of a video you are interested in.
 
     Args:
         query (str): Search query string.
@@ -122,14 +177,14 @@ def search_youtube_videos(
         safe_search (str): Safe search setting; 'moderate', 'strict', or 'none' (default 'none').
         language (Optional[str]): Relevance language.
         include_transcripts (bool): Whether to fetch video transcripts using unofficial API.
+        full_transcripts (bool): Whether to return full transcripts instead of previews (default False).
 
     Returns:
         List[Dict]: A list of enriched video metadata dictionaries.
     """
-    youtube = build("youtube", "v3", developerKey=settings.YOUTUBE_API_KEY)
-
     # Step 1: Search videos
-    search_response = youtube.search().list(
+    search_response = youtube_request(
+        "search", "list",
         q=query,
         part="snippet",
         type="video",
@@ -139,7 +194,7 @@ def search_youtube_videos(
         publishedAfter=published_after,
         safeSearch=safe_search,
         relevanceLanguage=language
-    ).execute()
+    )
 
     items = search_response.get("items", [])
     video_ids = [item["id"]["videoId"] for item in items]
@@ -147,22 +202,20 @@ def search_youtube_videos(
     # Step 2: Fetch statistics
     stats_map = {}
     if video_ids:
-        stats_response = youtube.videos().list(
+        stats_response = youtube_request(
+            "videos", "list",
             part="statistics",
             id=",".join(video_ids)
-        ).execute()
+        )
         for stat_item in stats_response.get("items", []):
             stats_map[stat_item["id"]] = stat_item.get("statistics", {})
 
-    # Step 3: Fetch transcripts (optional)
+    # Step 3: Fetch transcripts (optional), concurrently and through the transcript cache
     transcript_map = {}
     if include_transcripts:
-        for vid in video_ids:
-            try:
-                transcript = YouTubeTranscriptApi.get_transcript(vid)
-                transcript_map[vid] = "\n".join([entry["text"] for entry in transcript])
-            except (TranscriptsDisabled, NoTranscriptFound):
-                transcript_map[vid] = None
+        transcript_map = fetch_transcripts(video_ids, transcript_languages(language))
+        if not full_transcripts:
+            transcript_map = {vid: transcript_preview(vid, text) for vid, text in transcript_map.items()}
 
     # Step 4: Merge data
     results = []
@@ -186,51 +239,41 @@ def search_youtube_videos(
     return results
 
 @tool
-def get_video_transcript(video_id: str) -> Optional[str]:
+def get_video_transcript(video_id: str, language: Optional[str] = None) -> Optional[str]:
     """
     Get transcript text for a given YouTube video ID using youtube-transcript-api.
 
     Args:
         video_id (str): The unique video identifier on YouTube.
+        language (Optional[str]): Preferred transcript language code (e.g. 'es'); English is the fallback.
 
     Returns:
         Optional[str]: Full transcript text if available, or None.
     """
-    try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        return "\n".join([entry["text"] for entry in transcript])
-    except (TranscriptsDisabled, NoTranscriptFound):
-        return None
+    return fetch_transcript(video_id, transcript_languages(language))
 
 @tool
-def watch_youtube_video(url: str, prompt: str) -> Optional[str]:
+def watch_youtube_video(url: str, prompt: str, from_summary: bool = False) -> Optional[str]:
     """
     Watch a YouTube video and answer questions or analyze content based on the prompt.
     
     Args:
         url (str): The YouTube video URL to analyze
         prompt (str): Question or description of what to look for in the video
+        from_summary (bool): If True, the video is watched once into a stored structured summary and the prompt is answered from it; much faster when asking several questions about the same video
         
     Returns:
         Optional[str]: response about the video content, or None if analysis fails
     """
     try:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        
-        response = client.models.generate_content(
-            model='models/gemini-2.0-flash',
-            contents=types.Content(
-                parts=[
-                    types.Part(
-                        file_data=types.FileData(file_uri=url),
-                        video_metadata=types.VideoMetadata(fps=0.5),
-                    ),
-                    types.Part(text=prompt)
-                ]
-            )
-        )
-        
-        return response.text
+        if from_summary:
+            return answer_from_summary(url, prompt)
+        return analyze_video(url, prompt)
     except Exception as e:
-        print(f"Error analyzing video: {str(e)}")
-        return None
\ No newline at end of file
+        logger.error(f"Error analyzing video: {str(e)}")
+        return None
+
+# Idempotent tools whose repeated identical calls within one agent run reuse the first result
+_memo_failures = {"visit_webpage": CachedVisitWebpageTool.is_error}
+for _name in settings.AGENT_MEMOIZED_TOOLS:
+    memoize_per_run(globals()[_name], _memo_failures.get(_name))
@@ -0,0 +1,178 @@
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+import requests
+from markdownify import markdownify
+from smolagents import VisitWebpageTool, WebSearchTool
+
+from dexter.config.settings import settings
+from dexter.utils.cache import SingleFlight, SQLiteCache, TTLCache
+from dexter.utils.http import http_session
+from dexter.utils.page_store import PageStore, content_hash
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _LazyStore(Generic[T]):
+    """Opens a persistent store on first use, so importing the tools never touches the disk.
+    If it cannot be opened the tool keeps working without it."""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self._store: Optional[T] = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[T]:
+        with self._lock:
+            if self._store is None and not self._failed:
+                try:
+                    self._store = self.factory()
+                except Exception as e:
+                    logger.warning(f"{self.name} is unavailable, continuing without it: {e}")
+                    self._failed = True
+            return self._store
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query: Unicode-normalized, case-folded, single-spaced."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().casefold()
+
+
+class CachedWebSearchTool(WebSearchTool):
+    """
+    `web_search` with results cached per engine and normalized query.
+
+    Lookups go through an in-memory LRU tier, then a SQLite tier shared by every process
+    (the API and the agent worker processes). Identical queries already in flight wait
+    for the running search instead of issuing their own. Results live for
+    WEB_SEARCH_CACHE_TTLS[engine] seconds; empty results and errors are not cached.
+    """
+
+    def __init__(self, max_results: int = 10, engine: str = "duckduckgo"):
+        super().__init__(max_results=max_results, engine=engine)
+        self.memory = TTLCache(max_entries=settings.WEB_SEARCH_CACHE_MAX_ENTRIES)
+        self.inflight = SingleFlight()
+        self.store = _LazyStore("Web search cache", lambda: SQLiteCache(settings.WEB_SEARCH_CACHE_PATH, table="web_search"))
+        self.persistent_hits = 0
+        self.searches = 0
+
+    @property
+    def ttl(self) -> int:
+        return settings.WEB_SEARCH_CACHE_TTLS.get(self.engine, settings.WEB_SEARCH_CACHE_DEFAULT_TTL)
+
+    def search(self, query: str) -> list:
+        key = f"{self.engine}|{self.max_results}|{normalize_query(query)}"
+        results = self.memory.get(key)
+        if results is not None:
+            return results
+        return self.inflight.do(key, lambda: self._search_through_store(key, query))
+
+    def _search_through_store(self, key: str, query: str) -> list:
+        store = self.store.get()
+        if store is not None:
+            entry = store.get(key)
+            if entry is not None:
+                results = json.loads(entry[0])
+                self.persistent_hits += 1
+                self.memory.set(key, results, ttl=entry[1] - time.time())
+                return results
+
+        results = super().search(query)
+        self.searches += 1
+        if results:
+            self.memory.set(key, results, ttl=self.ttl)
+            if store is not None:
+                store.set(key, json.dumps(results), ttl=self.ttl)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "persistent_hits": self.persistent_hits,
+            "deduplicated": self.inflight.shared,
+            "searches": self.searches,
+        }
+
+
+def page_to_markdown(html: str) -> str:
+    """Convert a page to markdown the way smolagents' VisitWebpageTool does."""
+    return re.sub(r"\n{3,}", "\n\n", markdownify(html).strip())
+
+
+class CachedVisitWebpageTool(VisitWebpageTool):
+    """
+    `visit_webpage` backed by the content-addressed PageStore.
+
+    A page fetched less than PAGE_STORE_FRESH_SECONDS ago is served from the store. Older
+    entries are revalidated with If-None-Match / If-Modified-Since, and a 304 reuses the
+    stored markdown. A changed response whose body hash is already stored skips the
+    markdown conversion. Concurrent visits of the same URL share one fetch.
+    """
+
+    # forward reports failures as text starting with one of these instead of raising
+    ERROR_PREFIXES = ("The request timed out.", "Error fetching the webpage:", "An unexpected error occurred:")
+
+    def __init__(self, max_output_length: int = 40000):
+        super().__init__(max_output_length=max_output_length)
+        self.store = _LazyStore("Page store", PageStore)
+        self.inflight = SingleFlight()
+        self._counters = {"fresh_hits": 0, "revalidated": 0, "unchanged_content": 0, "conversions": 0}
+
+    def forward(self, url: str) -> str:
+        try:
+            markdown = self.inflight.do(url, lambda: self._visit(url))
+            return self._truncate_content(markdown, self.max_output_length)
+        except requests.exceptions.Timeout:
+            return "The request timed out. Please try again later or check the URL."
+        except requests.exceptions.RequestException as e:
+            return f"Error fetching the webpage: {str(e)}"
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
+
+    @classmethod
+    def is_error(cls, result: Any) -> bool:
+        return isinstance(result, str) and result.startswith(cls.ERROR_PREFIXES)
+
+    def _visit(self, url: str) -> str:
+        store = self.store.get()
+        entry = store.lookup(url) if store is not None else None
+        headers = {}
+        if entry is not None:
+            markdown = store.markdown(entry.content_hash)
+            if markdown is not None and time.time() - entry.fetched_at < settings.PAGE_STORE_FRESH_SECONDS:
+                self._counters["fresh_hits"] += 1
+                return markdown
+            if markdown is not None and entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if markdown is not None and entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = http_session().get(url, timeout=20, headers=headers)
+        if response.status_code == 304 and headers:
+            store.revalidated(url)
+            self._counters["revalidated"] += 1
+            return markdown
+        response.raise_for_status()
+
+        markdown = store.markdown(content_hash(response.content)) if store is not None else None
+        if markdown is None:
+            markdown = page_to_markdown(response.text)
+            self._counters["conversions"] += 1
+        else:
+            self._counters["unchanged_content"] += 1
+        if store is not None:
+            store.put(url, response.content, markdown, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return markdown
+
+    def stats(self) -> Dict[str, Any]:
+        store = self.store.get()
+        return {**self._counters, "store": store.stats() if store is not None else None}
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from google import genai
+from google.genai import types
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
+
+from dexter.config.settings import settings
+from dexter.core.rate_limiter import current_lane, estimate_request_tokens, get_rate_limiter
+from dexter.utils.cache import SingleFlight, SQLiteCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Quota units charged per request (YouTube Data API v3 quota table)
+QUOTA_COSTS = {("search", "list"): 100, ("videos", "list"): 1}
+
+VIDEO_SUMMARY_PROMPT = """Analyze this video so that later questions about it can be answered without watching it again.
+Write a structured summary in markdown with these sections:
+## Overview: topic, format, speakers and purpose of the video
+## Timeline: one bullet per segment, "[mm:ss] what is shown and said"
+## Key facts: concrete claims, numbers, names, products and on-screen text
+## Visual details: notable scenes, demonstrations, charts and objects
+Be specific and complete, and do not speculate beyond what the video shows."""
+
+VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/|embed/)([\w-]{11})")
+
+
+@lru_cache(maxsize=1)
+def _discovery_document() -> str:
+    """The YouTube Data API v3 discovery document bundled with google-api-python-client."""
+    return get_static_doc("youtube", "v3")
+
+
+def youtube_client() -> Any:
+    """
+    Return this thread's YouTube Data API client, built once from the bundled discovery
+    document instead of fetching it on every call. Clients are per thread because their
+    httplib2 transport is not thread-safe.
+    """
+    if not hasattr(_local, "youtube"):
+        _local.youtube = build_from_document(_discovery_document(), developerKey=settings.YOUTUBE_API_KEY)
+    return _local.youtube
+
+
+class YouTubeQuota:
+    """Counts YouTube Data API quota units spent and saved by the cache per quota day (Pacific time)."""
+
+    def __init__(self, daily_limit: int | None = None):
+        self.daily_limit = daily_limit or settings.YOUTUBE_DAILY_QUOTA
+        self._day = None
+        self._used = 0
+        self._saved = 0
+        self._lock = threading.Lock()
+
+    def _roll_over(self) -> None:
+        today = datetime.now(ZoneInfo("America/Los_Angeles")).date()
+        if today != self._day:
+            self._day, self._used, self._saved = today, 0, 0
+
+    def record(self, units: int, cached: bool) -> None:
+        with self._lock:
+            self._roll_over()
+            if cached:
+                self._saved += units
+                return
+            self._used += units
+            used = self._used
+        if used >= 0.8 * self.daily_limit and used - units < 0.8 * self.daily_limit:
+            logger.warning(f"YouTube Data API quota at {used}/{self.daily_limit} units for today")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._roll_over()
+            return {"day": str(self._day), "used": self._used, "saved": self._saved, "limit": self.daily_limit}
+
+
+api_cache = TTLCache(max_entries=settings.YOUTUBE_CACHE_MAX_ENTRIES)
+quota = YouTubeQuota()
+
+
+def youtube_request(resource: str, method: str, **params: Any) -> Dict[str, Any]:
+    """
+    Execute a YouTube Data API request such as ("search", "list"), serving repeated
+    identical requests from a TTL cache keyed by their parameters.
+    """
+    params = {name: value for name, value in params.items() if value is not None}
+    key = (resource, method, json.dumps(params, sort_keys=True))
+    cost = QUOTA_COSTS.get((resource, method), 1)
+    response = api_cache.get(key)
+    if response is not None:
+        quota.record(cost, cached=True)
+        return response
+
+    response = getattr(getattr(youtube_client(), resource)(), method)(**params).execute()
+    quota.record(cost, cached=False)
+    api_cache.set(key, response, ttl=settings.YOUTUBE_CACHE_TTLS.get(resource, settings.YOUTUBE_CACHE_DEFAULT_TTL))
+    return response
+
+
+def _transcript_api() -> YouTubeTranscriptApi:
+    # One client per thread: each holds its own requests session
+    if not hasattr(_local, "transcript_api"):
+        _local.transcript_api = YouTubeTranscriptApi()
+    return _local.transcript_api
+
+
+def transcript_languages(language: Optional[str] = None) -> List[str]:
+    """Preferred transcript languages: the requested one first, English as the fallback."""
+    return [language, "en"] if language and language != "en" else ["en"]
+
+
+class TranscriptCache:
+    """
+    On-disk transcript cache, one JSON file per video id and language preference.
+
+    Videos without a transcript are cached too, for TRANSCRIPT_MISSING_TTL_SECONDS, so
+    search results that lack transcripts are not re-requested on every search.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or settings.TRANSCRIPT_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, video_id: str, languages: Sequence[str]) -> Path:
+        key = hashlib.sha256(f"{video_id}|{','.join(languages)}".encode()).hexdigest()[:16]
+        return self.directory / f"{video_id}.{key}.json"
+
+    def get(self, video_id: str, languages: Sequence[str]) -> tuple[bool, Optional[str]]:
+        """Return (found, transcript); a cached missing transcript is (True, None)."""
+        path = self._path(video_id, languages)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return False, None
+        if entry["text"] is None and time.time() - entry["fetched_at"] > settings.TRANSCRIPT_MISSING_TTL_SECONDS:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry["text"]
+
+    def put(self, video_id: str, languages: Sequence[str], text: Optional[str]) -> None:
+        path = self._path(video_id, languages)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"video_id": video_id, "languages": list(languages), "fetched_at": time.time(), "text": text}), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not cache transcript of {video_id}: {e}")
+
+
+transcript_cache = TranscriptCache()
+
+
+def fetch_transcript(video_id: str, languages: Sequence[str] = ("en",)) -> Optional[str]:
+    """
+    Return a video's transcript text from the cache or YouTube, or None if it has none.
+    Only permanent outcomes are cached; transient failures (rate limits, blocked requests)
+    are raised and retried on the next call.
+    """
+    found, text = transcript_cache.get(video_id, languages)
+    if found:
+        return text
+    try:
+        transcript = _transcript_api().fetch(video_id, languages=list(languages))
+        text = "\n".join(snippet.text for snippet in transcript)
+    except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable):
+        text = None
+    transcript_cache.put(video_id, languages, text)
+    return text
+
+
+def fetch_transcripts(video_ids: Iterable[str], languages: Sequence[str] = ("en",)) -> Dict[str, Optional[str]]:
+    """Fetch transcripts of several videos with at most TRANSCRIPT_FETCH_CONCURRENCY requests in flight."""
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        return {}
+    workers = min(settings.TRANSCRIPT_FETCH_CONCURRENCY, len(video_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcripts") as pool:
+        texts = pool.map(lambda video_id: _fetch_or_none(video_id, languages), video_ids)
+        return dict(zip(video_ids, texts))
+
+
+def _fetch_or_none(video_id: str, languages: Sequence[str]) -> Optional[str]:
+    try:
+        return fetch_transcript(video_id, languages)
+    except Exception as e:
+        # One failing video (network error, rate limit) must not fail the whole search
+        logger.warning(f"Could not fetch transcript of {video_id}: {e}")
+        return None
+
+
+def transcript_preview(video_id: str, text: Optional[str]) -> Optional[str]:
+    """Shorten a transcript to TRANSCRIPT_PREVIEW_CHARS, pointing at get_video_transcript for the rest."""
+    if text is None or len(text) <= settings.TRANSCRIPT_PREVIEW_CHARS:
+        return text
+    return f"{text[:settings.TRANSCRIPT_PREVIEW_CHARS]}... [truncated, call get_video_transcript('{video_id}') for the full transcript]"
+
+
+@lru_cache(maxsize=1)
+def gemini_client() -> genai.Client:
+    """Shared Gemini client, so video analyses reuse its pooled HTTP connections."""
+    return genai.Client(api_key=settings.GEMINI_API_KEY)
+
+
+@lru_cache(maxsize=1)
+def _analysis_store() -> SQLiteCache:
+    return SQLiteCache(settings.VIDEO_ANALYSIS_CACHE_PATH, table="video_analysis")
+
+
+analysis_flight = SingleFlight()
+analysis_counters = {"cached": 0, "video_requests": 0, "summary_answers": 0}
+
+
+def _video_key(url: str) -> str:
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else url.strip()
+
+
+def _generate(contents: Any, estimated_tokens: int) -> str:
+    """Call Gemini once capacity is available in the shared Gemini rate limiter, then settle its real usage."""
+    limiter = get_rate_limiter("gemini")
+    if limiter is not None:
+        limiter.acquire(estimated_tokens, current_lane())
+    try:
+        response = gemini_client().models.generate_content(model=settings.VIDEO_ANALYSIS_MODEL, contents=contents)
+    except Exception as e:
+        if limiter is not None and getattr(e, "code", None) == 429:
+            limiter.throttled()
+        raise
+    total_tokens = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+    if limiter is not None and isinstance(total_tokens, int):
+        limiter.settle(estimated_tokens, total_tokens)
+    return response.text
+
+
+def _watch(url: str, prompt: str, fps: float) -> str:
+    analysis_counters["video_requests"] += 1
+    return _generate(types.Content(parts=[
+        types.Part(file_data=types.FileData(file_uri=url), video_metadata=types.VideoMetadata(fps=fps)),
+        types.Part(text=prompt),
+    ]), settings.VIDEO_ANALYSIS_TOKEN_ESTIMATE)
+
+
+def _cached_analysis(key: List[Any], compute: Any) -> str:
+    """Return a stored analysis, or compute it once (concurrent identical requests share the call) and store it."""
+    key = json.dumps(key)
+    try:
+        store = _analysis_store()
+    except Exception as e:
+        logger.warning(f"Video analysis cache unavailable: {e}")
+        store = None
+    entry = store.get(key) if store is not None else None
+    if entry is not None:
+        analysis_counters["cached"] += 1
+        return entry[0]
+
+    def run() -> str:
+        text = compute()
+        if text and store is not None:
+            store.set(key, text, ttl=settings.VIDEO_ANALYSIS_CACHE_TTL)
+        return text
+
+    return analysis_flight.do(key, run)
+
+
+def analyze_video(url: str, prompt: str, fps: Optional[float] = None) -> str:
+    """Answer `prompt` by sending the video to Gemini, cached per video, prompt and fps."""
+    fps = fps or settings.VIDEO_ANALYSIS_FPS
+    return _cached_analysis(["prompt", _video_key(url), " ".join(prompt.split()), fps], lambda: _watch(url, prompt, fps))
+
+
+def video_summary(url: str, fps: Optional[float] = None) -> str:
+    """Structured summary of a video, produced by one video analysis and then stored."""
+    fps = fps or settings.VIDEO_ANALYSIS_FPS
+    return _cached_analysis(["summary", _video_key(url), fps], lambda: _watch(url, VIDEO_SUMMARY_PROMPT, fps))
+
+
+def answer_from_summary(url: str, prompt: str, fps: Optional[float] = None) -> str:
+    """Answer `prompt` with a text-only request over the video's stored summary, without re-sending the video."""
+    summary = video_summary(url, fps)
+
+    def answer() -> str:
+        analysis_counters["summary_answers"] += 1
+        question = (
+            f"Answer the question using only this summary of the video {url}. "
+            f"If the summary does not contain the answer, say so.\n\n{summary}\n\nQuestion: {prompt}"
+        )
+        return _generate(question, estimate_request_tokens([{"content": question}]))
+
+    return _cached_analysis(["summary-answer", _video_key(url), " ".join(prompt.split()), fps or settings.VIDEO_ANALYSIS_FPS], answer)
+
+
+def youtube_stats() -> Dict[str, Any]:
+    """Cache hit rates and quota usage of the YouTube tools."""
+    return {
+        "api_cache": api_cache.stats(),
+        "quota": quota.stats(),
+        "transcript_cache": {"hits": transcript_cache.hits, "misses": transcript_cache.misses},
+        "video_analysis": dict(analysis_counters),
+    }
@@ -5,7 +5,12 @@ from .deps import init_components
 init_components()
 
 # Import routes after initialization
-from .routes import chat, transcribe, tts, system, sessions, agents
+from .routes import chat, transcribe, tts, system, sessions, agents, metrics, events
+from dexter.agents.browser_pool import browser_pool
+from dexter.agents.pdf import shutdown_pdf_pool
+from dexter.agents.process_pool import shutdown_pool
+from dexter.config.settings import settings
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +30,26 @@ app.include_router(tts.router)
 app.include_router(system.router)
 app.include_router(sessions.router)
 app.include_router(agents.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
+
+@app.on_event("startup")
+async def warm_browsers():
+    # Start the browser agent's Chrome instances in the background so the first run finds them ready
+    if settings.BROWSER_WARM_ON_STARTUP:
+        threading.Thread(target=browser_pool.warm, name="browser-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+async def close_browsers():
+    browser_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_pdf_pool():
+    shutdown_pdf_pool()
+
+@app.on_event("shutdown")
+async def close_agent_process_pool():
+    shutdown_pool()
 
 @app.get("/")
 async def root():
@@ -1,15 +1,16 @@
-import threading, uuid
-from fastapi import APIRouter, HTTPException
+import asyncio, json
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-from dexter.agents.agents_executors import AGENTS
-from concurrent.futures import Future
+from dexter.agents.agents_executors import AGENTS, executor
+from dexter.agents.scheduler import SchedulerSaturatedError
+from dexter.service.agent_run_store import FINISHED_STATUSES, get_run_store
+from dexter.service.agent_run_tracker import get_run_tracker
+from dexter.config.settings import settings
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
-active_agents: Dict[str, Future] = {}
-agent_results: Dict[str, Dict[str, Any]] = {}
-
 class AgentRequest(BaseModel):
     agent_name: str
     task: str
@@ -19,53 +20,134 @@ class AgentResponse(BaseModel):
     agent_id: str
     status: str = "started"
     message: str
+    queue_position: int = 0
 
 class AgentStatusResponse(BaseModel):
     agent_id: str
     status: str
     result: Optional[str] = None
     error: Optional[str] = None
+    queue_position: Optional[int] = None
+    result_size: int = 0
+    result_truncated: bool = False
 
 class AgentListResponse(BaseModel):
     agents: List[str]
     status: str = "success"
 
+class AgentRunSummary(BaseModel):
+    run_id: str
+    agent_type: str
+    task: Optional[str] = None
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result_size: int = 0
+
+class AgentRunListResponse(BaseModel):
+    runs: List[AgentRunSummary]
+    total: int
+    offset: int
+    limit: int
+    status: str = "success"
+
+class AgentResultResponse(BaseModel):
+    agent_id: str
+    result: Optional[str] = None
+    status: str = "success"
+
 @router.get("/", response_model=AgentListResponse)
 async def list_agents():
     return AgentListResponse(agents=list(AGENTS.keys()))
 
+@router.get("/runs", response_model=AgentRunListResponse)
+async def list_agent_runs(offset: int = 0, limit: int = 20, status: Optional[str] = None, agent_type: Optional[str] = None):
+    """Paginated run history, newest first; results are fetched separately."""
+    limit = max(1, min(limit, 100))
+    runs, total = get_run_store().list(offset=offset, limit=limit, status=status, agent_type=agent_type)
+    return AgentRunListResponse(runs=[AgentRunSummary(**run) for run in runs], total=total, offset=offset, limit=limit)
+
 @router.post("/execute", response_model=AgentResponse)
 async def execute_agent(request: AgentRequest):
     if request.agent_name not in AGENTS:
         raise HTTPException(status_code=404, detail=f"Agent '{request.agent_name}' not found")
 
-    agent_id = str(uuid.uuid4())
-    future = AGENTS[request.agent_name](request.task, request.additional_args)
-    active_agents[agent_id] = future
-
-    def monitor_completion() -> None:
-        try:
-            result = future.result()
-            agent_results[agent_id] = {"status": "completed", "result": result}
-        except Exception as e:
-            agent_results[agent_id] = {"status": "failed", "error": str(e)}
-        finally:
-            active_agents.pop(agent_id, None)
-
-    threading.Thread(target=monitor_completion, daemon=True).start()
+    try:
+        future = AGENTS[request.agent_name](request.task, request.additional_args)
+    except SchedulerSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    agent_id = future.run_id
+    get_run_tracker().track(future, request.agent_name, request.task)
+    queue_position = executor.queue_position(future)
+    if queue_position:
+        return AgentResponse(agent_id=agent_id, status="queued", queue_position=queue_position, message=f"Agent '{request.agent_name}' queued at position {queue_position}")
     return AgentResponse(agent_id=agent_id, message=f"Agent '{request.agent_name}' started successfully")
 
 @router.get("/{agent_id}/status", response_model=AgentStatusResponse)
 async def get_agent_status(agent_id: str):
-    if agent_id in active_agents:
-        return AgentStatusResponse(agent_id=agent_id, status="running")
-    if agent_id in agent_results:
-        result_data = agent_results[agent_id]
-        return AgentStatusResponse(agent_id=agent_id, status=result_data["status"], result=result_data.get("result"), error=result_data.get("error"))
-    raise HTTPException(status_code=404, detail="Agent execution not found")
+    future = get_run_tracker().get(agent_id)
+    if future is not None:
+        if future.token.cancelled:
+            return AgentStatusResponse(agent_id=agent_id, status="cancelled")
+        queue_position = executor.queue_position(future)
+        if queue_position:
+            return AgentStatusResponse(agent_id=agent_id, status="queued", queue_position=queue_position)
+        if not future.done():
+            return AgentStatusResponse(agent_id=agent_id, status="running")
+    run = get_run_store().get(agent_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Agent execution not found")
+    return AgentStatusResponse(agent_id=agent_id, status=run["status"], result=run["result_preview"], error=run["error"],
+                               result_size=run["result_size"], result_truncated=run["result_truncated"])
+
+@router.get("/{agent_id}/events")
+async def stream_agent_events(agent_id: str, offset: int = 0, last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """
+    Server-sent event stream of a run's progress: status changes and one event per agent step.
+    Resumes after `offset` (or the Last-Event-ID header) and ends with the final status event.
+    """
+    store = get_run_store()
+    if store.get(agent_id, preview_chars=0) is None:
+        raise HTTPException(status_code=404, detail="Agent execution not found")
+    if last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+
+    async def event_stream():
+        seq, idle = offset, 0.0
+        while True:
+            events = await asyncio.to_thread(store.events_since, agent_id, seq)
+            for event in events:
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["type"] == "status" and event["data"]["status"] in FINISHED_STATUSES:
+                    return
+            if events:
+                idle = 0.0
+                continue
+            await asyncio.sleep(settings.AGENT_EVENT_POLL_SECONDS)
+            idle += settings.AGENT_EVENT_POLL_SECONDS
+            if idle >= settings.EVENT_HEARTBEAT_SECONDS:
+                if await asyncio.to_thread(store.get, agent_id, 0) is None:
+                    return  # The run was deleted or evicted while streaming
+                yield ": keepalive\n\n"
+                idle = 0.0
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/{agent_id}/result", response_model=AgentResultResponse)
+async def get_agent_result(agent_id: str):
+    """Full result of a finished run, for results too large for the status preview."""
+    if get_run_store().get(agent_id, preview_chars=0) is None:
+        raise HTTPException(status_code=404, detail="Agent execution not found")
+    return AgentResultResponse(agent_id=agent_id, result=get_run_store().get_result(agent_id))
 
 @router.delete("/{agent_id}")
 async def cancel_agent(agent_id: str) -> Dict[str, str]:
-    active_agents.pop(agent_id, None)
-    agent_results.pop(agent_id, None)
-    return {"status": "success", "message": f"Agent {agent_id} cancelled/cleaned up"}
+    future = get_run_tracker().get(agent_id)
+    if future is not None and executor.cancel(future):
+        # The run stops at its next step; the tracker records the final "cancelled" status
+        return {"status": "success", "message": f"Agent {agent_id} cancelled"}
+    get_run_store().delete(agent_id)
+    return {"status": "success", "message": f"Agent {agent_id} cleaned up"}
@@ -9,6 +9,7 @@ class ChatMessage(BaseModel):
     message: str
     base64_data: str | None = None
     file_type: str | None = None
+    voice: bool = False
 
 class ChatResponse(BaseModel):
     response: str
@@ -18,6 +19,14 @@ class NewConversationResponse(BaseModel):
     status: str = "success"
     message: str
 
+def _run_turn(formatted_message: list, base64_data: str | None, file_type: str | None, voice: bool) -> str:
+    """Run a turn and read its reply under the turn lock, so a background agent result delivery cannot replace it."""
+    with llm.turn_lock:
+        llm.llm_input(formatted_message, base64_data, file_type, voice)
+        speech_text = getattr(llm, "speech_text", "")
+        complete_response = getattr(llm, "complete_response", "No response generated")
+        return speech_text or complete_response
+
 @router.post("/", response_model=ChatResponse)
 async def chat(request: ChatMessage) -> ChatResponse:
     try:
@@ -25,13 +34,11 @@ async def chat(request: ChatMessage) -> ChatResponse:
         loop = asyncio.get_event_loop()
 
         if request.base64_data:
-            await loop.run_in_executor(None, llm.llm_input, formatted_message, request.base64_data, request.file_type)
+            response = await loop.run_in_executor(None, _run_turn, formatted_message, request.base64_data, request.file_type, request.voice)
         else:
-            await loop.run_in_executor(None, llm.llm_input, formatted_message)
+            response = await loop.run_in_executor(None, _run_turn, formatted_message, None, None, request.voice)
 
-        speech_text = getattr(llm, "speech_text", "")
-        complete_response = getattr(llm, "complete_response", "No response generated")
-        return ChatResponse(response=speech_text or complete_response)
+        return ChatResponse(response=response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,32 @@
+import json
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Dict, Any, List, Optional
+from dexter.service.event_bus import event_bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+class EventListResponse(BaseModel):
+    events: List[Dict[str, Any]]
+    status: str = "success"
+
+@router.get("/")
+async def stream_events(last_event_id: int = 0, last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """Server-sent event stream of background results (e.g. finished agent tasks)."""
+    if last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    async def event_stream():
+        async for event in event_bus.subscribe(last_event_id):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/recent", response_model=EventListResponse)
+async def recent_events(after: int = 0):
+    """Buffered events newer than `after`, for clients that poll instead of streaming."""
+    return EventListResponse(events=event_bus.events_since(after))
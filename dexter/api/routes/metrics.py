@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+from ..deps import llm
+from dexter.agents.agents_executors import executor
+from dexter.agents.agent_pool import agent_pool_stats
+from dexter.agents.pdf import pdf_stats
+from dexter.agents.tools import visit_webpage, web_search
+from dexter.agents.youtube import youtube_stats
+from dexter.core.rate_limiter import rate_limiter_stats
+from dexter.utils.tool_output import tool_outputs
+from dexter.service.agent_run_tracker import get_run_tracker
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/")
+async def get_metrics() -> Dict[str, Any]:
+    """Runtime performance counters for the assistant's LLM pipeline."""
+    return {
+        "models": llm.router.stats(),
+        "hedging": llm.hedger.stats(),
+        "response_cache": llm.response_cache.stats(),
+        "circuit_breakers": {provider: breaker.snapshot() for provider, breaker in list(llm.breakers.items())},
+        "retry_budget": llm.retry_budget.stats(),
+        "rate_limits": rate_limiter_stats(),
+        "agent_scheduler": executor.stats(),
+        "agent_pools": agent_pool_stats(),
+        "youtube": youtube_stats(),
+        "web_search": web_search.stats(),
+        "visit_webpage": visit_webpage.stats(),
+        "tool_outputs": tool_outputs.stats(),
+        "pdf": pdf_stats(),
+        "agent_runs": get_run_tracker().stats(),
+    }
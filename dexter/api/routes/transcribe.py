@@ -1,4 +1,4 @@
-import io, os, tempfile, urllib.parse
+import asyncio, io, os, tempfile, urllib.parse
 import librosa
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
 from fastapi.responses import Response
@@ -14,6 +14,12 @@ class TranscriptionResponse(BaseModel):
     response: str
     status: str = "success"
 
+def _run_voice_turn(transcription_text: str) -> str:
+    """Run a voice turn and read its reply under the turn lock, off the event loop (see chat._run_turn)."""
+    with llm.turn_lock:
+        llm.llm_input([{"type": "text", "text": transcription_text}], voice_turn=True)
+        return getattr(llm, "complete_response", "No response generated")
+
 @router.post("/", response_model=None)
 async def transcribe_audio(audio_file: UploadFile = File(...), response_type: str = Form("text")) -> Union[TranscriptionResponse, Response]:
     try:
@@ -21,9 +27,8 @@ async def transcribe_audio(audio_file: UploadFile = File(...), response_type: st
         audio_array, sample_rate = librosa.load(io.BytesIO(audio_bytes), sr=16000)
         transcription_text = transcribe_audio_file(audio_array)
 
-        formatted_message = [{"type": "text", "text": transcription_text}]
-        llm.llm_input(formatted_message)
-        llm_response = getattr(llm, "complete_response", "No response generated")
+        loop = asyncio.get_event_loop()
+        llm_response = await loop.run_in_executor(None, _run_voice_turn, transcription_text)
 
         if response_type == "audio":
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
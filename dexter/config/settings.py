@@ -30,7 +30,162 @@ class Settings:
     MAX_RETRY_ATTEMPTS: int = 4
     RETRY_MIN_WAIT: int = 1
     RETRY_MAX_WAIT: int = 10
-    
+
+    # Rate Limit Settings
+    # Per provider API key, shared by the assistant, the agents and video analysis (defaults: Gemini free tier)
+    RATE_LIMITS: dict[str, dict[str, float]] = {
+        "gemini": {
+            "requests_per_minute": float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15")),
+            "tokens_per_minute": float(os.getenv("GEMINI_TOKENS_PER_MINUTE", "1000000")),
+        },
+    }
+    RATE_LIMIT_INTERACTIVE_RESERVE: float = 0.2  # Share of each bucket background agents may not use
+    RATE_LIMIT_EXPECTED_OUTPUT_TOKENS: int = 500  # Added to a request's input estimate until real usage is known
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 120.0
+    RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS: float = 5.0  # A user turn waits this long before failing over to the next model
+    RATE_LIMIT_429_PAUSE_SECONDS: float = 10.0  # Pause after a 429 without Retry-After
+    RATE_LIMIT_STATE_PATH: Path = Path(os.getenv("RATE_LIMIT_STATE_PATH", DATA_DIR / "rate_limits.sqlite3"))  # Buckets shared with agent worker processes
+
+    # Circuit Breaker and Retry Budget Settings
+    CIRCUIT_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_RECOVERY_SECONDS: float = 30.0
+    RETRY_BUDGET_RATIO: float = 0.2  # Retries earned per request
+    RETRY_BUDGET_BURST: float = 5.0
+
+    # Model Routing Settings
+    FALLBACK_MODELS: list[str] = [m.strip() for m in os.getenv("FALLBACK_MODELS", "cerebras/llama-3.3-70b").split(",") if m.strip()]
+    MODEL_DEADLINE_SECONDS: float = float(os.getenv("MODEL_DEADLINE_SECONDS", "8"))
+    ROUTER_LATENCY_WINDOW: int = 50
+    ROUTER_MIN_SAMPLES: int = 5
+    ROUTER_MAX_ERROR_RATE: float = 0.5
+    ROUTE_SHORT_TURNS_TO_FASTEST: bool = os.getenv("ROUTE_SHORT_TURNS_TO_FASTEST", "false").lower() == "true"
+    SHORT_TURN_MAX_CHARS: int = 120
+
+    # Hedged Request Settings
+    LLM_HEDGING_ENABLED: bool = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+    HEDGE_DELAY_PERCENTILE: float = 95
+    HEDGE_DEFAULT_DELAY_SECONDS: float = 2.0
+    HEDGE_MIN_DELAY_SECONDS: float = 0.3
+    HEDGE_MAX_FRACTION: float = 0.2  # Hedges per request, capped at 1.0 so load never more than doubles
+    HEDGE_MAX_BURST: float = 3.0
+
+    # Response Cache Settings
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.9
+    RESPONSE_CACHE_DEFAULT_TTL: int = 24 * 3600
+    RESPONSE_CACHE_CONTEXT_MESSAGES: int = 2
+    # Intent -> (regex over the normalized prompt, TTL in seconds); a TTL of 0 disables caching
+    RESPONSE_CACHE_INTENT_TTLS: dict[str, tuple[str, int]] = {
+        "clock": (r"\b(time|clock|date|what day)\b", 0),
+        "weather": (r"\b(weather|forecast|temperature|rain|sunny)\b", 15 * 60),
+        "news": (r"\b(news|latest|today|tonight|tomorrow|score|price|stock)\b", 5 * 60),
+        "reports": (r"\b(reports?|results?|agents?)\b", 60 * 60),
+    }
+    RESPONSE_CACHE_AGENT_INVALIDATES: list[str] = ["reports"]
+
+    # Agent Result Delivery Settings
+    PUSH_AGENT_RESULTS: bool = os.getenv("PUSH_AGENT_RESULTS", "true").lower() == "true"
+    EVENT_REPLAY_SIZE: int = 100
+    EVENT_HEARTBEAT_SECONDS: float = 15.0
+
+    # Agent Scheduler Settings
+    AGENT_MAX_WORKERS: int = 4
+    AGENT_MAX_QUEUE_DEPTH: int = 16
+    AGENT_MAX_DEFERRED: int = 32  # Background runs held back once the queue is full, before any is rejected
+    AGENT_DEFER_MIN_PRIORITY: int = 2  # Runs of this priority or lower (auchan, report) may be deferred
+    AGENT_PRIORITIES: dict[str, int] = {"test": 0, "youtube": 1, "auchan": 2, "report": 3}  # Lower runs first
+    AGENT_CONCURRENCY_LIMITS: dict[str, int] = {"auchan": 1, "report": 2}  # One shared browser for auchan
+    AGENT_PRIORITY_AGING_SECONDS: float = 60.0  # Queued runs gain one priority level per interval
+
+    # Agent Memory Settings
+    AGENT_MEMORY_TOKEN_BUDGET: int = 16000  # Default cap on an agent's step history, per MemoryCompactor
+    # Tools memoized per agent run; only side-effect-free ones (search_products navigates the browser)
+    AGENT_MEMOIZED_TOOLS: list[str] = ["web_search", "visit_webpage", "search_youtube_videos", "get_video_transcript", "watch_youtube_video"]
+
+    # Agent Pool Settings
+    AGENT_POOL_SIZE: int = 4  # Instances per agent type; matches AGENT_MAX_WORKERS so runs never wait for one
+    AGENT_POOL_SIZES: dict[str, int] = {"auchan": 1}
+    AGENT_POOL_ACQUIRE_TIMEOUT: float = 300.0
+
+    # Browser Pool Settings
+    BROWSER_POOL_SIZE: int = 1  # Warm Chrome instances; helium drives one browser per process
+    BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+    BROWSER_MAX_AGE_SECONDS: float = 30 * 60  # Browsers are recycled after this long or BROWSER_MAX_USES runs
+    BROWSER_MAX_USES: int = 20
+    BROWSER_ACQUIRE_TIMEOUT: float = 300.0
+    BROWSER_WARM_ON_STARTUP: bool = os.getenv("BROWSER_WARM_ON_STARTUP", "false").lower() == "true"  # Otherwise Chrome starts on first use
+    PAGE_IDLE_TIMEOUT: float = 3.0  # Max wait for the page to settle before a step's screenshot
+    PAGE_IDLE_QUIET_SECONDS: float = 0.2  # DOM and network must be unchanged this long to count as idle
+    SCREENSHOT_MAX_SIZE: int = 768  # Screenshots are downscaled to fit this box before entering agent memory
+    SCREENSHOT_JPEG_QUALITY: int = 70
+
+    # YouTube Tool Settings
+    TRANSCRIPT_CACHE_DIR: Path = DATA_DIR / "cache" / "transcripts"
+    TRANSCRIPT_FETCH_CONCURRENCY: int = 4
+    TRANSCRIPT_PREVIEW_CHARS: int = 1000  # Search results carry this much of each transcript unless full ones are asked for
+    TRANSCRIPT_MISSING_TTL_SECONDS: int = 24 * 3600  # How long "no transcript" answers are cached
+    YOUTUBE_CACHE_MAX_ENTRIES: int = 512
+    YOUTUBE_CACHE_TTLS: dict[str, int] = {"search": 3600, "videos": 15 * 60}  # Statistics change faster than search results
+    YOUTUBE_CACHE_DEFAULT_TTL: int = 3600
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    VIDEO_ANALYSIS_MODEL: str = "models/gemini-2.0-flash"
+    VIDEO_ANALYSIS_FPS: float = 0.5
+    VIDEO_ANALYSIS_CACHE_PATH: Path = DATA_DIR / "cache" / "video_analysis.sqlite3"
+    VIDEO_ANALYSIS_CACHE_TTL: int = 30 * 24 * 3600  # A published video does not change
+    VIDEO_ANALYSIS_TOKEN_ESTIMATE: int = 30000  # Rate-limit estimate for one video request, corrected by its usage
+
+    # Web Search Cache Settings
+    WEB_SEARCH_CACHE_PATH: Path = Path(os.getenv("WEB_SEARCH_CACHE_PATH", DATA_DIR / "cache" / "web_search.sqlite3"))
+    WEB_SEARCH_CACHE_MAX_ENTRIES: int = 256
+    WEB_SEARCH_CACHE_TTLS: dict[str, int] = {"duckduckgo": 6 * 3600, "bing": 6 * 3600}
+    WEB_SEARCH_CACHE_DEFAULT_TTL: int = 3600
+
+    # Web Page Store Settings
+    PAGE_STORE_DIR: Path = Path(os.getenv("PAGE_STORE_DIR", DATA_DIR / "cache" / "pages"))
+    PAGE_STORE_MAX_BYTES: int = 200 * 1024 * 1024
+    PAGE_STORE_FRESH_SECONDS: int = 10 * 60  # Younger pages are served without contacting the origin
+
+    # PDF Extraction Settings
+    PDF_CACHE_DIR: Path = DATA_DIR / "cache" / "pdf_text"
+    PDF_PARALLEL_MIN_PAGES: int = 40  # Smaller documents are extracted on the calling thread
+    PDF_EXTRACT_WORKERS: int = min(4, os.cpu_count() or 1)
+    PDF_PAGES_PER_TASK: int = 20
+
+    # Image Download Settings
+    IMAGE_DOWNLOAD_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_DOWNLOAD_TIMEOUT: int = 30
+    IMAGE_DOWNLOAD_CONCURRENCY: int = 4  # Parallel downloads per download_images call
+
+    # Tool Output Compaction Settings
+    TOOL_OUTPUT_TOKEN_BUDGETS: dict[str, int] = {"visit_webpage": 2000, "web_search": 800}  # Per tool called by the assistant's code
+    TOOL_OUTPUT_DEFAULT_BUDGET: int = 3000
+    TOOL_OUTPUT_CHUNK_TOKENS: int = 200  # Size of the chunks ranked against the user's request
+    TOOL_OUTPUT_PAGE_TOKENS: int = 2000  # Page size of read_tool_output
+    TOOL_OUTPUT_MAX_STORED: int = 64
+    TOOL_OUTPUT_RETENTION_SECONDS: int = 3600
+
+    # HTTP Client Settings
+    HTTP_POOL_CONNECTIONS: int = 16  # Hosts kept in the connection pool
+    HTTP_POOL_MAXSIZE: int = 16  # Keep-alive connections per host
+    HTTP_USER_AGENT: str = "Mozilla/5.0 (compatible; Dexter/1.0)"
+
+    # Process Pool Settings
+    PROCESS_POOL_AGENTS: list[str] = [a.strip() for a in os.getenv("PROCESS_POOL_AGENTS", "").split(",") if a.strip()]  # Opt-in, e.g. "report"
+    PROCESS_POOL_WORKERS: int = 2
+    PROCESS_POOL_MAX_RUNS_PER_WORKER: int = 10  # Workers are replaced after this many runs to cap memory growth
+
+    # Agent Run Store Settings
+    AGENT_RUN_STORE_PATH: Path = Path(os.getenv("AGENT_RUN_STORE_PATH", DATA_DIR / "agent_runs.sqlite3"))
+    AGENT_RUN_TTL_SECONDS: int = 7 * 24 * 3600
+    AGENT_RUN_MAX_RUNS: int = 500
+    AGENT_RESULT_PREVIEW_CHARS: int = 2000
+
+    # Agent Progress Event Settings
+    AGENT_EVENT_POLL_SECONDS: float = 0.5  # How often the event stream checks the store for new events
+    AGENT_EVENT_THUMBNAIL_SIZE: int = 320  # Max width/height of screenshot thumbnails in step events
+    AGENT_EVENT_OBSERVATION_CHARS: int = 500
+
     # Audio/TTS Settings
     TTS_MODEL_PATH: Path = MODELS_DIR / "tts" / "en_US-hfc_male-medium.onnx"
     AUDIO_SAMPLE_RATE: int = 24000
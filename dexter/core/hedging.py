@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from litellm import acompletion, stream_chunk_builder
+
+from .model_router import ModelStats
+from .rate_limiter import estimate_request_tokens, get_rate_limiter
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Attempt:
+    """A single streamed completion whose first token is observable before it finishes."""
+
+    def __init__(self, model: str, kwargs: dict[str, Any]):
+        self.model = model
+        self.start_time = time.time()
+        self.first_token_latency: float | None = None
+        self.first_token = asyncio.Event()
+        self.task = asyncio.create_task(self._run(kwargs))
+
+    async def _run(self, kwargs: dict[str, Any]) -> Any:
+        stream = await acompletion(model=self.model, stream=True, **kwargs)
+        chunks = []
+        try:
+            async for chunk in stream:
+                if not self.first_token.is_set():
+                    self.first_token_latency = time.time() - self.start_time
+                    self.first_token.set()
+                chunks.append(chunk)
+        finally:
+            await _close_stream(stream)
+        return stream_chunk_builder(chunks, messages=kwargs.get("messages"))
+
+    @property
+    def started(self) -> bool:
+        """True once the attempt produced a token or terminated."""
+        return self.first_token.is_set() or self.task.done()
+
+    @property
+    def failed(self) -> bool:
+        return self.task.done() and not self.task.cancelled() and self.task.exception() is not None
+
+
+async def _close_stream(stream: Any) -> None:
+    """Best-effort release of the HTTP connection behind a LiteLLM stream."""
+    for target in (stream, getattr(stream, "completion_stream", None)):
+        aclose = getattr(target, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+            return
+
+
+async def _wait_started(attempts: list[_Attempt], timeout: float | None = None) -> None:
+    """Wait until any attempt has produced a token or terminated."""
+    waiters = [asyncio.create_task(a.first_token.wait()) for a in attempts] + [a.task for a in attempts]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters[:len(attempts)]:
+            waiter.cancel()
+
+
+class Hedger:
+    """
+    Hedged LLM requests for tail-latency reduction.
+
+    The primary model is streamed; if it has produced no token after the hedge delay
+    (a percentile of that model's observed time-to-first-token), a duplicate request
+    is sent to an alternate model. Whichever produces tokens first wins and the other
+    request is cancelled. Hedges draw from a token bucket refilled by HEDGE_MAX_FRACTION
+    per request, so with at most one hedge per request load can never more than double.
+    A hedge is also only sent if the alternate model's rate limiter has capacity right
+    now, so hedging never waits on, or eats into, a provider's rate limit, and if the
+    caller's `admit` callback (e.g. the alternate's circuit breaker) lets it through.
+    """
+
+    def __init__(self, max_fraction: float | None = None, percentile: float | None = None):
+        fraction = max_fraction if max_fraction is not None else settings.HEDGE_MAX_FRACTION
+        self.max_fraction = min(max(fraction, 0.0), 1.0)
+        self.percentile = percentile if percentile is not None else settings.HEDGE_DELAY_PERCENTILE
+        self._budget = 1.0
+        self._ttft: dict[str, ModelStats] = {}
+        self._counters = {"requests": 0, "hedges_fired": 0, "hedge_wins": 0, "hedge_losses": 0, "budget_denied": 0, "rate_limited": 0, "not_admitted": 0}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start (once) the background event loop all hedged requests run on."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-hedging", daemon=True).start()
+            return self._loop
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for a first token from `model` before hedging."""
+        with self._lock:
+            stats = self._ttft.get(model)
+            if stats is None or len(stats.latencies) < settings.ROUTER_MIN_SAMPLES:
+                return settings.HEDGE_DEFAULT_DELAY_SECONDS
+            return max(stats.percentile(self.percentile), settings.HEDGE_MIN_DELAY_SECONDS)
+
+    def _record_first_token(self, attempt: _Attempt) -> None:
+        if attempt.first_token_latency is None:
+            return
+        with self._lock:
+            stats = self._ttft.setdefault(attempt.model, ModelStats(settings.ROUTER_LATENCY_WINDOW))
+            stats.record(attempt.first_token_latency, success=True)
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._budget = min(self._budget + self.max_fraction, settings.HEDGE_MAX_BURST)
+
+    def _try_acquire_hedge(self, hedge_model: str, kwargs: dict[str, Any], admit: Callable[[], bool] | None) -> bool:
+        with self._lock:
+            if self._budget < 1.0:
+                self._counters["budget_denied"] += 1
+                return False
+            self._budget -= 1.0
+
+        # The limiter may block on its state file, so it is consulted outside the lock
+        denied = None
+        if admit is not None and not admit():
+            denied = "not_admitted"
+        else:
+            limiter = get_rate_limiter(hedge_model)
+            if limiter is not None and not limiter.try_acquire(estimate_request_tokens(kwargs.get("messages", []))):
+                denied = "rate_limited"
+
+        with self._lock:
+            if denied is not None:
+                self._budget += 1.0
+                self._counters[denied] += 1
+                return False
+            self._counters["hedges_fired"] += 1
+            return True
+
+    def _count_outcome(self, hedge_won: bool) -> None:
+        with self._lock:
+            self._counters["hedge_wins" if hedge_won else "hedge_losses"] += 1
+
+    async def _race(self, model: str, hedge_model: str, admit: Callable[[], bool] | None, kwargs: dict[str, Any]) -> tuple[Any, str]:
+        primary = _Attempt(model, kwargs)
+        await _wait_started([primary], timeout=self.hedge_delay(model))
+        if primary.started or not self._try_acquire_hedge(hedge_model, kwargs, admit):
+            response = await primary.task
+            self._record_first_token(primary)
+            return response, model
+
+        logger.info(f"No token from {model} after hedge delay, hedging to {hedge_model}")
+        hedge = _Attempt(hedge_model, kwargs)
+        attempts = [primary, hedge]
+        winner = None
+        while winner is None:
+            await _wait_started(attempts)
+            for attempt in list(attempts):
+                if attempt.failed:
+                    attempts.remove(attempt)
+                elif attempt.started:
+                    winner = attempt
+                    break
+            if not attempts:
+                # Both failed before producing a token: surface the primary's error
+                raise primary.task.exception()
+
+        for attempt in (primary, hedge):
+            if attempt is winner:
+                continue
+            if not attempt.task.done():
+                attempt.task.cancel()
+            elif not attempt.task.cancelled():
+                attempt.task.exception()
+        self._count_outcome(hedge_won=winner is hedge)
+        response = await winner.task
+        self._record_first_token(winner)
+        return response, winner.model
+
+    def complete(self, model: str, hedge_model: str, admit: Callable[[], bool] | None = None, **kwargs: Any) -> tuple[Any, str]:
+        """
+        Run a hedged completion and return the response with the model that produced it.
+        `admit` is called only when the hedge is about to be sent; returning False skips it.
+        """
+        self._count_request()
+        future = asyncio.run_coroutine_threadsafe(self._race(model, hedge_model, admit, kwargs), self._get_loop())
+        return future.result()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hedge counters and the current per-model hedge delays."""
+        with self._lock:
+            counters = dict(self._counters)
+            models = list(self._ttft)
+        counters["delays"] = {model: self.hedge_delay(model) for model in models}
+        return counters
@@ -2,21 +2,34 @@ from datetime import datetime
 from litellm import completion
 from ..utils.common import extract_code_from_text, format_content, generate_tools_prompt, run_extracted_code, generate_agents_prompt
 from .prompts import build_system_prompt
+from .model_router import ModelRouter, available_models, provider_of
+from .hedging import Hedger
+from .rate_limiter import INTERACTIVE, current_lane, estimate_request_tokens, get_rate_limiter
+from .response_cache import ResponseCache
+from .resilience import CircuitBreaker, CircuitOpenError, RetryBudget, classify_error, retry_after_seconds, PROVIDER_ERRORS, RATE_LIMITED, RETRYABLE_ERRORS, UNEXPECTED
 from ..config.settings import settings
 import logging
+import random
+import threading
 import time
 from smolagents import WebSearchTool, VisitWebpageTool
 from dexter.agents.agents import test_agent, youtube_agent, auchan_agent, report_agent
-from concurrent.futures import Future
-from tenacity import retry, stop_after_attempt, wait_exponential
+from dexter.agents.tools import read_tool_output
+from concurrent.futures import Future, ThreadPoolExecutor
 from dexter.service.history_manager import HistoryManager
-from typing import Any
+from dexter.service.event_bus import event_bus
+from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
 class LLM:
     _instance: 'LLM' = None
     model: str
+    router: ModelRouter
+    hedger: Hedger
+    response_cache: ResponseCache
+    breakers: dict[str, CircuitBreaker]
+    retry_budget: RetryBudget
     tools: str
     agents: str
     system_prompt: str
@@ -27,13 +40,21 @@ class LLM:
     history: list[dict[str, Any]] | None
     timestamp_mode: bool
     pending_tasks: list[Future]
+    task_queries: dict[Future, str]
     session_tag: str | None
+    turn_lock: threading.RLock
+    result_executor: ThreadPoolExecutor
 
     def __new__(cls, *args, **kwargs) -> 'LLM':
         if cls._instance is None:
             cls._instance = super(LLM, cls).__new__(cls)
             cls._instance.model = settings.DEFAULT_MODEL
-            cls._instance.tools = generate_tools_prompt([WebSearchTool, VisitWebpageTool])
+            cls._instance.router = ModelRouter([cls._instance.model, *available_models(settings.FALLBACK_MODELS)])
+            cls._instance.hedger = Hedger()
+            cls._instance.response_cache = ResponseCache()
+            cls._instance.breakers = {provider_of(m): CircuitBreaker(provider_of(m)) for m in cls._instance.router.models}
+            cls._instance.retry_budget = RetryBudget()
+            cls._instance.tools = generate_tools_prompt([WebSearchTool, VisitWebpageTool, read_tool_output])
             cls._instance.agents = generate_agents_prompt([test_agent, youtube_agent, auchan_agent, report_agent])
             cls._instance.system_prompt = build_system_prompt(
                 memories=[],
@@ -47,28 +68,88 @@ class LLM:
             cls._instance.history = None
             cls._instance.timestamp_mode = True
             cls._instance.pending_tasks = []
+            cls._instance.task_queries = {}  # The user request each pending task serves
             cls._instance.session_tag = None
+            cls._instance.turn_lock = threading.RLock()
+            cls._instance.result_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-results")
 
         return cls._instance
 
+    @staticmethod
+    def _task_result(task: Future) -> Any:
+        """Return a finished task's result, or an error message if it raised."""
+        try:
+            result = task.result()
+            logger.info(f"Agent task completed with result: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Agent task completed with error: {e}")
+            return f"Task error: {str(e)}"
+
     def _check_completed_tasks(self) -> None:
         """Check for completed tasks from agents and process their results."""
         completed_tasks: list[tuple[int, Any]] = []
         for i, task in enumerate(self.pending_tasks):
             if task.done():
-                try:
-                    result = task.result()
-                    logger.info(f"Agent task completed with result: {result}")
-                    completed_tasks.append((i, result))
-                except Exception as e:
-                    logger.error(f"Agent task completed with error: {e}")
-                    completed_tasks.append((i, f"Task error: {str(e)}"))
+                completed_tasks.append((i, self._task_result(task)))
         
         if completed_tasks:
             combined_results = "\n".join([f"Result from agent task to convey to user: {str(result)}" for i, result in completed_tasks])
+            queries = []
             for i, _ in reversed(completed_tasks):
-                self.pending_tasks.pop(i)
-            self.llm_input(format_content(combined_results))
+                queries.append(self.task_queries.pop(self.pending_tasks.pop(i), ""))
+            self.response_cache.invalidate(settings.RESPONSE_CACHE_AGENT_INVALIDATES)
+            self.llm_input(format_content(combined_results), cacheable=False, query=" ".join(dict.fromkeys(reversed(queries))))
+
+    def _current_conversation(self) -> tuple[str | None, str | None]:
+        return self.history_manager.history_file, self.session_tag
+
+    def _track_task(self, task: Future, query: str = "") -> None:
+        """Queue an agent task for `query`; with push delivery its result is delivered as soon as it finishes."""
+        self.pending_tasks.append(task)
+        self.task_queries[task] = query
+        if settings.PUSH_AGENT_RESULTS:
+            conversation = self._current_conversation()
+            task.add_done_callback(lambda done: self.result_executor.submit(self._deliver_task_result, done, conversation))
+
+    def _deliver_task_result(self, task: Future, conversation: tuple[str | None, str | None]) -> None:
+        """
+        Run the follow-up turn for a finished agent task in the conversation that started it
+        and publish the reply on the event bus. Runs on the result executor, serialized with
+        user turns by the turn lock.
+        """
+        with self.turn_lock:
+            if task not in self.pending_tasks:
+                return
+            self.pending_tasks.remove(task)
+            query = self.task_queries.pop(task, "")
+            result = self._task_result(task)
+            self.response_cache.invalidate(settings.RESPONSE_CACHE_AGENT_INVALIDATES)
+
+            saved_state = (self.history_manager.history_file, self.history, self.session_tag, self.new_history)
+            saved_response = (self.complete_response, self.speech_text)
+            switched = conversation != self._current_conversation() or self.new_history
+            reply = None
+            try:
+                if switched:
+                    self.history_manager.history_file, self.session_tag = conversation
+                    self.history = self.history_manager.load_history()
+                    self.new_history = False
+                self.llm_input(format_content(f"Result from agent task to convey to user: {str(result)}"), cacheable=False, query=query)
+                reply = self.speech_text or self.complete_response
+            except Exception as e:
+                logger.error(f"Failed to deliver agent task result: {e}")
+            finally:
+                if switched:
+                    self.history_manager.history_file, self.history, self.session_tag, self.new_history = saved_state
+                self.complete_response, self.speech_text = saved_response
+
+        event_bus.publish("agent_result", {
+            "result": str(result),
+            "response": reply,
+            "history_file": conversation[0],
+            "session_tag": conversation[1],
+        })
 
     def _prepare_input_file_content(self, base64_data: str, file_type: str) -> dict[str, Any]:
         """Prepare file content with appropriate MIME type for multimodal messages."""
@@ -99,22 +180,145 @@ class LLM:
         else:
             return {"role": "user", "content": user_text}
 
-    @retry(
-        stop=stop_after_attempt(settings.MAX_RETRY_ATTEMPTS),
-        wait=wait_exponential(multiplier=1, min=settings.RETRY_MIN_WAIT, max=settings.RETRY_MAX_WAIT),
-        before_sleep=lambda retry_state: logger.warning(f"API call failed (attempt {retry_state.attempt_number}/{settings.MAX_RETRY_ATTEMPTS}). Error: {retry_state.outcome.exception()}. Retrying in {retry_state.next_action.sleep} seconds...")
-    )
-    def _send_message_with_retry(self, messages: list[dict[str, Any]]) -> Any:
-        """Send message with tenacity retry logic for any API errors."""
-        return completion(
-            model=self.model,
+    def _breaker(self, model: str) -> CircuitBreaker:
+        provider = provider_of(model)
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(provider)
+        return self.breakers[provider]
+
+    def _hedge_admission(self, hedge_model: str, probes: list[CircuitBreaker]) -> Callable[[], bool]:
+        """Build the hedger's admit callback: take `hedge_model`'s breaker slot when the hedge fires, noting it in `probes`."""
+        hedge_breaker = self._breaker(hedge_model)
+
+        def admit() -> bool:
+            if not hedge_breaker.allow_request():
+                return False
+            probes.append(hedge_breaker)
+            return True
+        return admit
+
+    @staticmethod
+    def _settle(model: str, estimate: int, tokens: Any) -> None:
+        """Correct the rate limiter of `model` with the usage the provider reported, if any."""
+        limiter = get_rate_limiter(model)
+        if limiter is not None and isinstance(tokens, int):
+            limiter.settle(estimate, tokens)
+
+    def _send_message_with_retry(self, messages: list[dict[str, Any]], short_turn: bool = False) -> Any:
+        """
+        Send message to the router's models in order, failing over to the next model
+        when a call errors or exceeds the per-model deadline. Providers whose circuit
+        breaker is open are skipped without a network call. Once every model has failed,
+        the round is retried only for retryable errors, after jittered backoff or the
+        provider's Retry-After, and only while the shared retry budget allows it.
+        Each call first waits for capacity in its provider's shared rate limiter; a model
+        whose limiter has none in time is failed over. User turns wait only
+        RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS while another model is left to try.
+        """
+        prefer_fastest = short_turn and settings.ROUTE_SHORT_TURNS_TO_FASTEST
+        request_kwargs = dict(
             messages=messages,
             temperature=settings.TEMPERATURE,
             max_tokens=settings.MAX_TOKENS,
             top_p=settings.TOP_P,
             tools=[],
-            tool_choice="auto"
+            tool_choice="auto",
+            timeout=settings.MODEL_DEADLINE_SECONDS
         )
+        estimate = estimate_request_tokens(messages)
+        lane = current_lane()
+        self.retry_budget.record_request()
+        attempt = 1
+        while True:
+            candidates = self.router.candidates(prefer_fastest=prefer_fastest)
+            last_error: Exception | None = None
+            retryable = False
+            retry_afters: list[float] = []
+            for index, model in enumerate(candidates):
+                breaker = self._breaker(model)
+                if not breaker.allow_request():
+                    logger.info(f"Skipping model {model}: circuit for {breaker.name} is {breaker.state}")
+                    continue
+                limiter = get_rate_limiter(model)
+                if limiter is not None:
+                    try:
+                        # The last candidate waits the full time: there is nothing left to fail over to
+                        has_fallback = index < len(candidates) - 1
+                        wait = settings.RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS if lane == INTERACTIVE and has_fallback else None
+                        limiter.acquire(estimate, lane, wait)
+                    except TimeoutError as e:
+                        # No call was made: give back a half-open probe slot
+                        breaker.release()
+                        logger.warning(f"Skipping model {model}: {e}")
+                        last_error = e
+                        continue
+                # Breakers whose half-open probe slot a fired hedge took
+                hedge_probes = []
+                start_time = time.time()
+                try:
+                    if settings.LLM_HEDGING_ENABLED:
+                        # Hedge to the next candidate its breaker would let through, or duplicate to the same model if there is none
+                        hedge_model = next((m for m in candidates[index + 1:] if self._breaker(m).can_request()), model)
+                        admit = self._hedge_admission(hedge_model, hedge_probes) if hedge_model != model else None
+                        response, answered_by = self.hedger.complete(model, hedge_model, admit, **request_kwargs)
+                    else:
+                        response, answered_by = completion(model=model, **request_kwargs), model
+                except Exception as e:
+                    for hedge_breaker in hedge_probes:
+                        hedge_breaker.release()
+                    elapsed = time.time() - start_time
+                    error_class = classify_error(e)
+                    if error_class == UNEXPECTED:
+                        # Not a provider failure: another model would fail the same way
+                        breaker.release()
+                        raise
+                    retry_after = retry_after_seconds(e)
+                    self.router.record_failure(model, elapsed)
+                    if limiter is not None and error_class == RATE_LIMITED:
+                        limiter.throttled(retry_after)
+                    if error_class in PROVIDER_ERRORS:
+                        breaker.record_failure(retry_after)
+                    else:
+                        # The provider answered, the request itself was rejected
+                        breaker.record_success()
+                    if error_class in RETRYABLE_ERRORS:
+                        retryable = True
+                        if retry_after is not None:
+                            retry_afters.append(retry_after)
+                    logger.warning(f"Model {model} failed ({error_class}) after {elapsed:.2f} seconds, failing over. Error: {e}")
+                    last_error = e
+                    continue
+                elapsed = time.time() - start_time
+                self.router.record_success(answered_by, elapsed)
+                self._breaker(answered_by).record_success()
+                usage = getattr(response, "usage", None)
+                if answered_by != model:
+                    # The abandoned primary had not answered by then: keep it as a slow sample so routing learns from it
+                    self.router.record_success(model, elapsed)
+                    breaker.release()
+                    # The cancelled primary was only charged for its input
+                    self._settle(model, estimate, getattr(usage, "prompt_tokens", None))
+                else:
+                    for hedge_breaker in hedge_probes:
+                        hedge_breaker.release()
+                self._settle(answered_by, estimate, getattr(usage, "total_tokens", None))
+                return response
+
+            if last_error is None:
+                raise CircuitOpenError(f"All LLM providers are unavailable: {', '.join(sorted(self.breakers))}")
+            if not retryable or attempt >= settings.MAX_RETRY_ATTEMPTS:
+                raise last_error
+            backoff = random.uniform(0, min(settings.RETRY_MAX_WAIT, settings.RETRY_MIN_WAIT * 2 ** (attempt - 1)))
+            delay = max(min(retry_afters, default=0.0), backoff)
+            if delay > settings.RETRY_MAX_WAIT:
+                logger.warning(f"Providers asked to retry after {delay:.1f} seconds, failing fast")
+                raise last_error
+            if not self.retry_budget.try_acquire():
+                logger.warning("Retry budget exhausted, failing fast")
+                raise last_error
+            logger.warning(f"All models failed (attempt {attempt}/{settings.MAX_RETRY_ATTEMPTS}). Retrying in {delay:.2f} seconds...")
+            time.sleep(delay)
+            attempt += 1
 
     def _add_timestamp_if_enabled(self, text: str) -> str:
         """
@@ -133,8 +337,34 @@ class LLM:
                 speech_text = speech_text.replace(f"{code_block}\n{extracted_code}\n```", "")
         return speech_text
 
-    def llm_input(self, question_type_dict: list[dict[str, str]], base64_data: str | None = None, file_type: str | None = None) -> None:
-        """Interact with the model using a pure-text conversation approach."""
+    def _get_response_text(self, messages: list[dict[str, Any]], prompt: str, cacheable: bool, short_turn: bool) -> str:
+        """Return the assistant reply, served from the response cache when enabled and possible."""
+        use_cache = cacheable and settings.RESPONSE_CACHE_ENABLED
+        if use_cache:
+            cached = self.response_cache.lookup(prompt, self.system_prompt, self.history)
+            if cached is not None:
+                logger.info("Serving response from response cache")
+                return cached
+
+        response = self._send_message_with_retry(messages, short_turn=short_turn)
+        response_text = response.choices[0].message.content
+        if use_cache:
+            self.response_cache.store(prompt, self.system_prompt, self.history, response_text)
+        return response_text
+
+    def llm_input(self, question_type_dict: list[dict[str, str]], base64_data: str | None = None, file_type: str | None = None, voice_turn: bool = False, cacheable: bool = True, query: str | None = None) -> None:
+        """
+        Interact with the model using a pure-text conversation approach.
+
+        Internal turns (tool and agent results) pass cacheable=False so only user prompts
+        are looked up in and stored to the response cache, and pass the `query` of the user
+        request they follow up on (by default the turn's own prompt). Turns are serialized
+        by `turn_lock`, shared with background delivery of agent results.
+        """
+        with self.turn_lock:
+            self._run_turn(question_type_dict, base64_data, file_type, voice_turn, cacheable, query)
+
+    def _run_turn(self, question_type_dict: list[dict[str, str]], base64_data: str | None, file_type: str | None, voice_turn: bool, cacheable: bool, query: str | None) -> None:
         self.complete_response = None
         self.speech_text = None
 
@@ -148,8 +378,10 @@ class LLM:
             self.history_manager.get_history_file(new_history=False)
             self.history = self.history_manager.load_history()
         
-        user_text = question_type_dict[0]['text']
-        user_text = self._add_timestamp_if_enabled(user_text)
+        prompt = question_type_dict[0]['text']
+        query = prompt if query is None else query
+        short_turn = voice_turn and base64_data is None and len(prompt) <= settings.SHORT_TURN_MAX_CHARS
+        user_text = self._add_timestamp_if_enabled(prompt)
 
         self.history[0] = {"role": "system", "content": self.system_prompt}
 
@@ -159,12 +391,11 @@ class LLM:
         messages.append(user_message)
 
         start_time = time.time()
-        response = self._send_message_with_retry(messages)
+        self.complete_response = self._get_response_text(messages, prompt, cacheable and base64_data is None, short_turn)
         end_time = time.time()
         time_taken = end_time - start_time
         logger.info(f"Time taken for response generation: {time_taken} seconds")
         
-        self.complete_response = response.choices[0].message.content
         logger.info("Dexter: " + self.complete_response)
         extracted_code = extract_code_from_text(self.complete_response)
         
@@ -182,13 +413,13 @@ class LLM:
             if self.session_tag:
                 self.history_manager.save_to_session(self.session_tag, user_msg, assistant_msg, self.system_prompt)
 
-            execution_results = run_extracted_code(extracted_code)
+            execution_results = run_extracted_code(extracted_code, query)
             
             if isinstance(execution_results, Future):
                 logger.info("Adding Future task to pending tasks list")
-                self.pending_tasks.append(execution_results)
+                self._track_task(execution_results, query)
             else:
-                self.llm_input(format_content(execution_results))
+                self.llm_input(format_content(execution_results), cacheable=False, query=query)
             return
         
         logger.info("Adding assistant response to history")
@@ -205,6 +436,6 @@ class LLM:
 
         logger.info("Saved updated history to file")
 
-        # Check for completed tasks at the end of interaction
+        # Fallback for tasks not yet handed over by push delivery (or with it disabled)
         self._check_completed_tasks()
         return
\ No newline at end of file
@@ -0,0 +1,121 @@
+import logging
+import threading
+from collections import deque
+from typing import Any
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Provider prefix (as used by LiteLLM model ids) -> settings attribute holding its API key
+PROVIDER_API_KEYS = {
+    "gemini": "GEMINI_API_KEY",
+    "cerebras": "CEREBRAS_API_KEY",
+    "huggingface": "HUGGINGFACE_API_KEY",
+}
+
+
+def provider_of(model: str) -> str:
+    """Return the LiteLLM provider prefix of a model id (e.g. 'gemini' for 'gemini/gemini-2.0-flash')."""
+    return model.split("/", 1)[0] if "/" in model else model
+
+
+def available_models(models: list[str]) -> list[str]:
+    """Drop duplicates and models whose provider API key is known but not configured."""
+    result = []
+    for model in models:
+        if model in result:
+            continue
+        key_attr = PROVIDER_API_KEYS.get(provider_of(model))
+        if key_attr is not None and not getattr(settings, key_attr, ""):
+            logger.info(f"Skipping model {model}: {key_attr} is not configured")
+            continue
+        result.append(model)
+    return result
+
+
+class ModelStats:
+    """Rolling latency and outcome window for a single model."""
+
+    def __init__(self, window: int):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: float, success: bool) -> None:
+        if success:
+            self.latencies.append(latency)
+        self.outcomes.append(success)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile of successful call latencies, or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "samples": len(self.outcomes),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class ModelRouter:
+    """
+    Orders an LLM model list for each request based on rolling latency and error statistics.
+
+    The configured order is the preference order. Models whose recent error rate exceeds
+    `max_error_rate` are moved to the back, and short voice turns can optionally be sent
+    to the model with the lowest observed p50 latency first.
+    """
+
+    def __init__(self, models: list[str], window: int | None = None, min_samples: int | None = None, max_error_rate: float | None = None):
+        self.models = list(models)
+        self.min_samples = min_samples if min_samples is not None else settings.ROUTER_MIN_SAMPLES
+        self.max_error_rate = max_error_rate if max_error_rate is not None else settings.ROUTER_MAX_ERROR_RATE
+        window = window if window is not None else settings.ROUTER_LATENCY_WINDOW
+        self._stats = {model: ModelStats(window) for model in self.models}
+        self._lock = threading.Lock()
+
+    def _is_unhealthy(self, model: str) -> bool:
+        stats = self._stats[model]
+        return len(stats.outcomes) >= self.min_samples and stats.error_rate > self.max_error_rate
+
+    def candidates(self, prefer_fastest: bool = False) -> list[str]:
+        """Return the models to try for a request, in order."""
+        with self._lock:
+            healthy = [m for m in self.models if not self._is_unhealthy(m)]
+            unhealthy = [m for m in self.models if self._is_unhealthy(m)]
+            if prefer_fastest:
+                measured = [m for m in healthy if len(self._stats[m].latencies) >= self.min_samples]
+                if measured:
+                    fastest = min(measured, key=lambda m: self._stats[m].percentile(50))
+                    healthy.remove(fastest)
+                    healthy.insert(0, fastest)
+            return healthy + unhealthy
+
+    def record_success(self, model: str, latency: float) -> None:
+        with self._lock:
+            self._stats[model].record(latency, success=True)
+
+    def record_failure(self, model: str, latency: float) -> None:
+        with self._lock:
+            self._stats[model].record(latency, success=False)
+
+    def percentile(self, model: str, pct: float) -> float | None:
+        with self._lock:
+            return self._stats[model].percentile(pct)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return p50/p95 latency, error rate and sample count per model."""
+        with self._lock:
+            return {model: self._stats[model].snapshot() for model in self.models}
@@ -63,6 +63,7 @@ You have access to YouTube search tools.
 Whenever you need to search for videos, if necessary search with several different queries to ensure a better coverage.
 The default args of the search_youtube_videos tool are generally good for most searches. Only use the other arguments if you know what you are doing.
 Refrain from analyzing the transcripts programmatically or using hardcoded keywords. Instead, read the transcript or watch the video if necessary to understand its content.
+If you have several questions about the same video, call watch_youtube_video with from_summary=True so the video is only watched once.
 Always include the video URLs as reference in the final answer.
 """
 
@@ -0,0 +1,311 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from smolagents import LiteLLMModel
+
+from .model_router import provider_of
+from .resilience import retry_after_seconds
+from ..agents.run_context import current_run
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258  # Gemini's cost of an image of at most 384 pixels a side
+WAIT_SLICE_SECONDS = 0.5
+
+
+def current_lane() -> str:
+    """Agent runs use the background lane; everything else (chat turns) is interactive."""
+    return BACKGROUND if current_run() is not None else INTERACTIVE
+
+
+def estimate_request_tokens(messages: list[Any], expected_output: int | None = None) -> int:
+    """Rough token count of a chat request (text at four characters per token, images at a flat rate) plus its expected output."""
+    tokens = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        if isinstance(content, str):
+            tokens += len(content) // CHARS_PER_TOKEN
+            continue
+        for part in content or []:
+            if isinstance(part, dict) and part.get("type") in ("image", "image_url"):
+                tokens += IMAGE_TOKENS
+            elif isinstance(part, dict):
+                tokens += len(str(part.get("text", ""))) // CHARS_PER_TOKEN
+    return tokens + (expected_output if expected_output is not None else settings.RATE_LIMIT_EXPECTED_OUTPUT_TOKENS)
+
+
+class _LaneStats:
+    def __init__(self):
+        self.requests = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.requests += 1
+        if wait > 0.001:
+            self.waited += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "waited": self.waited,
+            "avg_wait_seconds": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+@dataclass
+class _Bucket:
+    requests: float
+    tokens: float
+    refilled_at: float
+    paused_until: float
+    interactive_waiting_until: float
+    throttled: int
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for one API key: requests per minute and tokens per minute.
+
+    The buckets live in a SQLite file, so the API process and the agent process-pool
+    workers draw on one budget and see each other's lanes. Callers block in `acquire`
+    until both buckets hold enough. There are two lanes: while an interactive caller is
+    waiting no background caller is admitted, and background callers may not draw the last
+    RATE_LIMIT_INTERACTIVE_RESERVE fraction of either bucket, so chat turns stay responsive
+    during heavy agent use. Token use is estimated up front and corrected with the
+    provider's reported usage in `settle`. A 429 from the provider empties the buckets for
+    its Retry-After, pausing every caller at once instead of letting each retry on its own.
+    If the state file cannot be used, requests are let through rather than blocked.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float, path: Path | None = None, interactive_reserve: float | None = None):
+        self.name = name
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self.path = Path(path or settings.RATE_LIMIT_STATE_PATH)
+        self.reserve = interactive_reserve if interactive_reserve is not None else settings.RATE_LIMIT_INTERACTIVE_RESERVE
+        # Wait statistics are per process; the buckets are shared
+        self._stats = {lane: _LaneStats() for lane in LANES}
+        self._cond = threading.Condition()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    refilled_at REAL NOT NULL,
+                    paused_until REAL NOT NULL,
+                    interactive_waiting_until REAL NOT NULL,
+                    throttled INTEGER NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    @contextmanager
+    def _bucket(self) -> Iterator[_Bucket]:
+        """Lock the shared bucket across processes, refill it and write back any changes."""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT requests, tokens, refilled_at, paused_until, interactive_waiting_until, throttled "
+                    "FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                if row is None:
+                    bucket = _Bucket(self.request_capacity, self.token_capacity, now, 0.0, 0.0, 0)
+                else:
+                    bucket = _Bucket(*row)
+                    elapsed = max(0.0, now - bucket.refilled_at)
+                    bucket.requests = min(self.request_capacity, bucket.requests + elapsed * self.request_capacity / 60)
+                    bucket.tokens = min(self.token_capacity, bucket.tokens + elapsed * self.token_capacity / 60)
+                    bucket.refilled_at = now
+                yield bucket
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.name, bucket.requests, bucket.tokens,
+                     bucket.refilled_at, bucket.paused_until, bucket.interactive_waiting_until, bucket.throttled),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _delay(self, bucket: _Bucket, tokens: float, lane: str) -> float:
+        """Seconds until a request of `tokens` may be admitted in `lane`; 0 if it may go now."""
+        if bucket.refilled_at < bucket.paused_until:
+            return bucket.paused_until - bucket.refilled_at
+        if lane == BACKGROUND and bucket.refilled_at < bucket.interactive_waiting_until:
+            return WAIT_SLICE_SECONDS
+        reserve = self.reserve if lane == BACKGROUND else 0.0
+        request_deficit = 1 + reserve * self.request_capacity - bucket.requests
+        token_deficit = tokens + reserve * self.token_capacity - bucket.tokens
+        return max(0.0, request_deficit * 60 / self.request_capacity, token_deficit * 60 / self.token_capacity)
+
+    def _take(self, tokens: float, lane: str) -> float:
+        """Take capacity if it is available now and return 0, else return the delay (marking an interactive caller as waiting)."""
+        with self._bucket() as bucket:
+            delay = self._delay(bucket, tokens, lane)
+            if delay <= 0:
+                bucket.requests -= 1
+                bucket.tokens -= tokens
+            elif lane == INTERACTIVE:
+                # Expires on its own, so a waiter that died never blocks the background lane for long
+                bucket.interactive_waiting_until = bucket.refilled_at + 2 * WAIT_SLICE_SECONDS
+            return delay
+
+    def acquire(self, tokens: int, lane: str = INTERACTIVE, timeout: float | None = None) -> float:
+        """
+        Block until a request of about `tokens` tokens may be sent; returns the seconds waited.
+        Raises TimeoutError after `timeout` (RATE_LIMIT_MAX_WAIT_SECONDS), and stops waiting
+        if the current agent run is cancelled.
+        """
+        timeout = timeout if timeout is not None else settings.RATE_LIMIT_MAX_WAIT_SECONDS
+        # A request larger than the whole bucket could never be admitted otherwise
+        tokens = min(tokens, self.token_capacity * (1 - self.reserve))
+        start = time.monotonic()
+        run = current_run()
+        while True:
+            if run is not None:
+                run.token.raise_if_cancelled()
+            try:
+                delay = self._take(tokens, lane)
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} rate limit state unavailable, not limiting: {e}")
+                delay = 0.0
+            if delay <= 0:
+                break
+            if time.monotonic() - start + delay > timeout:
+                raise TimeoutError(f"{self.name} rate limit: no capacity within {timeout:.0f} seconds")
+            with self._cond:
+                self._cond.wait(min(delay, WAIT_SLICE_SECONDS))
+        wait = time.monotonic() - start
+        with self._cond:
+            self._stats[lane].record(wait)
+        if wait > 1.0:
+            logger.info(f"Waited {wait:.1f} seconds for {self.name} rate limit capacity ({lane})")
+        return wait
+
+    def try_acquire(self, tokens: int, lane: str = INTERACTIVE) -> bool:
+        """Take capacity only if it is available right now (for optional requests such as hedges)."""
+        tokens = min(tokens, self.token_capacity * (1 - self.reserve))
+        try:
+            with self._bucket() as bucket:
+                if self._delay(bucket, tokens, lane) > 0:
+                    return False
+                bucket.requests -= 1
+                bucket.tokens -= tokens
+                return True
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} rate limit state unavailable: {e}")
+            return False
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the provider reported the request's real usage."""
+        try:
+            with self._bucket() as bucket:
+                bucket.tokens = min(self.token_capacity, bucket.tokens + estimated - actual)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not settle {self.name} rate limit usage: {e}")
+        with self._cond:
+            self._cond.notify_all()
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        """The provider answered 429: pause everyone for its Retry-After (or a default) and drain the buckets."""
+        pause = retry_after if retry_after else settings.RATE_LIMIT_429_PAUSE_SECONDS
+        try:
+            with self._bucket() as bucket:
+                bucket.throttled += 1
+                bucket.paused_until = max(bucket.paused_until, bucket.refilled_at + pause)
+                bucket.requests = min(bucket.requests, 0.0)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not pause {self.name} rate limit: {e}")
+        logger.warning(f"{self.name} returned 429, pausing all requests for {pause:.1f} seconds")
+
+    def stats(self) -> dict[str, Any]:
+        with self._bucket() as bucket:
+            available = {
+                "available_requests": round(bucket.requests, 2),
+                "available_tokens": round(bucket.tokens),
+                "throttled": bucket.throttled,
+            }
+        with self._cond:
+            lanes = {lane: stats.snapshot() for lane, stats in self._stats.items()}
+        return {"requests_per_minute": self.request_capacity, "tokens_per_minute": self.token_capacity, **available, "lanes": lanes}
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter | None:
+    """
+    Return the limiter of a model's provider, or None if RATE_LIMITS has no entry for it.
+    Every process using RATE_LIMIT_STATE_PATH shares the provider's buckets.
+    """
+    provider = provider_of(model)
+    limits = settings.RATE_LIMITS.get(provider)
+    if limits is None:
+        return None
+    with _limiters_lock:
+        if provider not in _limiters:
+            try:
+                _limiters[provider] = RateLimiter(provider, limits["requests_per_minute"], limits["tokens_per_minute"])
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"{provider} rate limit state unavailable, not limiting: {e}")
+                return None
+        return _limiters[provider]
+
+
+def rate_limiter_stats() -> dict[str, Any]:
+    """Return each limiter's stats; a limiter whose state file cannot be read is reported as unavailable."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    stats = {}
+    for name, limiter in sorted(limiters.items()):
+        try:
+            stats[name] = limiter.stats()
+        except sqlite3.Error as e:
+            stats[name] = {"available": False, "error": str(e)}
+    return stats
+
+
+class RateLimitedLiteLLMModel(LiteLLMModel):
+    """LiteLLMModel whose calls go through the provider's shared RateLimiter, in the caller's lane."""
+
+    def generate(self, messages: list[Any], *args: Any, **kwargs: Any) -> Any:
+        limiter = get_rate_limiter(self.model_id)
+        if limiter is None:
+            return super().generate(messages, *args, **kwargs)
+        estimate = estimate_request_tokens(messages)
+        limiter.acquire(estimate, current_lane())
+        try:
+            message = super().generate(messages, *args, **kwargs)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                limiter.throttled(retry_after_seconds(e))
+            raise
+        usage = message.token_usage
+        if usage is not None:
+            limiter.settle(estimate, usage.input_tokens + usage.output_tokens)
+        return message
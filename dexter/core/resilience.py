@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+from litellm.exceptions import APIConnectionError
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Error classes used for retry and circuit breaker decisions
+REQUEST_ERROR = "request"            # The request itself is invalid (400, 404, 422): never retried
+AUTH_ERROR = "auth"                  # The provider rejects our credentials (401, 403): never retried
+RATE_LIMITED = "rate_limited"        # 429: retried after Retry-After
+TRANSIENT = "transient"              # Timeouts, connection errors, 5xx: retried with backoff
+UNEXPECTED = "unexpected"            # Anything else, most likely a bug on our side: raised at once
+
+RETRYABLE_ERRORS = {RATE_LIMITED, TRANSIENT}
+# Errors that say something about the provider's health rather than about the request
+PROVIDER_ERRORS = {AUTH_ERROR, RATE_LIMITED, TRANSIENT}
+
+
+class CircuitOpenError(Exception):
+    """Raised when every candidate provider has an open circuit breaker."""
+
+
+def classify_error(error: Exception) -> str:
+    """Map an LLM call exception to one of the error classes, based on its type and HTTP status."""
+    if isinstance(error, (APIConnectionError, httpx.TransportError, TimeoutError, ConnectionError)):
+        return TRANSIENT
+    status = getattr(error, "status_code", None)
+    if not isinstance(status, int):
+        return UNEXPECTED
+    if status == 429:
+        return RATE_LIMITED
+    if status in (401, 403):
+        return AUTH_ERROR
+    if status == 408 or status >= 500:
+        return TRANSIENT
+    return REQUEST_ERROR
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Return the server-requested wait from Retry-After / retry-after-ms headers, if any."""
+    headers = getattr(error, "litellm_response_headers", None)
+    if not headers:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Closed: calls flow and consecutive provider failures are counted. After
+    `failure_threshold` of them the breaker opens and calls are rejected without
+    touching the network for `recovery_seconds` (or the provider's Retry-After).
+    Half-open: a single probe call is let through; success closes the breaker,
+    failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int | None = None, recovery_seconds: float | None = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_seconds = recovery_seconds if recovery_seconds is not None else settings.CIRCUIT_RECOVERY_SECONDS
+        self._state = self.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._counters = {"rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.time() >= self._open_until:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be made now; in half-open only one probe is allowed."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def can_request(self) -> bool:
+        """Like allow_request, but without taking the half-open probe slot."""
+        with self._lock:
+            state = self._current_state()
+            return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_in_flight)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot that ended without an outcome (e.g. a cancelled hedge)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Count a provider failure, opening the circuit at the threshold or when the provider asks us to back off."""
+        with self._lock:
+            self._failures += 1
+            if retry_after:
+                self._open(retry_after)
+            elif self._current_state() == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open(self.recovery_seconds)
+
+    def _open(self, seconds: float) -> None:
+        if self._state != self.OPEN:
+            self._counters["opened"] += 1
+            logger.warning(f"Circuit for {self.name} opened for {seconds:.1f} seconds after {self._failures} failures")
+        self._state = self.OPEN
+        self._open_until = max(self._open_until, time.time() + seconds)
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "open_for": round(max(self._open_until - time.time(), 0.0), 1) if state == self.OPEN else 0.0,
+                **self._counters,
+            }
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of traffic, shared by all providers.
+
+    Every request deposits `ratio` tokens (capped at `burst`) and every retry costs one,
+    so during an outage retries add at most `ratio` extra load instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float | None = None, burst: float | None = None):
+        self.ratio = ratio if ratio is not None else settings.RETRY_BUDGET_RATIO
+        self.burst = burst if burst is not None else settings.RETRY_BUDGET_BURST
+        self._tokens = self.burst
+        self._counters = {"requests": 0, "retries": 0, "denied": 0}
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._tokens = min(self._tokens + self.ratio, self.burst)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                self._counters["denied"] += 1
+                return False
+            self._tokens -= 1.0
+            self._counters["retries"] += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "tokens": round(self._tokens, 2)}
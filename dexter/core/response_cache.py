@@ -0,0 +1,199 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_PREFIX = re.compile(r"^\[\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}\]\s*")
+
+# Filler words down-weighted in prompt embeddings
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "can", "could", "dexter", "do", "does", "for", "hey", "i",
+    "is", "it", "like", "me", "my", "now", "of", "ok", "okay", "please", "right", "tell",
+    "the", "to", "what", "whats", "would", "you",
+}
+
+# Responses with a code block are run again when served (e.g. starting an agent)
+CODE_BLOCK = re.compile(r"```")
+
+# Words that make a prompt depend on the preceding turns ("and tomorrow?", "what about it?")
+CONTEXT_DEPENDENT = re.compile(r"^(and|also|what about|how about)\b|\b(it|that|this|these|those|they|them|he|she|him|her|there)\b")
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop the timestamp prefix and punctuation, and collapse whitespace."""
+    text = TIMESTAMP_PREFIX.sub("", text).lower().replace("'", "")
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def embed(text: str, dim: int = 512) -> np.ndarray:
+    """
+    Local hashed bag-of-features embedding: words plus character trigrams, hashed into
+    `dim` buckets and L2-normalized. Filler words are down-weighted so prompts compare
+    on what they ask about. Cheap, deterministic and needs no model download.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in text.split():
+        weight = 0.1 if word in STOPWORDS else 1.0
+        vector[zlib.crc32(word.encode()) % dim] += weight
+        padded = f"#{word.rstrip('s')}#"
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % dim] += 0.5 * weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _numbers(text: str) -> list[str]:
+    return re.findall(r"\d+", text)
+
+
+def _content_words(text: str) -> frozenset[str]:
+    return frozenset(word.rstrip("s") for word in text.split() if word not in STOPWORDS)
+
+
+@dataclass
+class CacheEntry:
+    response: str
+    normalized: str
+    context_hash: str
+    intent: str | None
+    expires_at: float
+    vector: np.ndarray
+    content_words: frozenset[str]
+    has_code: bool
+
+
+class ResponseCache:
+    """
+    Two-tier cache of assistant responses keyed on the user's prompt.
+
+    The exact tier matches the normalized prompt plus a hash of the relevant context
+    (system prompt, and the last turns when the prompt refers back to them). The
+    similarity tier compares local embeddings of prompts sharing that context and
+    accepts matches above `similarity_threshold` with the same content words and numbers,
+    so only rephrasings match. Responses containing code are only served by the exact
+    tier, as their code is executed again and a false match would run it for the wrong
+    request (e.g. start an agent on another topic). Intents
+    matched by RESPONSE_CACHE_INTENT_TTLS get their own TTL; a TTL of 0 is never cached.
+    """
+
+    def __init__(self, max_entries: int | None = None, similarity_threshold: float | None = None):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.similarity_threshold = similarity_threshold if similarity_threshold is not None else settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD
+        self._intents = [(name, re.compile(pattern), ttl) for name, (pattern, ttl) in settings.RESPONSE_CACHE_INTENT_TTLS.items()]
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._counters = {"lookups": 0, "exact_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def _classify(self, normalized: str) -> tuple[str | None, int]:
+        """Return the first matching intent and its TTL, or the default TTL."""
+        for name, pattern, ttl in self._intents:
+            if pattern.search(normalized):
+                return name, ttl
+        return None, settings.RESPONSE_CACHE_DEFAULT_TTL
+
+    def _context_hash(self, normalized: str, system_prompt: str, history: list[dict[str, Any]] | None) -> str:
+        context = [system_prompt]
+        if history and CONTEXT_DEPENDENT.search(normalized):
+            context.extend(str(message.get("content")) for message in history[-settings.RESPONSE_CACHE_CONTEXT_MESSAGES:])
+        return hashlib.sha256("\x1f".join(context).encode()).hexdigest()
+
+    @staticmethod
+    def _key(normalized: str, context_hash: str) -> str:
+        return hashlib.sha256(f"{context_hash}\x1f{normalized}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, system_prompt: str, history: list[dict[str, Any]] | None = None) -> str | None:
+        """Return a cached response for the prompt in this context, or None."""
+        normalized = normalize_prompt(prompt)
+        _, ttl = self._classify(normalized)
+        with self._lock:
+            self._counters["lookups"] += 1
+            if ttl <= 0:
+                self._counters["bypassed"] += 1
+                return None
+            context_hash = self._context_hash(normalized, system_prompt, history)
+            self._evict_expired()
+
+            entry = self._entries.get(self._key(normalized, context_hash))
+            if entry is not None:
+                self._entries.move_to_end(self._key(normalized, context_hash))
+                self._counters["exact_hits"] += 1
+                return entry.response
+
+            entry = self._most_similar(normalized, context_hash)
+            if entry is not None:
+                self._counters["similar_hits"] += 1
+                logger.info(f"Response cache similarity hit: '{normalized}' ~ '{entry.normalized}'")
+                return entry.response
+
+            self._counters["misses"] += 1
+            return None
+
+    def _most_similar(self, normalized: str, context_hash: str) -> CacheEntry | None:
+        content_words = _content_words(normalized)
+        candidates = [
+            e for e in self._entries.values()
+            if e.context_hash == context_hash and not e.has_code and e.content_words == content_words
+        ]
+        if not candidates:
+            return None
+        scores = np.stack([e.vector for e in candidates]) @ embed(normalized)
+        best = int(np.argmax(scores))
+        entry = candidates[best]
+        if scores[best] < self.similarity_threshold or _numbers(entry.normalized) != _numbers(normalized):
+            return None
+        return entry
+
+    def store(self, prompt: str, system_prompt: str, history: list[dict[str, Any]] | None, response: str) -> None:
+        """Cache a response unless its intent is marked as not cacheable."""
+        normalized = normalize_prompt(prompt)
+        intent, ttl = self._classify(normalized)
+        if ttl <= 0 or not normalized:
+            return
+        with self._lock:
+            context_hash = self._context_hash(normalized, system_prompt, history)
+            key = self._key(normalized, context_hash)
+            self._entries[key] = CacheEntry(
+                response, normalized, context_hash, intent, time.time() + ttl, embed(normalized),
+                _content_words(normalized), bool(CODE_BLOCK.search(response)),
+            )
+            self._entries.move_to_end(key)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[key]
+            self._counters["evictions"] += 1
+
+    def invalidate(self, intents: list[str] | None = None) -> int:
+        """Drop entries of the given intents (all entries if None) and return how many were dropped."""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if intents is None or e.intent in intents]
+            for key in keys:
+                del self._entries[key]
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters, hit rate and current size."""
+        with self._lock:
+            stats: dict[str, Any] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        served = stats["lookups"] - stats["bypassed"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["similar_hits"]) / served, 3) if served else 0.0
+        return stats
@@ -0,0 +1,194 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Columns returned by listings and status lookups; the full result is only read on demand
+SUMMARY_COLUMNS = "run_id, agent_type, task, status, created_at, started_at, finished_at, error, result_size"
+
+
+class AgentRunStore:
+    """
+    SQLite-backed store of agent runs: status, timings, result and error, plus each run's
+    progress events (status changes and per-step events) for streaming to clients.
+
+    Keeps the API process's memory flat however many agents run: results live on disk,
+    listings and status lookups only read a preview, and finished runs are evicted once
+    they are older than AGENT_RUN_TTL_SECONDS or beyond the newest AGENT_RUN_MAX_RUNS.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: Optional[int] = None, max_runs: Optional[int] = None):
+        self.path = Path(path or settings.AGENT_RUN_STORE_PATH)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AGENT_RUN_TTL_SECONDS
+        self.max_runs = max_runs if max_runs is not None else settings.AGENT_RUN_MAX_RUNS
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_runs (
+                    run_id TEXT PRIMARY KEY,
+                    agent_type TEXT NOT NULL,
+                    task TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    result_size INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_runs_created ON agent_runs (created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_run_events (
+                    run_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (run_id, seq)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, run_id: str, agent_type: str, task: str, status: str = "queued") -> None:
+        """Record a new run and evict expired ones."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO agent_runs (run_id, agent_type, task, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, agent_type, task, status, time.time()),
+            )
+            self._evict(conn)
+
+    def update(self, run_id: str, **fields: Any) -> None:
+        """Update status, timings, result or error of a run."""
+        if "result" in fields:
+            fields["result"] = None if fields["result"] is None else str(fields["result"])
+            fields["result_size"] = len(fields["result"] or "")
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE agent_runs SET {columns} WHERE run_id = ?", (*fields.values(), run_id))
+
+    def get(self, run_id: str, preview_chars: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return a run's summary with at most `preview_chars` of its result."""
+        preview_chars = preview_chars if preview_chars is not None else settings.AGENT_RESULT_PREVIEW_CHARS
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS}, substr(result, 1, ?) AS result_preview FROM agent_runs WHERE run_id = ?",
+                (preview_chars, run_id),
+            ).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run["result_truncated"] = run["result_size"] > len(run["result_preview"] or "")
+        return run
+
+    def get_result(self, run_id: str) -> Optional[str]:
+        """Load a run's full result."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM agent_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row["result"] if row else None
+
+    def list(self, offset: int = 0, limit: int = 20, status: Optional[str] = None, agent_type: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of run summaries, newest first, and the total matching count."""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if agent_type:
+            clauses.append("agent_type = ?")
+            params.append(agent_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM agent_runs {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {SUMMARY_COLUMNS} FROM agent_runs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def add_event(self, run_id: str, event_type: str, data: Dict[str, Any]) -> Optional[int]:
+        """
+        Append a progress event to a run and return its sequence number, or None if the run
+        is not in the store (e.g. agents started by the assistant rather than the API), whose
+        events would never be evicted. Safe to call from agent worker processes: the sequence
+        number is allocated inside the insert.
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                """INSERT INTO agent_run_events (run_id, seq, event_type, timestamp, data)
+                   SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM agent_run_events WHERE run_id = ?
+                   HAVING EXISTS (SELECT 1 FROM agent_runs WHERE run_id = ?)
+                   RETURNING seq""",
+                (run_id, event_type, time.time(), json.dumps(data, default=str), run_id, run_id),
+            ).fetchone()
+        return row["seq"] if row else None
+
+    def events_since(self, run_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return a run's events with a sequence number above `offset`, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT seq, event_type, timestamp, data FROM agent_run_events
+                   WHERE run_id = ? AND seq > ? ORDER BY seq LIMIT ?""",
+                (run_id, offset, limit),
+            ).fetchall()
+        return [{"seq": row["seq"], "type": row["event_type"], "timestamp": row["timestamp"], "data": json.loads(row["data"])} for row in rows]
+
+    def delete(self, run_id: str) -> bool:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM agent_run_events WHERE run_id = ?", (run_id,))
+            return conn.execute("DELETE FROM agent_runs WHERE run_id = ?", (run_id,)).rowcount > 0
+
+    def evict(self) -> int:
+        """Drop finished runs past the TTL or beyond the newest `max_runs`; returns how many were dropped."""
+        with self._lock, self._connect() as conn:
+            return self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        expired = conn.execute(
+            f"DELETE FROM agent_runs WHERE status IN ({placeholders}) AND created_at < ?",
+            (*FINISHED_STATUSES, time.time() - self.ttl_seconds),
+        ).rowcount
+        overflow = conn.execute(
+            f"""DELETE FROM agent_runs WHERE status IN ({placeholders}) AND run_id NOT IN (
+                    SELECT run_id FROM agent_runs ORDER BY created_at DESC LIMIT ?)""",
+            (*FINISHED_STATUSES, self.max_runs),
+        ).rowcount
+        if expired or overflow:
+            conn.execute("DELETE FROM agent_run_events WHERE run_id NOT IN (SELECT run_id FROM agent_runs)")
+            logger.info(f"Evicted {expired} expired and {overflow} overflow agent runs")
+        return expired + overflow
+
+
+_store: Optional[AgentRunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> AgentRunStore:
+    """Return the process-wide agent run store, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AgentRunStore()
+        return _store
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, Optional
+
+from ..agents.run_context import AgentCancelledError
+from ..config.settings import settings
+from ..core.model_router import ModelStats
+from .agent_run_store import AgentRunStore, get_run_store
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRunTracker:
+    """
+    Central bookkeeping for launched agent runs.
+
+    Each run's future gets a start callback and a done callback instead of a monitor thread
+    blocking on `future.result()`, so the number of threads stays flat however many runs are
+    in flight. The callbacks record status changes, timings and the outcome in the run store
+    and keep rolling queue-time and run-time statistics per agent type.
+    """
+
+    def __init__(self, store: Optional[AgentRunStore] = None):
+        self.store = store or get_run_store()
+        self.active: Dict[str, Future] = {}
+        self._queue_times: Dict[str, ModelStats] = {}
+        self._run_times: Dict[str, ModelStats] = {}
+        self._outcomes: Dict[str, int] = {"completed": 0, "failed": 0, "cancelled": 0}
+        self._lock = threading.Lock()
+
+    def track(self, future: Future, agent_type: str, task: str) -> None:
+        """Record a newly submitted run and follow it until it finishes."""
+        run_id = future.run_id
+        self.store.create(run_id, agent_type, task)
+        self.store.add_event(run_id, "status", {"status": "queued"})
+        with self._lock:
+            self.active[run_id] = future
+        future.add_start_callback(self._on_start)
+        future.add_done_callback(self._on_done)
+
+    def get(self, run_id: str) -> Optional[Future]:
+        """Return the future of an in-flight run."""
+        with self._lock:
+            return self.active.get(run_id)
+
+    def _on_start(self, future: Future) -> None:
+        queue_time = future.started_at - future.enqueued_at
+        with self._lock:
+            self._queue_times.setdefault(future.agent_type, ModelStats(settings.ROUTER_LATENCY_WINDOW)).record(queue_time, success=True)
+        self.store.update(future.run_id, status="running", started_at=future.started_at)
+        self.store.add_event(future.run_id, "status", {"status": "running", "queue_time": queue_time})
+
+    def _on_done(self, future: Future) -> None:
+        finished_at = time.time()
+        try:
+            outcome: Dict[str, Any] = {"status": "completed", "result": future.result()}
+        except (CancelledError, AgentCancelledError):
+            outcome = {"status": "cancelled"}
+        except Exception as e:
+            outcome = {"status": "failed", "error": str(e)}
+
+        run_time = finished_at - future.started_at if future.started_at else None
+        with self._lock:
+            self.active.pop(future.run_id, None)
+            self._outcomes[outcome["status"]] += 1
+            if run_time is not None:
+                stats = self._run_times.setdefault(future.agent_type, ModelStats(settings.ROUTER_LATENCY_WINDOW))
+                stats.record(run_time, success=outcome["status"] == "completed")
+
+        try:
+            self.store.update(future.run_id, started_at=future.started_at, finished_at=finished_at, **outcome)
+            self.store.add_event(future.run_id, "status", {"status": outcome["status"], "error": outcome.get("error"), "run_time": run_time})
+        except Exception as e:
+            logger.error(f"Could not record outcome of agent run {future.run_id}: {e}")
+        logger.info(f"{future.agent_type} run {future.run_id} {outcome['status']}" + (f" after {run_time:.2f} seconds" if run_time is not None else ""))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight count, outcome counters and queue/run time percentiles per agent type."""
+        with self._lock:
+            agent_types = set(self._queue_times) | set(self._run_times)
+            return {
+                **self._outcomes,
+                "active": len(self.active),
+                "agents": {
+                    agent_type: {
+                        "queue_time": self._queue_times[agent_type].snapshot() if agent_type in self._queue_times else None,
+                        "run_time": self._run_times[agent_type].snapshot() if agent_type in self._run_times else None,
+                    }
+                    for agent_type in sorted(agent_types)
+                },
+            }
+
+
+_tracker: Optional[AgentRunTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_run_tracker() -> AgentRunTracker:
+    """Return the process-wide agent run tracker, creating it on first use."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AgentRunTracker()
+        return _tracker
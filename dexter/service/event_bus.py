@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe channel for pushing server events to connected clients.
+
+    Events get increasing ids and the last `replay_size` are kept, so a client that
+    reconnects with the last id it saw receives what it missed. Publishing is thread-safe
+    and can be called from worker threads; subscribers are async iterators running on
+    the API event loop.
+    """
+
+    def __init__(self, replay_size: int | None = None):
+        self._events: deque[dict[str, Any]] = deque(maxlen=replay_size or settings.EVENT_REPLAY_SIZE)
+        self._next_id = 1
+        self._subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: dict[str, Any]) -> dict[str, Any]:
+        """Record an event and wake every subscriber."""
+        with self._lock:
+            event = {"id": self._next_id, "type": event_type, "timestamp": time.time(), "data": data}
+            self._next_id += 1
+            self._events.append(event)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's event loop is closed; it is removed when its iterator exits
+                pass
+        logger.info(f"Published {event_type} event {event['id']} to {len(subscribers)} subscribers")
+        return event
+
+    def events_since(self, last_event_id: int = 0) -> list[dict[str, Any]]:
+        """Return buffered events newer than `last_event_id`."""
+        with self._lock:
+            return [event for event in self._events if event["id"] > last_event_id]
+
+    async def subscribe(self, last_event_id: int = 0, heartbeat: float | None = None) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Yield missed events after `last_event_id`, then live events as they are published.
+        Yields None every `heartbeat` seconds without events so callers can keep the connection alive.
+        """
+        heartbeat = heartbeat or settings.EVENT_HEARTBEAT_SECONDS
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            backlog = [event for event in self._events if event["id"] > last_event_id]
+            self._subscribers.add(subscriber)
+
+        try:
+            for event in backlog:
+                last_event_id = event["id"]
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber[1].get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["id"] > last_event_id:
+                    last_event_id = event["id"]
+                    yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+event_bus = EventBus()
@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterator
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire after a per-entry TTL.
+
+    Holds at most `max_entries` values; the least recently used one is dropped first.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    Persistent string key/value tier with per-entry expiry, stored in SQLite.
+
+    Every process that opens the same file shares the entries (e.g. the API process and the
+    agent process-pool workers). Values are strings; callers serialize them. Expired entries
+    are deleted on open and every `purge_every` writes, so the file does not grow unbounded.
+    """
+
+    def __init__(self, path: Path, table: str = "cache", purge_every: int = 100):
+        self.path = Path(path)
+        self.table = table
+        self.purge_every = purge_every
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self.purge()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        """Return (value, expires_at) for a live entry, or None."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)", (key, value, time.time() + ttl))
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge()
+
+    def purge(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical work: while a call for a key is in flight, other
+    callers with the same key wait for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -4,6 +4,7 @@ from concurrent.futures import Future
 
 from smolagents.local_python_executor import LocalPythonExecutor
 from dexter.core.prompts import TOOLS_PROMPT_TEMPLATE, AGENTS_PROMPT_TEMPLATE
+from dexter.utils.tool_output import compact_output, tool_budget
 
 logger = logging.getLogger(__name__)
 
@@ -60,12 +61,13 @@ def extract_code_from_text(
     return None
 
 
-def run_extracted_code(code: str):
+def run_extracted_code(code: str, query: str = ""):
     """
     Extract and run code from text using custom executor.
 
     Args:
         code (str): Code to execute
+        query (str, optional): The user request the code serves; long outputs keep the parts most relevant to it
 
     Returns:
         concurrent.futures.Future or str: Returns Future if code creates one, otherwise returns result string
@@ -79,7 +81,8 @@ def run_extracted_code(code: str):
             return result.output
 
         logger.info("Code execution completed successfully")
-        return f"Code execution results: {result.output}"
+        output = f"Code execution results: {result.output}"
+        return compact_output(output, query, tool_budget(code), strip="visit_webpage" in code)
     except Exception as e:
         logger.error(f"Error executing code: {str(e)}")
         return f"Code execution results: {str(e)}"
@@ -0,0 +1,59 @@
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from dexter.config.settings import settings
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    """
+    Process-wide requests session for the web tools, so repeated requests to the same
+    hosts reuse pooled keep-alive connections instead of opening new ones.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=settings.HTTP_POOL_CONNECTIONS, pool_maxsize=settings.HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = settings.HTTP_USER_AGENT
+            _session = session
+        return _session
+
+
+def download_file(url: str, path: str | Path, max_bytes: int, content_type_prefix: str = "", timeout: float = 30) -> tuple[int, str]:
+    """
+    Stream `url` to `path` in chunks through the shared session, so the body is never held in
+    memory. Refuses responses whose Content-Type does not start with `content_type_prefix`
+    or whose body exceeds `max_bytes` (ValueError). The file only appears once complete.
+    Returns (bytes written, content type).
+    """
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    with http_session().get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type_prefix and content_type and not content_type.startswith(content_type_prefix):
+            raise ValueError(f"unexpected content type {content_type}")
+        if int(response.headers.get("Content-Length") or 0) > max_bytes:
+            raise ValueError(f"larger than the {max_bytes} byte limit")
+        written = 0
+        try:
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"larger than the {max_bytes} byte limit")
+                    f.write(chunk)
+            partial.replace(path)
+        finally:
+            partial.unlink(missing_ok=True)
+    return written, content_type
@@ -0,0 +1,143 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from dexter.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredPage:
+    url: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class PageStore:
+    """
+    Content-addressed store of fetched web pages and their markdown conversions.
+
+    Bodies and markdown are files named by the SHA-256 of the body, so pages with identical
+    content are stored and converted once. A SQLite index maps each URL to its content hash
+    and the validators (ETag, Last-Modified) needed to revalidate it. When the stored
+    content exceeds `max_bytes`, the least recently used URLs are dropped together with
+    content no other URL refers to.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.directory = Path(directory or settings.PAGE_STORE_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.PAGE_STORE_MAX_BYTES
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS contents (content_hash TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.directory / "index.sqlite3", timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _path(self, digest: str, suffix: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.{suffix}"
+
+    def lookup(self, url: str) -> Optional[StoredPage]:
+        """Return the stored entry for a URL and mark it as recently used."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return StoredPage(row["url"], row["content_hash"], row["etag"], row["last_modified"], row["fetched_at"])
+
+    def markdown(self, digest: str) -> Optional[str]:
+        try:
+            return self._path(digest, "md").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def has_content(self, digest: str) -> bool:
+        return self._path(digest, "md").exists()
+
+    def revalidated(self, url: str) -> None:
+        """Record that the origin confirmed the stored copy is still current."""
+        with self._connect() as conn:
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def put(self, url: str, body: bytes, markdown: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> str:
+        """Store a fetched page under its content hash and point the URL at it. Returns the content hash."""
+        digest = content_hash(body)
+        now = time.time()
+        with self._lock:
+            if not self.has_content(digest):
+                size = self._write(self._path(digest, "html"), body) + self._write(self._path(digest, "md"), markdown.encode("utf-8"))
+                with self._connect() as conn:
+                    conn.execute("INSERT OR REPLACE INTO contents (content_hash, size) VALUES (?, ?)", (digest, size))
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, digest, etag, last_modified, now, now),
+                )
+            self._evict()
+        return digest
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        return len(data)
+
+    def _evict(self) -> None:
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for row in conn.execute("SELECT url FROM pages ORDER BY accessed_at").fetchall():
+                conn.execute("DELETE FROM pages WHERE url = ?", (row["url"],))
+                for orphan in conn.execute(
+                    "SELECT content_hash, size FROM contents WHERE content_hash NOT IN (SELECT content_hash FROM pages)"
+                ).fetchall():
+                    conn.execute("DELETE FROM contents WHERE content_hash = ?", (orphan["content_hash"],))
+                    for suffix in ("html", "md"):
+                        self._path(orphan["content_hash"], suffix).unlink(missing_ok=True)
+                    total -= orphan["size"]
+                if total <= self.max_bytes:
+                    break
+        logger.info(f"Evicted pages from the page store down to {total} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            pages = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            contents, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM contents").fetchone()
+        return {"pages": pages, "contents": contents, "bytes": size, "max_bytes": self.max_bytes}
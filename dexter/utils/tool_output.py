@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from dexter.config.settings import settings
+from dexter.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4  # Rough average for English text; good enough for budgeting
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i in is it me my of on or so that the "
+    "this to was what when where which who why will with you your".split()
+)
+
+BOILERPLATE = re.compile(
+    r"cookie|skip to (main )?content|subscribe|newsletter|sign (in|up)|log ?in|all rights reserved|"
+    r"privacy policy|terms of (use|service)|share on|follow us|advertisement|back to top",
+    re.IGNORECASE,
+)
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def strip_boilerplate(markdown: str) -> str:
+    """
+    Drop navigation and page chrome from a markdown page: image-only and link-list lines,
+    short cookie/sign-in/footer lines and short lines repeated across the page.
+    """
+    lines = markdown.splitlines()
+    counts = Counter(line.strip() for line in lines if line.strip())
+    kept = []
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            kept.append("")
+            continue
+        text = MARKDOWN_LINK.sub(r"\1", stripped).strip("*-|#> ")
+        links = len(MARKDOWN_LINK.findall(stripped))
+        if not text and links:
+            continue
+        if links and len(text) < 0.5 * len(stripped) and (links > 1 or len(text) < 40):
+            continue
+        if len(stripped) < 120 and BOILERPLATE.search(text):
+            continue
+        if len(stripped) < 80 and counts[stripped] > 1 and not stripped.startswith("#"):
+            continue
+        kept.append(line.rstrip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """Split text into chunks of whole paragraphs, each at most about `max_chars` long."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _terms(text: str) -> List[str]:
+    return [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS and len(term) > 1]
+
+
+def rank_chunks(chunks: List[str], query: str) -> List[int]:
+    """Chunk indices ordered by relevance to the query (TF-IDF-like scoring), best first."""
+    query_terms = set(_terms(query))
+    chunk_terms = [Counter(_terms(chunk)) for chunk in chunks]
+    scores = []
+    for index, terms in enumerate(chunk_terms):
+        score = 0.0
+        for term in query_terms:
+            if terms[term]:
+                frequency = sum(1 for other in chunk_terms if other[term])
+                score += (1 + math.log(terms[term])) * math.log(1 + len(chunks) / frequency)
+        scores.append((-score, index))
+    return [index for _, index in sorted(scores)]
+
+
+class ToolOutputStore:
+    """
+    Keeps the full text of compacted tool outputs for TOOL_OUTPUT_RETENTION_SECONDS so the
+    assistant can page through it with `read_tool_output(ref)`, and counts tokens saved.
+    """
+
+    def __init__(self):
+        self.outputs = TTLCache(max_entries=settings.TOOL_OUTPUT_MAX_STORED, default_ttl=settings.TOOL_OUTPUT_RETENTION_SECONDS)
+        self._lock = threading.Lock()
+        self.compacted = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def keep(self, text: str) -> str:
+        ref = "out-" + hashlib.sha256(text.encode("utf-8")).hexdigest()[:10]
+        self.outputs.set(ref, text)
+        return ref
+
+    def read(self, ref: str, page: int = 0) -> Optional[str]:
+        """Return page `page` of a kept output (TOOL_OUTPUT_PAGE_TOKENS each), or None if unknown."""
+        text = self.outputs.get(ref)
+        if text is None:
+            return None
+        size = settings.TOOL_OUTPUT_PAGE_TOKENS * CHARS_PER_TOKEN
+        pages = max(1, math.ceil(len(text) / size))
+        part = text[page * size:(page + 1) * size]
+        if page + 1 < pages:
+            part += f"\n[Page {page + 1}/{pages}; read_tool_output('{ref}', page={page + 1}) for more]"
+        return part
+
+    def record(self, tokens_in: int, tokens_out: int) -> None:
+        with self._lock:
+            self.compacted += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "compacted": self.compacted,
+                "tokens_in": self.tokens_in,
+                "tokens_out": self.tokens_out,
+                "stored": len(self.outputs),
+            }
+
+
+tool_outputs = ToolOutputStore()
+
+
+def tool_budget(code: str) -> int:
+    """Token budget for the output of `code`: the sum of the budgets of the tools it calls."""
+    called = [name for name in settings.TOOL_OUTPUT_TOKEN_BUDGETS if re.search(rf"\b{name}\s*\(", code)]
+    if not called:
+        return settings.TOOL_OUTPUT_DEFAULT_BUDGET
+    return sum(settings.TOOL_OUTPUT_TOKEN_BUDGETS[name] for name in called)
+
+
+def compact_output(text: str, query: str = "", budget: Optional[int] = None, strip: bool = False) -> str:
+    """
+    Fit a tool output into `budget` tokens. Page boilerplate is removed first when `strip`
+    is set; if the text is still too long, the chunks most relevant to `query` are kept in
+    document order. Whenever the text is changed, the full text is stored for `read_tool_output`.
+    """
+    budget = budget or settings.TOOL_OUTPUT_DEFAULT_BUDGET
+    tokens_in = estimate_tokens(text)
+    if tokens_in <= budget:
+        return text
+
+    cleaned = strip_boilerplate(text) if strip else text
+    if estimate_tokens(cleaned) > budget:
+        chunks = chunk_text(cleaned, settings.TOOL_OUTPUT_CHUNK_TOKENS * CHARS_PER_TOKEN)
+        # The opening chunk usually carries the title and framing, so it is always kept
+        order = [0] + [index for index in rank_chunks(chunks, query) if index != 0] if query else range(len(chunks))
+        selected, used = [], 0
+        for index in order:
+            cost = estimate_tokens(chunks[index])
+            if used + cost <= budget:
+                selected.append(index)
+                used += cost
+        selected = sorted(selected) or [0]
+        parts = []
+        for position, index in enumerate(selected):
+            if position and index != selected[position - 1] + 1:
+                parts.append("[...]")
+            parts.append(chunks[index][:budget * CHARS_PER_TOKEN])
+        cleaned = "\n\n".join(parts)
+    if cleaned != text:
+        # Stripping can drop lines the heuristics mistook for chrome, so the original stays readable
+        ref = tool_outputs.keep(text)
+        cleaned += (
+            f"\n\n[Output shortened from ~{tokens_in} to ~{estimate_tokens(cleaned)} tokens; "
+            f"the full text is available with read_tool_output('{ref}')]"
+        )
+
+    tokens_out = estimate_tokens(cleaned)
+    tool_outputs.record(tokens_in, tokens_out)
+    logger.info(f"Compacted tool output from ~{tokens_in} to ~{tokens_out} tokens")
+    return cleaned
@@ -1,8 +1,29 @@
 import streamlit as st
 import requests
+import base64
+import json
 import time
 from datetime import datetime
 
+def _stream_agent_events(agent_id: str, offset: int = 0):
+    """Yield progress events of an agent run from the server's event stream, and None on keepalives."""
+    with requests.get(
+        f"http://localhost:8080/agents/{agent_id}/events",
+        params={"offset": offset},
+        stream=True,
+        timeout=(5, 60)
+    ) as response:
+        response.raise_for_status()
+        data_lines = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith(":"):
+                yield None
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+            elif not line and data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+
 def agents_component():
     """Streamlit component for launching and managing agents via API"""
     
@@ -113,94 +134,123 @@ def agents_component():
                     agent_data = response.json()
                     agent_id = agent_data["agent_id"]
                     
-                    st.success(f"✅ Agent launched successfully! ID: {agent_id}")
+                    if agent_data.get("status") == "queued":
+                        st.info(f"🕒 Agent queued at position {agent_data['queue_position']}. ID: {agent_id}")
+                    else:
+                        st.success(f"✅ Agent launched successfully! ID: {agent_id}")
                     
                     progress_container = st.container()
                     with progress_container:
-                        st.info("⏳ Agent is running... Checking status...")
+                        st.info("⏳ Agent is running... Streaming progress...")
                         progress_bar = st.progress(0)
                         status_text = st.empty()
+                        step_log = st.expander("Agent steps", expanded=True)
                         
-                        max_checks = 60
-                        check_count = 0
+                        deadline = time.time() + 300
+                        last_seq = 0
+                        final_status = None
+                        reconnects = 0
                         
-                        while check_count < max_checks:
+                        while final_status is None and time.time() < deadline:
                             try:
-                                status_response = requests.get(
-                                    f"http://localhost:8080/agents/{agent_id}/status",
-                                    timeout=10
-                                )
-                                
-                                if status_response.status_code == 200:
-                                    status_data = status_response.json()
-                                    
-                                    if status_data["status"] == "running":
-                                        progress = min((check_count + 1) * 100 // max_checks, 95)
-                                        progress_bar.progress(progress)
-                                        status_text.text(f"Agent running... ({check_count + 1}/{max_checks})")
-                                        time.sleep(5)
-                                        check_count += 1
-                                        
-                                    elif status_data["status"] == "completed":
-                                        progress_bar.progress(100)
-                                        status_text.text("Completed!")
-                                        
-                                        progress_container.empty()
-                                        
-                                        st.success("✅ Agent completed successfully!")
-                                        
-                                        st.subheader("📋 Results")
-                                        with st.expander("View Full Result", expanded=True):
-                                            st.markdown(status_data["result"])
-                                        
-                                        if "agent_results_history" not in st.session_state:
-                                            st.session_state.agent_results_history = []
-                                        
-                                        st.session_state.agent_results_history.append({
-                                            "agent": selected_agent,
-                                            "task": task_description,
-                                            "result": status_data["result"],
-                                            "success": True,
-                                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                        })
-                                        
-                                        requests.delete(f"http://localhost:8080/agents/{agent_id}")
-                                        break
+                                for event in _stream_agent_events(agent_id, last_seq):
+                                    if event is not None:
+                                        last_seq = event["seq"]
+                                        data = event["data"]
                                         
-                                    elif status_data["status"] == "failed":
-                                        progress_container.empty()
-                                        
-                                        st.error(f"❌ Agent failed: {status_data.get('error', 'Unknown error')}")
-                                        
-                                        if "agent_results_history" not in st.session_state:
-                                            st.session_state.agent_results_history = []
-                                        
-                                        st.session_state.agent_results_history.append({
-                                            "agent": selected_agent,
-                                            "task": task_description,
-                                            "error": status_data.get('error', 'Unknown error'),
-                                            "success": False,
-                                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                        })
-                                        
-                                        requests.delete(f"http://localhost:8080/agents/{agent_id}")
+                                        if event["type"] == "status":
+                                            if data["status"] == "queued":
+                                                status_text.text("Agent queued...")
+                                            elif data["status"] == "running":
+                                                status_text.text("Agent running...")
+                                            else:
+                                                final_status = data["status"]
+                                                break
+                                                
+                                        elif event["type"] == "step":
+                                            progress_bar.progress(min(data["step_number"] * 100 // 40, 95))
+                                            tools = ", ".join(data["tools"]) or "thinking"
+                                            status_text.text(f"Step {data['step_number']}: {tools}...")
+                                            with step_log:
+                                                details = [f"**Step {data['step_number']}** · {tools}"]
+                                                if data.get("duration") is not None:
+                                                    details.append(f"{data['duration']:.1f}s")
+                                                if data.get("input_tokens") is not None:
+                                                    details.append(f"{data['input_tokens']} → {data['output_tokens']} tokens")
+                                                st.markdown(" · ".join(details))
+                                                if data.get("error"):
+                                                    st.caption(f"⚠️ {data['error']}")
+                                                if data.get("screenshot"):
+                                                    st.image(base64.b64decode(data["screenshot"]))
+                                    
+                                    if time.time() >= deadline:
                                         break
                                         
-                                else:
-                                    st.error(f"❌ Failed to check agent status: {status_response.status_code}")
-                                    break
-                                    
                             except requests.exceptions.RequestException as e:
-                                st.error(f"❌ Connection error while checking status: {e}")
-                                break
+                                # Resume the stream from the last event seen
+                                reconnects += 1
+                                if reconnects > 3:
+                                    st.error(f"❌ Connection error while streaming progress: {e}")
+                                    break
+                                time.sleep(2)
                         
-                        else:
-                            # Timeout reached
+                        if final_status is None:
+                            if reconnects <= 3:
+                                # Timeout reached
+                                progress_container.empty()
+                                st.warning("⚠️ Agent execution timed out after 5 minutes")
+                                # Cancel the run on the server
+                                requests.delete(f"http://localhost:8080/agents/{agent_id}")
+                                
+                        elif final_status == "completed":
+                            progress_bar.progress(100)
+                            status_text.text("Completed!")
+                            
+                            status_data = requests.get(f"http://localhost:8080/agents/{agent_id}/status", timeout=10).json()
+                            result = status_data["result"]
+                            if status_data.get("result_truncated"):
+                                result = requests.get(f"http://localhost:8080/agents/{agent_id}/result", timeout=30).json()["result"]
+                            
+                            st.success("✅ Agent completed successfully!")
+                            
+                            st.subheader("📋 Results")
+                            with st.expander("View Full Result", expanded=True):
+                                st.markdown(result)
+                            
+                            if "agent_results_history" not in st.session_state:
+                                st.session_state.agent_results_history = []
+                            
+                            st.session_state.agent_results_history.append({
+                                "agent": selected_agent,
+                                "task": task_description,
+                                "result": result,
+                                "success": True,
+                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
+                            
+                        elif final_status == "cancelled":
                             progress_container.empty()
-                            st.warning("⚠️ Agent execution timed out after 5 minutes")
-                            # Clean up on server
-                            requests.delete(f"http://localhost:8080/agents/{agent_id}")
+                            st.warning("🛑 Agent run was cancelled")
+                            
+                        else:
+                            status_data = requests.get(f"http://localhost:8080/agents/{agent_id}/status", timeout=10).json()
+                            error = status_data.get("error") or "Unknown error"
+                            
+                            st.error(f"❌ Agent failed: {error}")
+                            
+                            if "agent_results_history" not in st.session_state:
+                                st.session_state.agent_results_history = []
+                            
+                            st.session_state.agent_results_history.append({
+                                "agent": selected_agent,
+                                "task": task_description,
+                                "error": error,
+                                "success": False,
+                                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
                 
+                elif response.status_code == 429:
+                    st.warning(f"⚠️ {response.json()['detail']}")
                 else:
                     st.error(f"❌ Failed to launch agent: {response.status_code}")
                     
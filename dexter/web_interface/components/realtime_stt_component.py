@@ -54,7 +54,7 @@ def realtime_stt_component():
         """Send transcribed text to chat endpoint and get response, optionally with image."""
         try:
             # Prepare the request payload
-            payload = {"message": text}
+            payload = {"message": text, "voice": True}
             
             # If vision mode is enabled, try to get frame data
             if st.session_state.stt_vision_mode:
@@ -18,6 +18,28 @@ def play_audio_automatically(audio_data):
     
     st.components.v1.html(audio_html, height=0)
 
+def fetch_agent_updates():
+    """Append background agent results pushed since the last check to the chat history"""
+    try:
+        response = requests.get(
+            "http://localhost:8080/events/recent",
+            params={"after": st.session_state.get("last_event_id", 0)},
+            timeout=5
+        )
+        if response.status_code != 200:
+            return
+        events = response.json()["events"]
+    except requests.exceptions.RequestException:
+        return
+
+    first_check = "last_event_id" not in st.session_state
+    for event in events:
+        st.session_state.last_event_id = event["id"]
+        # Results published before this browser session started are not replayed
+        if not first_check and event["type"] == "agent_result" and event["data"].get("response"):
+            st.session_state.messages.append({"role": "assistant", "content": event["data"]["response"]})
+    st.session_state.setdefault("last_event_id", 0)
+
 def text_chat_component():
     """Text chat component for DeXteR"""
     
@@ -35,6 +57,8 @@ def text_chat_component():
     if "response_type" not in st.session_state:
         st.session_state.response_type = "text"  # Default to text response
 
+    fetch_agent_updates()
+
     # Display chat messages
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
@@ -1,9 +1,11 @@
 import uvicorn
-from dexter.api.app import app
 from dexter.config.settings import settings
 from dexter.config.logging_config import get_logging_config
 
 if __name__ == "__main__":
+    # Imported here so agent worker processes, which re-import this module, do not start the API
+    from dexter.api.app import app
+
     uvicorn.run(
         app,
         host="0.0.0.0",
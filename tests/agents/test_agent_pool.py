@@ -0,0 +1,93 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from dexter.agents.agent_pool import AgentPool
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, run_context
+
+
+class TestAgentPool:
+    """Test cases for the per-type agent instance pool."""
+
+    def setup_method(self):
+        self.created = []
+
+    def factory(self) -> MagicMock:
+        agent = MagicMock()
+        agent.python_executor.state = {"__name__": "__main__", "helium": "module"}
+        self.created.append(agent)
+        return agent
+
+    def test_concurrent_runs_use_distinct_instances(self):
+        # Arrange
+        pool = AgentPool("youtube", self.factory, size=2)
+        barrier = threading.Barrier(2, timeout=5)
+        used = []
+
+        def run_in_thread():
+            with pool.lease() as agent:
+                used.append(agent)
+                barrier.wait()
+
+        # Act
+        threads = [threading.Thread(target=run_in_thread) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        # Assert
+        assert len(set(map(id, used))) == 2
+        assert pool.stats() == {"size": 2, "created": 2, "idle": 2, "leased": 0, "waits": 0}
+
+    def test_released_instance_is_reset_and_reused(self):
+        # Arrange
+        pool = AgentPool("youtube", self.factory, size=2)
+        agent = pool.acquire()
+        agent.state = {"leftover": 1}
+        agent.python_executor.state["leftover"] = 1
+
+        # Act
+        pool.release(agent)
+        reused = pool.acquire()
+
+        # Assert
+        assert reused is agent
+        assert len(self.created) == 1
+        agent.memory.reset.assert_called_once()
+        assert agent.state == {}
+        assert agent.python_executor.state == {"__name__": "__main__", "helium": "module"}
+
+    def test_acquire_times_out_when_pool_exhausted(self):
+        # Arrange
+        pool = AgentPool("auchan", self.factory, size=1)
+        pool.acquire()
+
+        # Act & Assert
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.1)
+        assert pool.stats()["waits"] >= 1
+
+    def test_waiting_run_stops_when_cancelled(self):
+        # Arrange
+        pool = AgentPool("auchan", self.factory, size=1)
+        pool.acquire()
+        token = CancellationToken()
+        token.cancel("stop")
+
+        # Act & Assert
+        with run_context(RunContext("run-1", "auchan", token)):
+            with pytest.raises(AgentCancelledError):
+                pool.acquire(timeout=5)
+
+    def test_run_passes_additional_args_by_keyword(self):
+        # Arrange
+        pool = AgentPool("test", self.factory, size=1)
+
+        # Act
+        pool.run("task", {"key": "value"})
+
+        # Assert
+        self.created[0].run.assert_called_once_with("task", additional_args={"key": "value"})
+        assert pool.stats()["idle"] == 1
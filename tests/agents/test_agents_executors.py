@@ -5,6 +5,7 @@ from dexter.agents.agents_executors import (
     youtube_agent,
     auchan_agent,
     report_agent,
+    _run_with_browser,
     AGENTS
 )
 
@@ -17,8 +18,8 @@ class TestAgentExecutors:
         self.additional_args = {"key": "value", "number": 42}
 
     @patch('dexter.agents.agents_executors.executor.submit')
-    @patch('dexter.agents.agents_executors._youtube_agent_obj')
-    def test_youtube_agent_without_additional_args(self, mock_agent, mock_submit):
+    @patch('dexter.agents.agents_executors.get_agent_pool')
+    def test_youtube_agent_without_additional_args(self, mock_get_pool, mock_submit):
         # Arrange
         mock_future = Mock(spec=Future)
         mock_submit.return_value = mock_future
@@ -31,13 +32,14 @@ class TestAgentExecutors:
         # Verify that the task was prepended with YouTube instructions
         call_args = mock_submit.call_args[0]
         assert len(call_args) == 2
-        assert call_args[0] == mock_agent.run
+        mock_get_pool.assert_called_once_with("youtube")
+        assert call_args[0] == mock_get_pool.return_value.run
         assert "You have access to YouTube search tools" in call_args[1]
         assert self.test_task in call_args[1]
     
     @patch('dexter.agents.agents_executors.executor.submit')
-    @patch('dexter.agents.agents_executors._youtube_agent_obj')
-    def test_youtube_agent_with_additional_args(self, mock_agent, mock_submit):
+    @patch('dexter.agents.agents_executors.get_agent_pool')
+    def test_youtube_agent_with_additional_args(self, mock_get_pool, mock_submit):
         # Arrange
         mock_future = Mock(spec=Future)
         mock_submit.return_value = mock_future
@@ -52,36 +54,45 @@ class TestAgentExecutors:
         assert call_args[2] == self.additional_args
 
     @patch('dexter.agents.agents_executors.executor.submit')
-    @patch('dexter.agents.agents_executors._auchan_agent_obj')
     @patch('helium.start_chrome')
-    @patch('dexter.agents.agents_executors.webdriver')
-    def test_auchan_agent_without_additional_args(self, mock_webdriver, mock_start_chrome, mock_agent, mock_submit):
+    def test_auchan_agent_without_additional_args(self, mock_start_chrome, mock_submit):
         # Arrange
         mock_future = Mock(spec=Future)
         mock_submit.return_value = mock_future
-        mock_driver = Mock()
-        mock_start_chrome.return_value = mock_driver
         
         # Act
         result = auchan_agent(self.test_task)
         
         # Assert
         assert result == mock_future
-        mock_start_chrome.assert_called_once()
-        mock_agent.python_executor.assert_any_call("from helium import *")
-        mock_agent.python_executor.assert_any_call("from pypdf import *")
+        # The browser is leased from the pool when the run starts, not at submit time
+        mock_start_chrome.assert_not_called()
         
         # Verify that the task was prepended with helium instructions
         call_args = mock_submit.call_args[0]
-        assert "You can use helium to interact with websites" in call_args[1]
+        assert call_args[0] == _run_with_browser
+        assert call_args[1] == "auchan"
+        assert "You can use helium to interact with websites" in call_args[2]
+
+    @patch('dexter.agents.agents_executors.get_agent_pool')
+    @patch('dexter.agents.agents_executors.browser_pool')
+    def test_run_with_browser_leases_browser_for_run(self, mock_browser_pool, mock_get_pool):
+        # Arrange
+        mock_get_pool.return_value.run.return_value = "done"
+        
+        # Act
+        result = _run_with_browser("auchan", self.test_task, self.additional_args)
+        
+        # Assert
+        assert result == "done"
+        mock_browser_pool.lease.assert_called_once()
+        mock_get_pool.return_value.run.assert_called_once_with(self.test_task, self.additional_args)
 
     @patch('dexter.agents.agents_executors.executor.submit')
-    @patch('dexter.agents.agents_executors._report_agent_obj')
-    def test_report_agent_without_additional_args(self, mock_agent, mock_submit):
+    def test_report_agent_without_additional_args(self, mock_submit):
         # Arrange
         mock_future = Mock(spec=Future)
         mock_submit.return_value = mock_future
-        mock_agent.additional_authorized_imports = ["pandas", "matplotlib"]
         
         # Act
         result = report_agent(self.test_task)
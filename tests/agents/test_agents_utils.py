@@ -0,0 +1,183 @@
+import base64
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+from smolagents import ActionStep
+from smolagents.monitoring import Timing, TokenUsage
+
+from dexter.agents.agents_utils import CLICKABLE_LABELS_JS, MemoryCompactor, record_step, save_screenshot, step_event, wait_for_page_idle
+from dexter.agents.run_context import CancellationToken, RunContext, run_context
+
+
+class TestStepEvents:
+    """Test cases for per-step progress events."""
+
+    def make_step(self, **kwargs) -> ActionStep:
+        return ActionStep(
+            step_number=2,
+            timing=Timing(start_time=10.0, end_time=12.5),
+            code_action="results = web_search('milk')\nprint(results)",
+            observations="Found 3 results",
+            token_usage=TokenUsage(input_tokens=100, output_tokens=20),
+            **kwargs,
+        )
+
+    def test_step_event_summarizes_step(self):
+        # Arrange
+        agent = MagicMock(tools={"web_search": object(), "final_answer": object()})
+
+        # Act
+        event = step_event(self.make_step(), agent)
+
+        # Assert
+        assert event["step_number"] == 2
+        assert event["tools"] == ["web_search"]
+        assert event["duration"] == 2.5
+        assert (event["input_tokens"], event["output_tokens"]) == (100, 20)
+        assert event["screenshot"] is None
+
+    def test_screenshot_is_downscaled_to_jpeg_thumbnail(self):
+        # Arrange
+        agent = MagicMock(tools={})
+        step = self.make_step(observations_images=[Image.new("RGBA", (1000, 1350), "white")])
+
+        # Act
+        event = step_event(step, agent)
+
+        # Assert
+        thumbnail = Image.open(BytesIO(base64.b64decode(event["screenshot"])))
+        assert thumbnail.format == "JPEG"
+        assert max(thumbnail.size) <= 320
+
+    @patch('dexter.agents.agents_utils.get_run_store')
+    def test_record_step_writes_to_current_run(self, mock_get_store):
+        # Arrange
+        agent = MagicMock(tools={})
+        mock_get_store.return_value.add_event.side_effect = RuntimeError("disk full")
+
+        # Act
+        record_step(self.make_step(), agent)
+        with run_context(RunContext("run-1", "test", CancellationToken())):
+            record_step(self.make_step(), agent)
+
+        # Assert
+        mock_get_store.return_value.add_event.assert_called_once()
+        assert mock_get_store.return_value.add_event.call_args[0][:2] == ("run-1", "step")
+
+
+class TestScreenshotObservations:
+    """Test cases for the browser screenshot step callback."""
+
+    def make_driver(self) -> MagicMock:
+        buffer = BytesIO()
+        Image.new("RGB", (1000, 1350), "white").save(buffer, format="JPEG")
+        driver = MagicMock(current_url="https://example.com")
+        driver.execute_cdp_cmd.return_value = {"data": base64.b64encode(buffer.getvalue()).decode()}
+        driver.execute_script.side_effect = lambda script: ["Add to cart", "Close"] if script == CLICKABLE_LABELS_JS else ["complete", 3, 7]
+        return driver
+
+    def test_wait_for_page_idle_returns_once_page_is_stable(self):
+        # Arrange
+        driver = MagicMock()
+        driver.execute_script.side_effect = [["loading", 1, 0], ["complete", 4, 2]] + [["complete", 4, 2]] * 100
+
+        # Act
+        idle = wait_for_page_idle(driver, timeout=2, quiet=0.1)
+
+        # Assert
+        assert idle is True
+        assert driver.execute_script.call_count < 100
+
+    def test_wait_for_page_idle_times_out_on_busy_page(self):
+        # Arrange
+        driver = MagicMock()
+        driver.execute_script.side_effect = (["complete", 1, mutations] for mutations in range(1000))
+
+        # Act & Assert
+        assert wait_for_page_idle(driver, timeout=0.2, quiet=0.1) is False
+
+    @patch('dexter.agents.agents_utils.wait_for_page_idle')
+    @patch('dexter.agents.agents_utils.current_driver')
+    def test_save_screenshot_downscales_and_reads_labels_in_one_call(self, mock_current_driver, mock_wait):
+        # Arrange
+        driver = self.make_driver()
+        mock_current_driver.return_value = driver
+        step = ActionStep(step_number=3, timing=Timing(start_time=0.0))
+        agent = MagicMock()
+        agent.memory.steps = []
+
+        # Act
+        save_screenshot(step, agent)
+
+        # Assert
+        image = step.observations_images[0]
+        assert image.format == "JPEG"
+        assert max(image.size) <= 768
+        assert driver.execute_script.call_count == 1
+        assert "['Add to cart', 'Close']" in step.observations
+        assert "Current url: https://example.com" in step.observations
+        mock_wait.assert_called_once_with(driver)
+
+
+class TestMemoryCompactor:
+    """Test cases for token-budgeted agent memory."""
+
+    def make_agent(self, observations: list[str]) -> MagicMock:
+        agent = MagicMock(task="Summarize the pages")
+        agent.memory.steps = [
+            ActionStep(step_number=number, timing=Timing(start_time=0.0), observations=text, model_output="Thought: next")
+            for number, text in enumerate(observations, start=1)
+        ]
+        return agent
+
+    def test_memory_under_budget_is_untouched(self):
+        # Arrange
+        agent = self.make_agent(["short", "short"])
+        compactor = MemoryCompactor(max_tokens=1000)
+
+        # Act
+        compactor(agent.memory.steps[-1], agent)
+
+        # Assert
+        assert [step.observations for step in agent.memory.steps] == ["short", "short"]
+
+    def test_oldest_observations_are_shortened_until_under_budget(self):
+        # Arrange
+        agent = self.make_agent(["a" * 4000, "b" * 4000, "c" * 4000, "d" * 4000])
+        compactor = MemoryCompactor(max_tokens=3200, keep_recent_steps=2, old_text_chars=100)
+
+        # Act
+        compactor(agent.memory.steps[-1], agent)
+
+        # Assert
+        steps = agent.memory.steps
+        assert "omitted to save context" in steps[0].observations
+        assert steps[0].observations.startswith("a" * 100)
+        assert steps[1].observations == "b" * 4000
+        assert steps[3].observations == "d" * 4000
+        assert compactor.compacted_steps == 1
+
+    def test_recent_steps_are_kept_even_over_budget(self):
+        # Arrange
+        agent = self.make_agent(["a" * 4000, "b" * 4000])
+        compactor = MemoryCompactor(max_tokens=100, keep_recent_steps=2)
+
+        # Act
+        compactor(agent.memory.steps[-1], agent)
+
+        # Assert
+        assert [len(step.observations) for step in agent.memory.steps] == [4000, 4000]
+
+    def test_only_newest_images_are_kept(self):
+        # Arrange
+        agent = self.make_agent(["x", "y", "z"])
+        for step in agent.memory.steps:
+            step.observations_images = [Image.new("RGB", (10, 10))]
+        compactor = MemoryCompactor(max_tokens=10000, keep_images=2)
+
+        # Act
+        compactor(agent.memory.steps[-1], agent)
+
+        # Assert
+        assert [step.observations_images is not None for step in agent.memory.steps] == [False, True, True]
@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dexter.agents.browser_pool import BrowserPool, current_driver
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, current_run, run_context
+
+
+@patch('dexter.agents.browser_pool.helium')
+class TestBrowserPool:
+    """Test cases for the pooled browser sessions."""
+
+    def setup_method(self):
+        self.drivers = []
+
+    def factory(self) -> MagicMock:
+        driver = MagicMock()
+        driver.window_handles = ["main"]
+        self.drivers.append(driver)
+        return driver
+
+    def test_browser_is_reused_and_reset(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=1, factory=self.factory)
+
+        # Act
+        with pool.lease() as first:
+            first.window_handles = ["main", "popup"]
+        with pool.lease() as second:
+            pass
+
+        # Assert
+        assert second is first
+        assert len(self.drivers) == 1
+        first.delete_all_cookies.assert_called()
+        first.switch_to.window.assert_any_call("popup")
+        first.close.assert_called()
+        first.get.assert_called_with("about:blank")
+        mock_helium.set_driver.assert_called_with(first)
+
+    def test_lease_binds_browser_to_current_run(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=1, factory=self.factory)
+
+        # Act
+        with run_context(RunContext("run-1", "auchan", CancellationToken())):
+            with pool.lease() as driver:
+                leased = current_driver()
+            after = current_run().browser
+
+        # Assert
+        assert leased is driver
+        assert after is None
+
+    @patch('dexter.agents.browser_pool.settings')
+    def test_aged_browser_is_recycled(self, mock_settings, mock_helium):
+        # Arrange
+        mock_settings.BROWSER_MAX_AGE_SECONDS = 1800
+        mock_settings.BROWSER_MAX_USES = 1
+        pool = BrowserPool(size=1, factory=self.factory)
+
+        # Act
+        with pool.lease():
+            pass
+        with pool.lease() as second:
+            pass
+
+        # Assert
+        self.drivers[0].quit.assert_called_once()
+        assert second is not self.drivers[0]
+        assert pool.stats()["recycled"] >= 1
+
+    def test_crashed_idle_browser_is_replaced(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=1, factory=self.factory)
+        pool.warm()
+        type(self.drivers[0]).window_handles = property(lambda self: (_ for _ in ()).throw(RuntimeError("crashed")))
+
+        # Act
+        with pool.lease() as driver:
+            pass
+
+        # Assert
+        assert driver is not self.drivers[0]
+        self.drivers[0].quit.assert_called_once()
+
+    def test_cancel_quits_leased_browser_only_while_held(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=1, factory=self.factory)
+        token = CancellationToken()
+
+        # Act
+        with run_context(RunContext("run-1", "auchan", token)):
+            with pool.lease():
+                pass
+        token.cancel()
+
+        # Assert
+        self.drivers[0].quit.assert_not_called()
+
+    def test_waiting_run_stops_when_cancelled(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=1, factory=self.factory)
+        token = CancellationToken()
+        token.cancel()
+
+        # Act & Assert
+        with pool.lease():
+            with run_context(RunContext("run-2", "auchan", token)):
+                with pytest.raises(AgentCancelledError):
+                    with pool.lease(timeout=5):
+                        pass
+
+    def test_shutdown_quits_idle_browsers(self, mock_helium):
+        # Arrange
+        pool = BrowserPool(size=2, factory=self.factory)
+        pool.warm()
+
+        # Act
+        pool.shutdown()
+
+        # Assert
+        assert all(driver.quit.called for driver in self.drivers)
+        assert pool.stats()["browsers"] == 0
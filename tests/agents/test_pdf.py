@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from dexter.agents.pdf import PdfTextCache, iter_pdf_text, parse_page_range
+
+
+def _make_pdf(path, pages):
+    pdf = canvas.Canvas(str(path))
+    for number in range(1, pages + 1):
+        pdf.drawString(72, 720, f"Page {number} content")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PdfTextCache(tmp_path / "cache")
+    with patch('dexter.agents.pdf.pdf_cache', cache):
+        yield cache
+
+
+class TestParsePageRange:
+    """Test cases for page range selection."""
+
+    def test_ranges_and_single_pages(self):
+        # Act & Assert
+        assert parse_page_range("1-3, 5, 9-", 10) == [0, 1, 2, 4, 8, 9]
+
+    def test_no_range_selects_all_pages(self):
+        # Act & Assert
+        assert parse_page_range(None, 3) == [0, 1, 2]
+
+    def test_pages_past_the_end_are_ignored(self):
+        # Act & Assert
+        assert parse_page_range("2-100", 3) == [1, 2]
+
+    def test_invalid_range_raises(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            parse_page_range("5-2", 10)
+
+
+class TestIterPdfText:
+    """Test cases for cached PDF text extraction."""
+
+    def test_selected_pages_are_extracted_in_order(self, tmp_path, cache):
+        # Arrange
+        pdf = _make_pdf(tmp_path / "doc.pdf", 5)
+
+        # Act
+        pages = list(iter_pdf_text(pdf, "4,2"))
+
+        # Assert
+        assert [number for number, _ in pages] == [4, 2]
+        assert "Page 4 content" in pages[0][1]
+
+    def test_cached_pages_are_not_extracted_again(self, tmp_path, cache):
+        # Arrange
+        pdf = _make_pdf(tmp_path / "doc.pdf", 4)
+        list(iter_pdf_text(pdf, "1-2"))
+
+        # Act
+        with patch('dexter.agents.pdf.iter_pages', wraps=__import__('dexter.agents.pdf', fromlist=['iter_pages']).iter_pages) as mock_iter:
+            pages = list(iter_pdf_text(pdf))
+
+        # Assert
+        mock_iter.assert_called_once_with(pdf, [2, 3])
+        assert len(pages) == 4
+        assert cache.hits == 2
+
+    def test_large_documents_are_split_across_the_pool(self, tmp_path, cache):
+        # Arrange
+        pdf = _make_pdf(tmp_path / "doc.pdf", 6)
+        submitted = []
+
+        class InlinePool:
+            def submit(self, fn, *args):
+                submitted.append(args[1])
+                from concurrent.futures import Future
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+        # Act
+        with patch('dexter.agents.pdf.settings.PDF_PARALLEL_MIN_PAGES', 4), \
+                patch('dexter.agents.pdf.settings.PDF_EXTRACT_WORKERS', 2), \
+                patch('dexter.agents.pdf.settings.PDF_PAGES_PER_TASK', 4), \
+                patch('dexter.agents.pdf._extract_pool', return_value=InlinePool()):
+            pages = list(iter_pdf_text(pdf))
+
+        # Assert
+        assert submitted == [[0, 1, 2, 3], [4, 5]]
+        assert [number for number, _ in pages] == [1, 2, 3, 4, 5, 6]
+        assert "Page 6 content" in pages[5][1]
@@ -0,0 +1,103 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock, patch
+
+import pytest
+
+from dexter.agents import process_pool
+from dexter.agents.process_pool import ProcessAgentRunner, _portable, _run_in_worker
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, current_run, run_context
+
+
+class TestProcessAgentRunner:
+    """Test cases for running agents in the process pool."""
+
+    def test_portable_converts_agent_output_types(self):
+        # Arrange
+        class AgentText:
+            def __str__(self):
+                return "report.pdf"
+
+        # Act & Assert
+        assert _portable({"path": "report.pdf"}) == {"path": "report.pdf"}
+        assert _portable(AgentText()) == "report.pdf"
+
+    @patch('dexter.agents.process_pool.get_pool')
+    def test_run_submits_to_pool_and_returns_result(self, mock_get_pool):
+        # Arrange
+        mock_get_pool.return_value.submit.return_value.result.return_value = "done"
+        runner = ProcessAgentRunner("report")
+        token = CancellationToken()
+
+        # Act
+        with run_context(RunContext("run-1", "report", token)):
+            result = runner.run("make a report", {"topic": "sales"})
+
+        # Assert
+        assert result == "done"
+        args = mock_get_pool.return_value.submit.call_args[0]
+        assert args[1:5] == ("report", "make a report", {"topic": "sales"}, "run-1")
+
+    @pytest.mark.parametrize("replaced", [False, True])
+    def test_broken_pool_is_reset_without_touching_its_replacement(self, replaced):
+        # Arrange
+        broken = Mock()
+        broken.submit.return_value.result.side_effect = BrokenProcessPool("worker died")
+        replacement = Mock()
+        current = replacement if replaced else broken
+
+        # Act
+        with patch.object(process_pool, 'get_pool', return_value=broken), patch.object(process_pool, '_pool', current):
+            with pytest.raises(BrokenProcessPool):
+                ProcessAgentRunner("report").run("make a report")
+            pool_after = process_pool._pool
+
+        # Assert
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        replacement.shutdown.assert_not_called()
+        assert pool_after is (replacement if replaced else None)
+
+    @patch('dexter.agents.process_pool.get_pool')
+    def test_cancel_touches_flag_file_for_worker(self, mock_get_pool):
+        # Arrange
+        runner = ProcessAgentRunner("report")
+        token = CancellationToken()
+        seen = {}
+
+        def result():
+            cancel_file = mock_get_pool.return_value.submit.call_args[0][5]
+            token.cancel()
+            seen["flagged"] = os.path.exists(cancel_file)
+            return "stopped"
+
+        mock_get_pool.return_value.submit.return_value.result.side_effect = result
+
+        # Act
+        with run_context(RunContext("run-2", "report", token)):
+            runner.run("make a report")
+
+        # Assert
+        assert seen["flagged"] is True
+        assert not os.path.exists(mock_get_pool.return_value.submit.call_args[0][5])
+
+    def test_worker_observes_cancel_file(self, tmp_path):
+        # Arrange
+        cancel_file = tmp_path / "cancel"
+        cancel_file.touch()
+
+        def run(task, additional_args=None):
+            token = current_run().token
+            for _ in range(100):
+                token.raise_if_cancelled()
+                time.sleep(0.05)
+            return "finished"
+
+        fake_pool = Mock()
+        fake_pool.run.side_effect = run
+
+        # Act & Assert
+        with patch('dexter.agents.agent_pool.get_agent_pool', return_value=fake_pool), \
+             patch.object(process_pool, 'CANCEL_POLL_SECONDS', 0.01):
+            with pytest.raises(AgentCancelledError):
+                _run_in_worker("report", "task", None, "run-3", str(cancel_file))
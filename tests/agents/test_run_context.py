@@ -0,0 +1,87 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from dexter.agents.agents_utils import check_cancelled
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, current_run, run_context
+
+
+class TestCancellationToken:
+    """Test cases for cooperative cancellation tokens."""
+
+    def test_cancel_runs_callbacks_once(self):
+        # Arrange
+        token = CancellationToken()
+        teardown = Mock()
+        token.add_callback(teardown)
+
+        # Act
+        first, second = token.cancel("stop"), token.cancel("again")
+
+        # Assert
+        assert (first, second) == (True, False)
+        assert token.cancelled
+        assert token.reason == "stop"
+        teardown.assert_called_once()
+
+    def test_callback_added_after_cancel_runs_immediately(self):
+        # Arrange
+        token = CancellationToken()
+        token.cancel()
+        teardown = Mock()
+
+        # Act
+        token.add_callback(teardown)
+
+        # Assert
+        teardown.assert_called_once()
+
+    def test_failing_callback_does_not_block_others(self):
+        # Arrange
+        token = CancellationToken()
+        teardown = Mock()
+        token.add_callback(Mock(side_effect=RuntimeError("browser already closed")))
+        token.add_callback(teardown)
+
+        # Act
+        token.cancel()
+
+        # Assert
+        teardown.assert_called_once()
+
+
+class TestRunContext:
+    """Test cases for the thread-local run context and the cancellation step callback."""
+
+    def test_context_is_thread_local(self):
+        # Arrange
+        context = RunContext("run-1", "report", CancellationToken())
+        seen = []
+
+        # Act
+        with run_context(context):
+            thread = threading.Thread(target=lambda: seen.append(current_run()))
+            thread.start()
+            thread.join()
+            inside = current_run()
+
+        # Assert
+        assert inside is context
+        assert seen == [None]
+        assert current_run() is None
+
+    def test_check_cancelled_raises_for_cancelled_run(self):
+        # Arrange
+        token = CancellationToken()
+
+        # Act & Assert
+        with run_context(RunContext("run-1", "report", token)):
+            check_cancelled(Mock(), Mock())
+            token.cancel("user cancelled")
+            with pytest.raises(AgentCancelledError, match="user cancelled"):
+                check_cancelled(Mock(), Mock())
+
+    def test_check_cancelled_outside_run_is_noop(self):
+        # Act & Assert
+        check_cancelled(Mock(), Mock())
@@ -0,0 +1,203 @@
+import threading
+
+import pytest
+
+from dexter.agents.run_context import AgentCancelledError, current_run
+from dexter.agents.scheduler import AgentScheduler, SchedulerSaturatedError
+
+
+class TestAgentScheduler:
+    """Test cases for the priority-aware agent scheduler."""
+
+    def setup_method(self):
+        self.release = threading.Event()
+        self.order = []
+
+    def teardown_method(self):
+        self.release.set()
+
+    def blocking_run(self, name: str) -> str:
+        self.release.wait(timeout=5)
+        self.order.append(name)
+        return name
+
+    @staticmethod
+    def wait_until_dequeued(scheduler: AgentScheduler) -> None:
+        while scheduler.stats()["queue_depth"]:
+            pass
+
+    def test_submit_returns_future_with_result(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+
+        # Act
+        future = scheduler.submit(lambda task, args: f"{task}:{args['n']}", "run", {"n": 1}, agent_type="test")
+
+        # Assert
+        assert future.result(timeout=5) == "run:1"
+        assert future.agent_type == "test"
+        assert future.run_id
+        scheduler.shutdown()
+
+    def test_exceptions_propagate_to_future(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+
+        def failing_run():
+            raise ValueError("boom")
+
+        # Act
+        future = scheduler.submit(failing_run, agent_type="test")
+
+        # Assert
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        scheduler.shutdown()
+        assert scheduler.stats()["failed"] == 1
+
+    def test_higher_priority_runs_first(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={"youtube": 1, "report": 3}, limits={})
+        blocker = scheduler.submit(self.blocking_run, "blocker", agent_type="report")
+        self.wait_until_dequeued(scheduler)
+
+        # Act
+        report = scheduler.submit(self.blocking_run, "report", agent_type="report")
+        youtube = scheduler.submit(self.blocking_run, "youtube", agent_type="youtube")
+        positions = (scheduler.queue_position(youtube), scheduler.queue_position(report))
+        self.release.set()
+        for future in (blocker, report, youtube):
+            future.result(timeout=5)
+
+        # Assert
+        assert positions == (1, 2)
+        assert self.order == ["blocker", "youtube", "report"]
+        scheduler.shutdown()
+
+    def test_concurrency_limit_per_agent_type(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=2, max_queue_depth=4, priorities={}, limits={"auchan": 1})
+        first = scheduler.submit(self.blocking_run, "auchan-1", agent_type="auchan")
+        self.wait_until_dequeued(scheduler)
+        second = scheduler.submit(self.blocking_run, "auchan-2", agent_type="auchan")
+
+        # Act
+        other = scheduler.submit(lambda: "youtube", agent_type="youtube")
+
+        # Assert
+        assert other.result(timeout=5) == "youtube"
+        assert scheduler.queue_position(second) == 1
+        assert scheduler.stats()["agents"]["auchan"]["running"] == 1
+        self.release.set()
+        first.result(timeout=5)
+        second.result(timeout=5)
+        scheduler.shutdown()
+
+    def test_admission_control_rejects_when_queue_full(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=1, priorities={}, limits={})
+        scheduler.submit(self.blocking_run, "running", agent_type="test")
+        self.wait_until_dequeued(scheduler)
+        scheduler.submit(self.blocking_run, "queued", agent_type="test")
+
+        # Act & Assert
+        with pytest.raises(SchedulerSaturatedError):
+            scheduler.submit(self.blocking_run, "rejected", agent_type="test")
+        assert scheduler.stats()["rejected"] == 1
+        self.release.set()
+        scheduler.shutdown()
+
+    def test_background_runs_are_deferred_when_queue_full(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=1, priorities={"test": 0, "report": 3}, limits={}, max_deferred=1)
+        running = scheduler.submit(self.blocking_run, "running", agent_type="test")
+        self.wait_until_dequeued(scheduler)
+        queued = scheduler.submit(self.blocking_run, "queued", agent_type="test")
+
+        # Act
+        deferred = scheduler.submit(self.blocking_run, "deferred", agent_type="report")
+        with pytest.raises(SchedulerSaturatedError):
+            scheduler.submit(self.blocking_run, "interactive", agent_type="test")
+        with pytest.raises(SchedulerSaturatedError):
+            scheduler.submit(self.blocking_run, "past bound", agent_type="report")
+        position = scheduler.queue_position(deferred)
+        self.release.set()
+        for future in (running, queued, deferred):
+            future.result(timeout=5)
+
+        # Assert
+        assert position == 2
+        assert self.order == ["running", "queued", "deferred"]
+        stats = scheduler.stats()
+        assert (stats["deferred"], stats["rejected"], stats["deferred_depth"]) == (1, 2, 0)
+        scheduler.shutdown()
+
+    def test_cancelled_queued_run_is_skipped(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+        blocker = scheduler.submit(self.blocking_run, "blocker", agent_type="test")
+        self.wait_until_dequeued(scheduler)
+        queued = scheduler.submit(self.blocking_run, "queued", agent_type="test")
+
+        # Act
+        cancelled = queued.cancel()
+        self.release.set()
+        blocker.result(timeout=5)
+        scheduler.shutdown()
+
+        # Assert
+        assert cancelled is True
+        assert self.order == ["blocker"]
+        assert scheduler.stats()["cancelled"] == 1
+
+    def test_cancel_running_run_stops_at_next_checkpoint(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+        started = threading.Event()
+
+        def long_run():
+            started.set()
+            while True:
+                current_run().token.raise_if_cancelled()
+                self.release.wait(timeout=0.01)
+
+        future = scheduler.submit(long_run, agent_type="report")
+        started.wait(timeout=5)
+
+        # Act
+        cancelled = scheduler.cancel(future)
+
+        # Assert
+        assert cancelled is True
+        with pytest.raises(AgentCancelledError):
+            future.result(timeout=5)
+        scheduler.shutdown()
+        assert scheduler.stats()["cancelled"] == 1
+        assert scheduler.stats()["agents"]["report"]["running"] == 0
+
+    def test_cancel_finished_run_returns_false(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+        future = scheduler.submit(lambda: "done", agent_type="test")
+        future.result(timeout=5)
+
+        # Act & Assert
+        assert scheduler.cancel(future) is False
+        scheduler.shutdown()
+
+    def test_start_callbacks_run_when_worker_picks_up_run(self):
+        # Arrange
+        scheduler = AgentScheduler(max_workers=1, max_queue_depth=4, priorities={}, limits={})
+        started = []
+        future = scheduler.submit(self.blocking_run, "a", agent_type="test")
+
+        # Act
+        future.add_start_callback(lambda f: started.append(f.run_id))
+        self.release.set()
+        future.result(timeout=5)
+        future.add_start_callback(lambda f: started.append("late"))
+
+        # Assert
+        assert started == [future.run_id, "late"]
+        assert future.started_at is not None
+        scheduler.shutdown()
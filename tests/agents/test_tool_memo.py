@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from smolagents import ActionStep, tool
+from smolagents.monitoring import Timing
+
+from dexter.agents import tools
+from dexter.agents.agents_utils import note_cached_tool_calls
+from dexter.agents.run_context import CancellationToken, RunContext, run_context
+from dexter.agents.tool_memo import memoize_per_run
+
+
+def make_tool(calls: list):
+    @tool
+    def lookup(query: str, limit: int = 3) -> list:
+        """
+        Look something up.
+
+        Args:
+            query: What to look up.
+            limit: How many results to return.
+        """
+        calls.append((query, limit))
+        if query == "fail":
+            raise ValueError("lookup failed")
+        return [f"{query} {i}" for i in range(limit)]
+
+    return memoize_per_run(lookup)
+
+
+def make_run(run_id: str = "run-1") -> RunContext:
+    return RunContext(run_id, "youtube", CancellationToken())
+
+
+class TestMemoizePerRun:
+    """Test cases for per-run tool call memoization."""
+
+    def test_identical_calls_in_a_run_reuse_the_result(self):
+        # Arrange
+        calls = []
+        lookup = make_tool(calls)
+        run = make_run()
+
+        # Act
+        with run_context(run):
+            first = lookup("milk")
+            second = lookup(query="milk", limit=3)
+            other = lookup("milk", limit=1)
+
+        # Assert
+        assert first == second == ["milk 0", "milk 1", "milk 2"]
+        assert other == ["milk 0"]
+        assert calls == [("milk", 3), ("milk", 1)]
+        assert len(run.notes) == 1 and "lookup(query='milk', limit=3)" in run.notes[0]
+
+    def test_results_are_not_shared_between_runs(self):
+        # Arrange
+        calls = []
+        lookup = make_tool(calls)
+
+        # Act
+        with run_context(make_run("run-1")):
+            lookup("milk")
+        with run_context(make_run("run-2")):
+            lookup("milk")
+        lookup("milk")
+
+        # Assert
+        assert len(calls) == 3
+
+    def test_failed_calls_are_not_remembered(self):
+        # Arrange
+        calls = []
+        lookup = make_tool(calls)
+
+        # Act
+        with run_context(make_run()):
+            for _ in range(2):
+                with pytest.raises(ValueError):
+                    lookup("fail")
+
+        # Assert
+        assert len(calls) == 2
+
+    def test_failed_page_visit_is_retried(self):
+        # Arrange
+        visit = patch.object(tools.visit_webpage, '_visit', side_effect=[requests.exceptions.Timeout(), "# Page", "unused"])
+        run = make_run()
+
+        # Act
+        with visit as mock_visit, run_context(run):
+            results = [tools.visit_webpage("https://example.com") for _ in range(3)]
+
+        # Assert
+        assert results[0].startswith("The request timed out")
+        assert results[1] == results[2] == "# Page"
+        assert mock_visit.call_count == 2
+        assert len(run.notes) == 1
+
+    def test_failed_video_analysis_is_retried(self):
+        # Arrange
+        analyze = patch.object(tools, 'analyze_video', side_effect=[RuntimeError("503"), "A cat video", "unused"])
+        run = make_run()
+
+        # Act
+        with analyze as mock_analyze, run_context(run):
+            results = [tools.watch_youtube_video("https://youtu.be/abc", "What is it about?") for _ in range(3)]
+
+        # Assert
+        assert results == [None, "A cat video", "A cat video"]
+        assert mock_analyze.call_count == 2
+        assert len(run.notes) == 1
+
+    def test_notes_are_added_to_the_step_observations(self):
+        # Arrange
+        run = make_run()
+        run.notes.append("Note: reused")
+        step = ActionStep(step_number=1, timing=Timing(start_time=0.0), observations="Execution logs")
+
+        # Act
+        with run_context(run):
+            note_cached_tool_calls(step, MagicMock())
+
+        # Assert
+        assert step.observations == "Execution logs\nNote: reused"
+        assert run.notes == []
@@ -3,11 +3,12 @@ import tempfile
 import os
 from unittest.mock import Mock, patch, mock_open, MagicMock
 import requests
-from googleapiclient.discovery import build
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
 
+from dexter.agents.youtube import api_cache
+from dexter.utils.cache import SQLiteCache
 from dexter.agents.tools import (
     download_image,
+    download_images,
     search_products,
     extract_text_from_pdf,
     search_youtube_videos,
@@ -15,31 +16,38 @@ from dexter.agents.tools import (
     watch_youtube_video
 )
 
+def _image_response(chunks=(b"fake image data",), headers=None):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {"Content-Type": "image/jpeg"} if headers is None else headers
+    response.iter_content.return_value = list(chunks)
+    return response
+
+
 class TestDownloadImage:
-    def test_download_image_success(self):
+    def test_download_image_success(self, tmp_path):
         # Arrange
         url = "https://example.com/image.jpg"
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            save_path = temp_file.name
-        
-        mock_response = Mock()
-        mock_response.content = b"fake image data"
-        
-        # Act & Assert
-        with patch('requests.get', return_value=mock_response):
-            result = download_image(url, save_path)
-            assert result is True
-            
-        # Cleanup
-        os.unlink(save_path)
-    
+        save_path = tmp_path / "image.jpg"
+
+        # Act
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.return_value = _image_response()
+            result = download_image(url, str(save_path))
+
+        # Assert
+        assert result is True
+        assert save_path.read_bytes() == b"fake image data"
+        assert mock_session.return_value.get.call_args.kwargs["stream"] is True
+
     def test_download_image_request_failure(self):
         # Arrange
         url = "https://example.com/nonexistent.jpg"
         save_path = "/tmp/test_image.jpg"
         
         # Act & Assert
-        with patch('requests.get', side_effect=requests.exceptions.RequestException("Connection error")):
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.side_effect = requests.exceptions.RequestException("Connection error")
             with pytest.raises(Exception, match="Failed to download image"):
                 download_image(url, save_path)
     
@@ -48,14 +56,57 @@ class TestDownloadImage:
         url = "https://example.com/image.jpg"
         save_path = "/invalid/path/image.jpg"
         
-        mock_response = Mock()
-        mock_response.content = b"fake image data"
-        
         # Act & Assert
-        with patch('requests.get', return_value=mock_response):
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.return_value = _image_response()
             with pytest.raises(Exception, match="Failed to save image"):
                 download_image(url, save_path)
 
+    def test_download_image_rejects_non_images(self, tmp_path):
+        # Arrange
+        save_path = tmp_path / "page.jpg"
+
+        # Act & Assert
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.return_value = _image_response(headers={"Content-Type": "text/html; charset=utf-8"})
+            with pytest.raises(Exception, match="Refused image"):
+                download_image("https://example.com/page", str(save_path))
+        assert not save_path.exists()
+
+    @patch('dexter.agents.tools.settings.IMAGE_DOWNLOAD_MAX_BYTES', 10)
+    def test_download_image_stops_at_size_limit(self, tmp_path):
+        # Arrange
+        save_path = tmp_path / "big.jpg"
+
+        # Act & Assert
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.return_value = _image_response(chunks=[b"x" * 8, b"x" * 8])
+            with pytest.raises(Exception, match="byte limit"):
+                download_image("https://example.com/big.jpg", str(save_path))
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestDownloadImages:
+    def test_download_images_saves_each_url(self, tmp_path):
+        # Arrange
+        urls = ["https://example.com/a.png", "https://example.com/photo", "https://example.com/missing.png"]
+
+        def get(url, **kwargs):
+            if "missing" in url:
+                raise requests.exceptions.HTTPError("404 Not Found")
+            return _image_response(headers={"Content-Type": "image/png"})
+
+        # Act
+        with patch('dexter.utils.http.http_session') as mock_session:
+            mock_session.return_value.get.side_effect = get
+            result = download_images(urls, str(tmp_path / "images"))
+
+        # Assert
+        assert result[urls[0]] == str(tmp_path / "images" / "00_a.png")
+        assert result[urls[1]] == str(tmp_path / "images" / "01_image.png")
+        assert result[urls[2]].startswith("Error:")
+        assert (tmp_path / "images" / "01_image.png").read_bytes() == b"fake image data"
+
 
 class TestSearchProducts:
     @patch('dexter.agents.tools.go_to')
@@ -78,9 +129,10 @@ class TestSearchProducts:
 
 
 class TestExtractTextFromPdf:
-    def test_extract_text_from_pdf_success(self):
+    def test_extract_text_from_pdf_success(self, tmp_path):
         # Arrange
-        pdf_path = "/fake/path/test.pdf"
+        pdf_path = tmp_path / "test.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 fake")
         expected_text = "This is test content from PDF"
         
         mock_page = Mock()
@@ -90,9 +142,9 @@ class TestExtractTextFromPdf:
         mock_reader.pages = [mock_page]
         
         # Act & Assert
-        with patch('builtins.open', mock_open()):
+        with patch('dexter.agents.pdf.pdf_cache.directory', tmp_path / "cache"):
             with patch('pypdf.PdfReader', return_value=mock_reader):
-                result = extract_text_from_pdf(pdf_path)
+                result = extract_text_from_pdf(str(pdf_path))
                 assert result == expected_text
     
     def test_extract_text_from_pdf_file_not_found(self):
@@ -106,9 +158,12 @@ class TestExtractTextFromPdf:
 
 
 class TestSearchYouTubeVideos:
-    @patch('dexter.agents.tools.build')
-    @patch('dexter.agents.tools.YouTubeTranscriptApi')
-    def test_search_youtube_videos_basic(self, mock_transcript_api, mock_build):
+    def setup_method(self):
+        api_cache.clear()
+
+    @patch('dexter.agents.youtube.youtube_client')
+    @patch('dexter.agents.tools.fetch_transcripts')
+    def test_search_youtube_videos_basic(self, mock_fetch_transcripts, mock_build):
         # Arrange
         query = "python tutorial"
         
@@ -145,9 +200,7 @@ class TestSearchYouTubeVideos:
         mock_build.return_value = mock_youtube
         
         # Mock transcript
-        mock_transcript_api.get_transcript.return_value = [
-            {"text": "Welcome to Python tutorial"}
-        ]
+        mock_fetch_transcripts.return_value = {"test123": "Welcome to Python tutorial"}
         
         # Act
         results = search_youtube_videos(query, max_results=1)
@@ -158,9 +211,33 @@ class TestSearchYouTubeVideos:
         assert results[0]["title"] == "Python Tutorial"
         assert results[0]["url"] == "https://www.youtube.com/watch?v=test123"
         assert "statistics" in results[0]
-        assert "transcript" in results[0]
+        assert results[0]["transcript"] == "Welcome to Python tutorial"
+        mock_fetch_transcripts.assert_called_once_with(["test123"], ["en"])
+
+    @patch('dexter.agents.youtube.youtube_client')
+    @patch('dexter.agents.tools.fetch_transcripts')
+    @patch('dexter.agents.youtube.settings.TRANSCRIPT_PREVIEW_CHARS', 10)
+    def test_search_youtube_videos_returns_transcript_previews(self, mock_fetch_transcripts, mock_build):
+        # Arrange
+        mock_youtube = Mock()
+        mock_youtube.search.return_value.list.return_value.execute.return_value = {"items": [{
+            "id": {"videoId": "test123"},
+            "snippet": {"title": "T", "description": "D", "channelTitle": "C", "publishedAt": "2024-01-01T00:00:00Z", "thumbnails": {}}
+        }]}
+        mock_youtube.videos.return_value.list.return_value.execute.return_value = {"items": []}
+        mock_build.return_value = mock_youtube
+        mock_fetch_transcripts.return_value = {"test123": "a long transcript text"}
+        
+        # Act
+        preview = search_youtube_videos("query")[0]["transcript"]
+        full = search_youtube_videos("query", full_transcripts=True)[0]["transcript"]
+        
+        # Assert
+        assert preview.startswith("a long tra")
+        assert "get_video_transcript('test123')" in preview
+        assert full == "a long transcript text"
     
-    @patch('dexter.agents.tools.build')
+    @patch('dexter.agents.youtube.youtube_client')
     def test_search_youtube_videos_no_transcripts(self, mock_build):
         # Arrange
         query = "test query"
@@ -186,55 +263,50 @@ class TestSearchYouTubeVideos:
 
 
 class TestGetVideoTranscript:
-    @patch('dexter.agents.tools.YouTubeTranscriptApi')
-    def test_get_video_transcript_success(self, mock_transcript_api):
+    @patch('dexter.agents.tools.fetch_transcript')
+    def test_get_video_transcript_success(self, mock_fetch_transcript):
         # Arrange
         video_id = "test123"
-        transcript_data = [
-            {"text": "Hello everyone"},
-            {"text": "Welcome to this video"}
-        ]
         expected_transcript = "Hello everyone\nWelcome to this video"
-        
-        mock_transcript_api.get_transcript.return_value = transcript_data
+        mock_fetch_transcript.return_value = expected_transcript
         
         # Act
         result = get_video_transcript(video_id)
         
         # Assert
         assert result == expected_transcript
-        mock_transcript_api.get_transcript.assert_called_once_with(video_id)
+        mock_fetch_transcript.assert_called_once_with(video_id, ["en"])
     
-    @patch('dexter.agents.tools.YouTubeTranscriptApi')
-    def test_get_video_transcript_no_transcript_available(self, mock_transcript_api):
-        # Arrange
-        video_id = "test123"
-        mock_transcript_api.get_transcript.side_effect = TranscriptsDisabled("Transcripts disabled")
-        
+    @patch('dexter.agents.tools.fetch_transcript')
+    def test_get_video_transcript_prefers_requested_language(self, mock_fetch_transcript):
         # Act
-        result = get_video_transcript(video_id)
+        get_video_transcript("test123", language="es")
         
         # Assert
-        assert result is None
+        mock_fetch_transcript.assert_called_once_with("test123", ["es", "en"])
     
-    @patch('dexter.agents.tools.YouTubeTranscriptApi')
-    def test_get_video_transcript_not_found(self, mock_transcript_api):
+    @patch('dexter.agents.tools.fetch_transcript')
+    def test_get_video_transcript_no_transcript_available(self, mock_fetch_transcript):
         # Arrange
-        video_id = "test123"
-        mock_transcript_api.get_transcript.side_effect = NoTranscriptFound(video_id, ["en"], [])
+        mock_fetch_transcript.return_value = None
         
         # Act
-        result = get_video_transcript(video_id)
+        result = get_video_transcript("test123")
         
         # Assert
         assert result is None
 
 
 class TestWatchYouTubeVideo:
-    @patch('dexter.agents.tools.genai.Client')
-    def test_watch_youtube_video_success(self, mock_client_class):
+    @pytest.fixture(autouse=True)
+    def analysis_store(self, tmp_path):
+        with patch('dexter.agents.youtube._analysis_store', return_value=SQLiteCache(tmp_path / "analysis.sqlite3")):
+            yield
+
+    @patch('dexter.agents.youtube.gemini_client')
+    def test_watch_youtube_video_success(self, mock_client_factory):
         # Arrange
-        url = "https://www.youtube.com/watch?v=test123"
+        url = "https://www.youtube.com/watch?v=test123abcd"
         prompt = "What is this video about?"
         expected_response = "This video is about Python programming."
         
@@ -243,7 +315,7 @@ class TestWatchYouTubeVideo:
         mock_response.text = expected_response
         
         mock_client.models.generate_content.return_value = mock_response
-        mock_client_class.return_value = mock_client
+        mock_client_factory.return_value = mock_client
         
         # Act
         result = watch_youtube_video(url, prompt)
@@ -252,18 +324,18 @@ class TestWatchYouTubeVideo:
         assert result == expected_response
         mock_client.models.generate_content.assert_called_once()
     
-    @patch('dexter.agents.tools.genai.Client')
-    def test_watch_youtube_video_api_error(self, mock_client_class):
+    @patch('dexter.agents.youtube.gemini_client')
+    def test_watch_youtube_video_api_error(self, mock_client_factory):
         # Arrange
-        url = "https://www.youtube.com/watch?v=test123"
+        url = "https://www.youtube.com/watch?v=test123abcd"
         prompt = "What is this video about?"
         
         mock_client = Mock()
         mock_client.models.generate_content.side_effect = Exception("API Error")
-        mock_client_class.return_value = mock_client
+        mock_client_factory.return_value = mock_client
         
         # Act
         result = watch_youtube_video(url, prompt)
         
         # Assert
-        assert result is None
\ No newline at end of file
+        assert result is None
@@ -0,0 +1,146 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from dexter.agents.web_tools import CachedVisitWebpageTool, CachedWebSearchTool, _LazyStore, normalize_query
+from dexter.utils.page_store import PageStore
+
+RESULTS = [{"title": "Title", "link": "https://example.com", "description": "Description"}]
+
+
+@pytest.fixture
+def tool(tmp_path):
+    with patch('dexter.agents.web_tools.settings.WEB_SEARCH_CACHE_PATH', tmp_path / "web_search.sqlite3"):
+        yield CachedWebSearchTool()
+
+
+class TestCachedWebSearchTool:
+    """Test cases for the cached web_search tool."""
+
+    def test_normalize_query(self):
+        # Act & Assert
+        assert normalize_query("  Python   ASYNC\tIO ") == "python async io"
+
+    def test_equivalent_queries_search_once(self, tool):
+        # Arrange
+        with patch('smolagents.WebSearchTool.search', return_value=RESULTS) as mock_search:
+            # Act
+            first = tool.forward("Python asyncio")
+            second = tool.forward("  python   ASYNCIO ")
+
+        # Assert
+        assert first == second
+        mock_search.assert_called_once_with("Python asyncio")
+        assert tool.stats()["memory"]["hits"] == 1
+
+    def test_results_persist_across_instances(self, tool, tmp_path):
+        # Arrange
+        with patch('smolagents.WebSearchTool.search', return_value=RESULTS):
+            tool.forward("query")
+
+        # Act
+        with patch('dexter.agents.web_tools.settings.WEB_SEARCH_CACHE_PATH', tmp_path / "web_search.sqlite3"), \
+                patch('smolagents.WebSearchTool.search') as mock_search:
+            other = CachedWebSearchTool()
+            result = other.forward("query")
+
+        # Assert
+        mock_search.assert_not_called()
+        assert "https://example.com" in result
+        assert other.stats()["persistent_hits"] == 1
+
+    def test_empty_results_are_not_cached(self, tool):
+        # Arrange
+        with patch('smolagents.WebSearchTool.search', side_effect=[[], RESULTS]) as mock_search:
+            # Act
+            with pytest.raises(Exception, match="No results found"):
+                tool.forward("query")
+            result = tool.forward("query")
+
+        # Assert
+        assert mock_search.call_count == 2
+        assert "Title" in result
+
+    def test_ttl_is_configured_per_engine(self, tool):
+        # Arrange
+        with patch('dexter.agents.web_tools.settings.WEB_SEARCH_CACHE_TTLS', {"bing": 60}):
+            bing = CachedWebSearchTool(engine="bing")
+
+            # Act & Assert
+            assert bing.ttl == 60
+            assert tool.ttl == 3600
+
+
+def _response(status_code=200, text="<h1>Title</h1>", headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.text = text
+    response.content = text.encode()
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def page_tool(tmp_path):
+    tool = CachedVisitWebpageTool()
+    tool.store = _LazyStore("Page store", lambda: PageStore(tmp_path))
+    return tool
+
+
+class TestCachedVisitWebpageTool:
+    """Test cases for the page-store backed visit_webpage tool."""
+
+    def test_fresh_page_is_served_from_store(self, page_tool):
+        # Arrange
+        with patch('dexter.agents.web_tools.http_session') as mock_session:
+            mock_session.return_value.get.return_value = _response()
+
+            # Act
+            first = page_tool.forward("https://example.com")
+            second = page_tool.forward("https://example.com")
+
+        # Assert
+        assert first == second == "Title\n====="
+        mock_session.return_value.get.assert_called_once()
+        assert page_tool.stats()["fresh_hits"] == 1
+
+    def test_stale_page_is_revalidated(self, page_tool):
+        # Arrange
+        with patch('dexter.agents.web_tools.http_session') as mock_session, \
+                patch('dexter.agents.web_tools.settings.PAGE_STORE_FRESH_SECONDS', 0):
+            mock_session.return_value.get.side_effect = [_response(headers={"ETag": '"v1"'}), _response(status_code=304, text="")]
+
+            # Act
+            page_tool.forward("https://example.com")
+            result = page_tool.forward("https://example.com")
+
+        # Assert
+        assert result == "Title\n====="
+        assert mock_session.return_value.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert page_tool.stats()["revalidated"] == 1
+
+    def test_unchanged_content_skips_conversion(self, page_tool):
+        # Arrange
+        with patch('dexter.agents.web_tools.http_session') as mock_session, \
+                patch('dexter.agents.web_tools.page_to_markdown', return_value="converted") as mock_convert:
+            mock_session.return_value.get.return_value = _response()
+
+            # Act
+            page_tool.forward("https://example.com/a")
+            result = page_tool.forward("https://example.com/b")
+
+        # Assert
+        assert result == "converted"
+        mock_convert.assert_called_once()
+
+    def test_request_errors_are_reported(self, page_tool):
+        # Arrange
+        with patch('dexter.agents.web_tools.http_session') as mock_session:
+            mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("refused")
+
+            # Act
+            result = page_tool.forward("https://example.com")
+
+        # Assert
+        assert result.startswith("Error fetching the webpage")
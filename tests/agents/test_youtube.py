@@ -0,0 +1,183 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from youtube_transcript_api._errors import RequestBlocked, TranscriptsDisabled
+
+from dexter.agents import youtube
+from dexter.agents.youtube import TranscriptCache, analyze_video, answer_from_summary, fetch_transcript, fetch_transcripts
+from dexter.utils.cache import SQLiteCache
+
+
+class TestTranscripts:
+    """Test cases for concurrent, cached transcript fetching."""
+
+    def setup_method(self):
+        self.api = Mock()
+        self.api.fetch.side_effect = lambda video_id, languages: [Mock(text=f"{video_id} line 1"), Mock(text=f"{video_id} line 2")]
+
+    def patch_youtube(self, tmp_path):
+        cache = patch.object(youtube, 'transcript_cache', TranscriptCache(tmp_path))
+        api = patch.object(youtube, '_transcript_api', return_value=self.api)
+        return cache, api
+
+    def test_transcript_is_fetched_once_then_served_from_disk(self, tmp_path):
+        # Arrange
+        cache, api = self.patch_youtube(tmp_path)
+
+        # Act
+        with cache, api:
+            first = fetch_transcript("abc", ["en"])
+            second = fetch_transcript("abc", ["en"])
+            other_language = fetch_transcript("abc", ["es", "en"])
+
+        # Assert
+        assert first == second == "abc line 1\nabc line 2"
+        assert other_language == first
+        assert self.api.fetch.call_count == 2
+
+    def test_missing_transcript_is_cached(self, tmp_path):
+        # Arrange
+        self.api.fetch.side_effect = TranscriptsDisabled("abc")
+        cache, api = self.patch_youtube(tmp_path)
+
+        # Act
+        with cache, api:
+            results = [fetch_transcript("abc"), fetch_transcript("abc")]
+
+        # Assert
+        assert results == [None, None]
+        self.api.fetch.assert_called_once()
+
+    def test_blocked_request_is_not_cached(self, tmp_path):
+        # Arrange
+        self.api.fetch.side_effect = [RequestBlocked("abc"), [Mock(text="hello")]]
+        cache, api = self.patch_youtube(tmp_path)
+
+        # Act
+        with cache, api:
+            with pytest.raises(RequestBlocked):
+                fetch_transcript("abc")
+            text = fetch_transcript("abc")
+
+        # Assert
+        assert text == "hello"
+        assert self.api.fetch.call_count == 2
+
+    @patch('dexter.agents.youtube.settings')
+    def test_transcripts_are_fetched_concurrently(self, mock_settings, tmp_path):
+        # Arrange
+        mock_settings.TRANSCRIPT_FETCH_CONCURRENCY = 4
+        mock_settings.TRANSCRIPT_MISSING_TTL_SECONDS = 3600
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_fetch(video_id, languages):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            if video_id == "broken":
+                raise ConnectionError("reset")
+            return [Mock(text=video_id)]
+
+        self.api.fetch.side_effect = slow_fetch
+        cache, api = self.patch_youtube(tmp_path)
+
+        # Act
+        with cache, api:
+            transcripts = fetch_transcripts(["v1", "v2", "v3", "v4", "v5", "v6", "broken"])
+
+        # Assert
+        assert transcripts["v6"] == "v6"
+        assert transcripts["broken"] is None
+        assert 1 < peak[0] <= 4
+
+
+class TestYouTubeRequests:
+    """Test cases for the cached YouTube Data API client."""
+
+    def setup_method(self):
+        youtube.api_cache.clear()
+        self.quota = youtube.YouTubeQuota(daily_limit=1000)
+
+    @patch('dexter.agents.youtube.youtube_client')
+    def test_identical_requests_are_served_from_cache(self, mock_client):
+        # Arrange
+        mock_client.return_value.search.return_value.list.return_value.execute.return_value = {"items": [1]}
+
+        # Act
+        with patch.object(youtube, 'quota', self.quota):
+            first = youtube.youtube_request("search", "list", q="python", part="snippet", order=None)
+            second = youtube.youtube_request("search", "list", part="snippet", q="python")
+            youtube.youtube_request("search", "list", q="rust", part="snippet")
+
+        # Assert
+        assert first == second == {"items": [1]}
+        assert mock_client.return_value.search.return_value.list.call_count == 2
+        mock_client.return_value.search.return_value.list.assert_any_call(q="python", part="snippet")
+        stats = self.quota.stats()
+        assert (stats["used"], stats["saved"]) == (200, 100)
+
+    def test_client_is_built_once_per_thread_from_bundled_document(self):
+        # Arrange
+        youtube._local.__dict__.pop("youtube", None)
+
+        # Act
+        with patch('dexter.agents.youtube.build_from_document') as mock_build:
+            first = youtube.youtube_client()
+            second = youtube.youtube_client()
+        youtube._local.__dict__.pop("youtube", None)
+
+        # Assert
+        assert first is second
+        mock_build.assert_called_once()
+        assert '"name": "youtube"' in mock_build.call_args[0][0]
+
+
+class TestVideoAnalysis:
+    """Test cases for cached Gemini video analysis."""
+
+    URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    def setup_method(self):
+        self.client = Mock()
+        self.client.models.generate_content.side_effect = lambda model, contents: Mock(text=f"answer {self.client.models.generate_content.call_count}")
+
+    def patch_gemini(self, tmp_path):
+        store = patch.object(youtube, '_analysis_store', return_value=SQLiteCache(tmp_path / "analysis.sqlite3"))
+        client = patch.object(youtube, 'gemini_client', return_value=self.client)
+        return store, client
+
+    def test_same_question_is_answered_from_cache(self, tmp_path):
+        # Arrange
+        store, client = self.patch_gemini(tmp_path)
+
+        # Act
+        with store, client:
+            first = analyze_video(self.URL, "What is  shown?")
+            second = analyze_video("https://youtu.be/dQw4w9WgXcQ", "What is shown?")
+            other_fps = analyze_video(self.URL, "What is shown?", fps=1.0)
+
+        # Assert
+        assert first == second == "answer 1"
+        assert other_fps == "answer 2"
+
+    def test_follow_up_questions_reuse_the_stored_summary(self, tmp_path):
+        # Arrange
+        store, client = self.patch_gemini(tmp_path)
+
+        # Act
+        with store, client:
+            answer_from_summary(self.URL, "Who is singing?")
+            answer_from_summary(self.URL, "What colour is the jacket?")
+
+        # Assert
+        calls = self.client.models.generate_content.call_args_list
+        video_calls = [call for call in calls if not isinstance(call.kwargs["contents"], str)]
+        assert len(calls) == 3
+        assert len(video_calls) == 1
+        assert "What colour is the jacket?" in calls[2].kwargs["contents"]
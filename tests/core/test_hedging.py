@@ -0,0 +1,173 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from dexter.core.hedging import Hedger
+
+
+def fake_acompletion(delays: dict, errors: dict | None = None, started: list | None = None, cancelled: list | None = None):
+    """Build an acompletion replacement whose per-model first-token delay is controlled."""
+    errors = errors or {}
+
+    async def _acompletion(model, stream, **kwargs):
+        if started is not None:
+            started.append(model)
+
+        async def _stream():
+            try:
+                await asyncio.sleep(delays[model])
+                if model in errors:
+                    raise errors[model]
+                yield f"{model}:"
+                yield "answer"
+            except asyncio.CancelledError:
+                if cancelled is not None:
+                    cancelled.append(model)
+                raise
+        return _stream()
+    return _acompletion
+
+
+def join_chunks(chunks, messages=None):
+    return "".join(chunks)
+
+
+@patch('dexter.core.hedging.stream_chunk_builder', side_effect=join_chunks)
+class TestHedger:
+
+    def test_fast_primary_is_not_hedged(self, _):
+        """Test that a primary producing tokens before the delay never fires a hedge."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+        started = []
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.0, "b": 0.0}, started=started)), \
+             patch.object(hedger, 'hedge_delay', return_value=0.5):
+            response, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        assert (response, model) == ("a:answer", "a")
+        assert started == ["a"]
+        assert hedger.stats()["hedges_fired"] == 0
+
+    def test_slow_primary_is_hedged_and_cancelled(self, _):
+        """Test that the hedge wins against a stalled primary, which is then cancelled."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+        cancelled = []
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 5.0, "b": 0.0}, cancelled=cancelled)), \
+             patch.object(hedger, 'hedge_delay', return_value=0.05):
+            response, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        assert (response, model) == ("b:answer", "b")
+        stats = hedger.stats()
+        assert stats["hedges_fired"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_losses"] == 0
+        assert cancelled == ["a"]
+
+    def test_primary_can_still_win_after_hedge(self, _):
+        """Test that a primary answering before the hedge is counted as a hedge loss."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 5.0})), \
+             patch.object(hedger, 'hedge_delay', return_value=0.02):
+            response, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        assert model == "a"
+        assert hedger.stats()["hedge_losses"] == 1
+
+    def test_failed_hedge_falls_back_to_primary(self, _):
+        """Test that a hedge failing before its first token leaves the primary running."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 0.0}, errors={"b": RuntimeError("boom")})), \
+             patch.object(hedger, 'hedge_delay', return_value=0.02):
+            response, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        assert (response, model) == ("a:answer", "a")
+
+    def test_both_failing_raises(self, _):
+        """Test that the primary's error surfaces when both requests fail."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+        errors = {"a": ValueError("primary"), "b": RuntimeError("hedge")}
+
+        # Act & Assert
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 0.0}, errors=errors)), \
+             patch.object(hedger, 'hedge_delay', return_value=0.02):
+            with pytest.raises(ValueError, match="primary"):
+                hedger.complete("a", "b", messages=[])
+
+    def test_budget_limits_hedges(self, _):
+        """Test that hedges are denied once the budget is spent."""
+        # Arrange
+        hedger = Hedger(max_fraction=0.0)
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 0.0})), \
+             patch.object(hedger, 'hedge_delay', return_value=0.01):
+            hedger.complete("a", "b", messages=[])
+            _, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        stats = hedger.stats()
+        assert model == "a"
+        assert stats["hedges_fired"] == 1
+        assert stats["budget_denied"] == 1
+        assert stats["requests"] == 2
+
+    def test_max_fraction_is_capped_at_one(self, _):
+        """Test that the hedge rate can never exceed one hedge per request."""
+        assert Hedger(max_fraction=3.0).max_fraction == 1.0
+
+    def test_hedge_needs_rate_limit_capacity(self, _):
+        """Test that no hedge is sent when the alternate model's rate limiter has no capacity."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+        limiter = Mock()
+        limiter.try_acquire.return_value = False
+        started = []
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 0.0}, started=started)), \
+             patch('dexter.core.hedging.get_rate_limiter', return_value=limiter), \
+             patch.object(hedger, 'hedge_delay', return_value=0.01):
+            _, model = hedger.complete("a", "b", messages=[])
+
+        # Assert
+        stats = hedger.stats()
+        assert model == "a"
+        assert started == ["a"]
+        assert stats["hedges_fired"] == 0
+        assert stats["rate_limited"] == 1
+
+    def test_hedge_needs_admission(self, _):
+        """Test that no hedge is sent, and no rate limit capacity is taken, when the caller does not admit it."""
+        # Arrange
+        hedger = Hedger(max_fraction=1.0)
+        limiter = Mock()
+        started = []
+
+        # Act
+        with patch('dexter.core.hedging.acompletion', fake_acompletion({"a": 0.1, "b": 0.0}, started=started)), \
+             patch('dexter.core.hedging.get_rate_limiter', return_value=limiter), \
+             patch.object(hedger, 'hedge_delay', return_value=0.01):
+            _, model = hedger.complete("a", "b", lambda: False, messages=[])
+
+        # Assert
+        assert model == "a"
+        assert started == ["a"]
+        limiter.try_acquire.assert_not_called()
+        assert hedger.stats()["not_admitted"] == 1
@@ -1,6 +1,10 @@
 from unittest.mock import Mock, patch
 from concurrent.futures import Future
+import pytest
+from litellm.exceptions import BadRequestError
 from dexter.core.llm import LLM
+from dexter.core.model_router import ModelRouter
+from dexter.core.resilience import CircuitBreaker, CircuitOpenError
 from dexter.service.history_manager import HistoryManager
 
 class TestLLM:
@@ -239,6 +243,63 @@ class TestLLM:
             assert len(llm.pending_tasks) == 1
             mock_llm_input.assert_not_called()
     
+    @patch('dexter.core.llm.event_bus')
+    def test_finished_task_is_delivered_and_published(self, mock_event_bus):
+        """Test that a tracked task's result triggers a background follow-up turn and is pushed to clients."""
+        # Arrange
+        llm = LLM()
+        future = Future()
+        
+        def follow_up(*args, **kwargs):
+            llm.complete_response = "Your report is ready"
+        
+        with patch.object(llm, 'llm_input', side_effect=follow_up) as mock_llm_input:
+            llm._track_task(future, "Make a report")
+            
+            # Act
+            future.set_result("report.pdf")
+            llm.result_executor.submit(lambda: None).result()
+            
+            # Assert
+            assert llm.pending_tasks == []
+            assert mock_llm_input.call_args.kwargs["cacheable"] is False
+            assert mock_llm_input.call_args.kwargs["query"] == "Make a report"
+            assert "report.pdf" in str(mock_llm_input.call_args.args[0])
+            event_type, data = mock_event_bus.publish.call_args.args
+            assert event_type == "agent_result"
+            assert data["response"] == "Your report is ready"
+            assert llm.complete_response is None
+    
+    @patch('dexter.core.llm.event_bus')
+    def test_task_result_goes_to_originating_conversation(self, mock_event_bus):
+        """Test that a result is delivered into the conversation that started the task, then the current one is restored."""
+        # Arrange
+        llm = LLM()
+        llm.history_manager.history_file = "old.json"
+        llm.history = [{"role": "system", "content": "old"}]
+        future = Future()
+        llm._track_task(future)
+        llm.history_manager.history_file = "new.json"
+        current_history = [{"role": "system", "content": "new"}]
+        llm.history = current_history
+        seen = {}
+        
+        def follow_up(*args, **kwargs):
+            seen["history_file"] = llm.history_manager.history_file
+        
+        with patch.object(llm.history_manager, 'load_history', return_value=[{"role": "system", "content": "old"}]), \
+             patch.object(llm, 'llm_input', side_effect=follow_up):
+            
+            # Act
+            future.set_result("done")
+            llm.result_executor.submit(lambda: None).result()
+            
+            # Assert
+            assert seen["history_file"] == "old.json"
+            assert llm.history_manager.history_file == "new.json"
+            assert llm.history is current_history
+            assert mock_event_bus.publish.call_args.args[1]["history_file"] == "old.json"
+    
     @patch('dexter.core.llm.completion')
     @patch('dexter.core.llm.settings')
     def test_send_message_with_retry_success(self, mock_settings, mock_completion):
@@ -248,6 +309,8 @@ class TestLLM:
         mock_settings.TEMPERATURE = 0.7
         mock_settings.MAX_TOKENS = 1000
         mock_settings.TOP_P = 0.9
+        mock_settings.MODEL_DEADLINE_SECONDS = 8
+        mock_settings.LLM_HEDGING_ENABLED = False
         mock_response = Mock()
         mock_completion.return_value = mock_response
         messages = [{"role": "user", "content": "test"}]
@@ -264,9 +327,209 @@ class TestLLM:
             max_tokens=1000,
             top_p=0.9,
             tools=[],
-            tool_choice="auto"
+            tool_choice="auto",
+            timeout=8
         )
     
+    @patch('dexter.core.llm.completion')
+    def test_send_message_fails_over_to_next_model(self, mock_completion):
+        """Test that a failing model is skipped in favour of the next router candidate."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        mock_response = Mock()
+        mock_completion.side_effect = [TimeoutError("deadline exceeded"), mock_response]
+        
+        # Act
+        result = llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        
+        # Assert
+        assert result == mock_response
+        assert [c.kwargs["model"] for c in mock_completion.call_args_list] == ["primary/model", "backup/model"]
+        assert llm.router.stats()["primary/model"]["error_rate"] == 1.0
+        assert llm.router.stats()["backup/model"]["samples"] == 1
+    
+    @patch('dexter.core.llm.time.sleep')
+    @patch('dexter.core.llm.completion')
+    def test_send_message_retries_transient_failures(self, mock_completion, mock_sleep):
+        """Test that a round where every model failed transiently is retried after backoff."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model"])
+        mock_response = Mock()
+        mock_completion.side_effect = [ConnectionError("reset"), mock_response]
+        
+        # Act
+        result = llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        
+        # Assert
+        assert result == mock_response
+        assert mock_completion.call_count == 2
+        mock_sleep.assert_called_once()
+        assert llm.retry_budget.stats()["retries"] == 1
+    
+    @patch('dexter.core.llm.time.sleep')
+    @patch('dexter.core.llm.completion')
+    def test_send_message_does_not_retry_request_errors(self, mock_completion, mock_sleep):
+        """Test that errors caused by the request itself are raised without retrying."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model"])
+        mock_completion.side_effect = BadRequestError("invalid message", "model", "primary")
+        
+        # Act & Assert
+        with pytest.raises(BadRequestError):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        assert mock_completion.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    @patch('dexter.core.llm.completion')
+    def test_send_message_raises_unexpected_errors_at_once(self, mock_completion):
+        """Test that an error unrelated to the provider is raised without failing over or tripping the breaker."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        mock_completion.side_effect = KeyError("choices")
+        
+        # Act & Assert
+        with pytest.raises(KeyError):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        assert mock_completion.call_count == 1
+        assert llm._breaker("primary/model").allow_request()
+    
+    @patch('dexter.core.llm.completion')
+    def test_send_message_fails_fast_when_circuits_open(self, mock_completion):
+        """Test that providers with an open circuit are skipped without a network call."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model"])
+        llm.breakers = {"primary": CircuitBreaker("primary", failure_threshold=1)}
+        llm.breakers["primary"].record_failure()
+        
+        # Act & Assert
+        with pytest.raises(CircuitOpenError):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        mock_completion.assert_not_called()
+
+    @patch('dexter.core.llm.get_rate_limiter')
+    @patch('dexter.core.llm.completion')
+    def test_rate_limit_timeout_releases_half_open_probe(self, mock_completion, mock_get_limiter):
+        """Test that a half-open probe that never got rate-limit capacity does not keep the circuit stuck."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model"])
+        llm.breakers = {"primary": CircuitBreaker("primary", failure_threshold=1, recovery_seconds=0)}
+        llm.breakers["primary"].record_failure()
+        limiter = Mock()
+        limiter.acquire.side_effect = [TimeoutError("no capacity"), 0.0]
+        mock_get_limiter.return_value = limiter
+        mock_response = Mock()
+        mock_completion.return_value = mock_response
+
+        # Act
+        with pytest.raises(TimeoutError):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+        result = llm._send_message_with_retry([{"role": "user", "content": "test"}])
+
+        # Assert
+        assert result == mock_response
+        assert llm.breakers["primary"].state == CircuitBreaker.CLOSED
+
+    @patch('dexter.core.llm.get_rate_limiter')
+    @patch('dexter.core.llm.completion')
+    def test_user_turn_fails_over_when_rate_limited(self, mock_completion, mock_get_limiter):
+        """Test that a user turn waits only briefly for a rate-limited model when another one is left to try."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        limiter = Mock()
+        limiter.acquire.side_effect = [TimeoutError("no capacity"), 0.0]
+        mock_get_limiter.return_value = limiter
+        mock_response = Mock()
+        mock_completion.return_value = mock_response
+
+        # Act
+        with patch('dexter.core.llm.settings.LLM_HEDGING_ENABLED', False):
+            result = llm._send_message_with_retry([{"role": "user", "content": "test"}])
+
+        # Assert
+        assert result == mock_response
+        assert [c.args[2] for c in limiter.acquire.call_args_list] == [5.0, None]
+        assert mock_completion.call_args.kwargs["model"] == "backup/model"
+
+    @patch('dexter.core.llm.get_rate_limiter')
+    def test_hedge_win_settles_both_limiters(self, mock_get_limiter):
+        """Test that a winning hedge closes its half-open circuit and settles both models' rate limiters."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        llm.breakers = {"primary": CircuitBreaker("primary"), "backup": CircuitBreaker("backup", failure_threshold=1, recovery_seconds=0)}
+        llm.breakers["backup"].record_failure()
+        limiters = {"primary/model": Mock(), "backup/model": Mock()}
+        mock_get_limiter.side_effect = limiters.get
+        mock_response = Mock()
+        mock_response.usage.prompt_tokens = 100
+        mock_response.usage.total_tokens = 150
+
+        # Act
+        with patch('dexter.core.llm.settings.LLM_HEDGING_ENABLED', True), \
+             patch.object(llm.hedger, 'complete', return_value=(mock_response, "backup/model")) as mock_complete:
+            result = llm._send_message_with_retry([{"role": "user", "content": "test"}])
+
+        # Assert
+        assert result == mock_response
+        assert mock_complete.call_args.args[:2] == ("primary/model", "backup/model")
+        assert llm.breakers["backup"].state == CircuitBreaker.CLOSED
+        assert llm.router.stats()["primary/model"]["samples"] == 1
+        estimate = limiters["primary/model"].acquire.call_args.args[0]
+        limiters["primary/model"].settle.assert_called_once_with(estimate, 100)
+        limiters["backup/model"].settle.assert_called_once_with(estimate, 150)
+
+    @patch('dexter.core.llm.get_rate_limiter', return_value=None)
+    def test_losing_hedge_releases_its_probe(self, _):
+        """Test that a half-open hedge model whose hedge fired but did not answer gets its probe slot back."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        llm.breakers = {"primary": CircuitBreaker("primary"), "backup": CircuitBreaker("backup", failure_threshold=1, recovery_seconds=0)}
+        llm.breakers["backup"].record_failure()
+
+        def complete(model, hedge_model, admit, **kwargs):
+            assert admit()
+            return Mock(), model
+
+        # Act
+        with patch('dexter.core.llm.settings.LLM_HEDGING_ENABLED', True), \
+             patch.object(llm.hedger, 'complete', side_effect=complete):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+
+        # Assert
+        assert llm.breakers["backup"].allow_request()
+
+    @patch('dexter.core.llm.get_rate_limiter', return_value=None)
+    def test_unfired_hedge_leaves_probe_to_others(self, _):
+        """Test that choosing a half-open hedge model does not take its probe slot unless the hedge fires."""
+        # Arrange
+        llm = LLM()
+        llm.router = ModelRouter(["primary/model", "backup/model"])
+        llm.breakers = {"primary": CircuitBreaker("primary"), "backup": CircuitBreaker("backup", failure_threshold=1, recovery_seconds=0)}
+        llm.breakers["backup"].record_failure()
+        probes = []
+
+        def complete(model, hedge_model, admit, **kwargs):
+            # Another request takes the probe while the primary is still answering
+            probes.append(llm.breakers["backup"].allow_request())
+            return Mock(), model
+
+        # Act
+        with patch('dexter.core.llm.settings.LLM_HEDGING_ENABLED', True), \
+             patch.object(llm.hedger, 'complete', side_effect=complete):
+            llm._send_message_with_retry([{"role": "user", "content": "test"}])
+
+        # Assert
+        assert probes == [True]
+        assert not llm.breakers["backup"].allow_request()
+
     @patch('dexter.core.llm.extract_code_from_text')
     @patch('dexter.core.llm.run_extracted_code')
     @patch('dexter.core.llm.format_content')
@@ -296,6 +559,29 @@ class TestLLM:
             assert mock_future in llm.pending_tasks
             assert llm.complete_response == "Response with code"
             assert llm.speech_text is not None  # Should be set for code responses
+
+    @patch('dexter.core.llm.extract_code_from_text', side_effect=["visit_webpage('a')", "visit_webpage('b')", None])
+    @patch('dexter.core.llm.run_extracted_code', return_value="Code execution results: page")
+    @patch.object(LLM, '_send_message_with_retry')
+    def test_follow_up_turns_run_code_for_the_original_prompt(self, mock_send, mock_run_code, mock_extract):
+        """Test that code from follow-up turns is run for the user's prompt, without timestamp or tool output."""
+        # Arrange
+        llm = LLM()
+        llm.timestamp_mode = True
+        llm.history = [{"role": "system", "content": "system"}]
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Response"
+        mock_send.return_value = mock_response
+        
+        with patch.object(llm.history_manager, 'save_history'), \
+             patch.object(llm.history_manager, 'save_to_session'):
+            
+            # Act
+            llm.llm_input([{"text": "Find the opening hours"}])
+            
+            # Assert
+            assert [c.args[1] for c in mock_run_code.call_args_list] == ["Find the opening hours", "Find the opening hours"]
     
     @patch('dexter.core.llm.extract_code_from_text')
     @patch.object(LLM, '_send_message_with_retry')
@@ -324,6 +610,34 @@ class TestLLM:
             assert llm.speech_text is None
             mock_check.assert_called_once()
     
+    @patch('dexter.core.llm.settings')
+    @patch('dexter.core.llm.extract_code_from_text', return_value=None)
+    @patch.object(LLM, '_send_message_with_retry')
+    def test_llm_input_serves_repeated_prompt_from_cache(self, mock_send, mock_extract, mock_settings):
+        """Test that a repeated prompt is answered from the response cache."""
+        # Arrange
+        llm = LLM()
+        llm.history = [{"role": "system", "content": "system"}]
+        llm.timestamp_mode = False
+        mock_settings.RESPONSE_CACHE_ENABLED = True
+        mock_settings.SHORT_TURN_MAX_CHARS = 120
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Paris"
+        mock_send.return_value = mock_response
+        
+        with patch.object(llm.history_manager, 'save_history'), \
+             patch.object(llm, '_check_completed_tasks'):
+            
+            # Act
+            llm.llm_input([{"text": "Capital of France?"}])
+            llm.llm_input([{"text": "Capital of France?"}])
+            
+            # Assert
+            assert mock_send.call_count == 1
+            assert llm.complete_response == "Paris"
+            assert llm.response_cache.stats()["exact_hits"] == 1
+    
     def test_llm_input_new_history(self):
         """Test llm_input starts new history when new_history is True."""
         # Arrange
@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from dexter.core.model_router import ModelRouter, ModelStats, available_models, provider_of
+
+
+class TestModelStats:
+
+    def test_percentiles_use_successful_latencies(self):
+        """Test p50/p95 are computed over successful calls only."""
+        # Arrange
+        stats = ModelStats(window=100)
+        for latency in range(1, 21):
+            stats.record(float(latency), success=True)
+        stats.record(99.0, success=False)
+
+        # Act & Assert
+        assert stats.percentile(50) == 10.0
+        assert stats.percentile(95) == 19.0
+        assert round(stats.error_rate, 3) == round(1 / 21, 3)
+
+    def test_window_is_rolling(self):
+        """Test that old samples fall out of the window."""
+        # Arrange
+        stats = ModelStats(window=3)
+
+        # Act
+        for success in [False, False, True, True, True]:
+            stats.record(1.0, success=success)
+
+        # Assert
+        assert stats.error_rate == 0.0
+
+    def test_percentile_without_samples(self):
+        """Test percentile is None before any successful call."""
+        assert ModelStats(window=10).percentile(50) is None
+
+
+class TestModelRouter:
+
+    def test_candidates_keep_configured_order(self):
+        """Test that candidates follow the configured order by default."""
+        # Arrange
+        router = ModelRouter(["a/one", "b/two", "c/three"], min_samples=2)
+
+        # Act & Assert
+        assert router.candidates() == ["a/one", "b/two", "c/three"]
+
+    def test_unhealthy_model_is_demoted(self):
+        """Test that a model above the error rate threshold moves to the back."""
+        # Arrange
+        router = ModelRouter(["a/one", "b/two"], min_samples=2, max_error_rate=0.5)
+
+        # Act
+        for _ in range(3):
+            router.record_failure("a/one", 0.1)
+
+        # Assert
+        assert router.candidates() == ["b/two", "a/one"]
+
+    def test_prefer_fastest_moves_lowest_p50_first(self):
+        """Test that short turns go to the model with the lowest measured p50."""
+        # Arrange
+        router = ModelRouter(["a/slow", "b/fast"], min_samples=2)
+        for _ in range(2):
+            router.record_success("a/slow", 2.0)
+            router.record_success("b/fast", 0.3)
+
+        # Act & Assert
+        assert router.candidates(prefer_fastest=True) == ["b/fast", "a/slow"]
+        assert router.candidates() == ["a/slow", "b/fast"]
+
+    def test_prefer_fastest_ignores_unmeasured_models(self):
+        """Test that models without enough samples are not promoted."""
+        # Arrange
+        router = ModelRouter(["a/slow", "b/new"], min_samples=3)
+        for _ in range(3):
+            router.record_success("a/slow", 2.0)
+        router.record_success("b/new", 0.1)
+
+        # Act & Assert
+        assert router.candidates(prefer_fastest=True) == ["a/slow", "b/new"]
+
+    def test_stats_snapshot(self):
+        """Test the per-model stats snapshot."""
+        # Arrange
+        router = ModelRouter(["a/one"])
+        router.record_success("a/one", 1.5)
+
+        # Act
+        stats = router.stats()
+
+        # Assert
+        assert stats == {"a/one": {"samples": 1, "p50": 1.5, "p95": 1.5, "error_rate": 0.0}}
+
+
+class TestAvailableModels:
+
+    def test_provider_of(self):
+        assert provider_of("gemini/gemini-2.0-flash") == "gemini"
+        assert provider_of("gpt-4o") == "gpt-4o"
+
+    @patch('dexter.core.model_router.settings')
+    def test_skips_models_without_api_key(self, mock_settings):
+        """Test that models of providers without a configured key are dropped."""
+        # Arrange
+        mock_settings.GEMINI_API_KEY = "key"
+        mock_settings.CEREBRAS_API_KEY = ""
+
+        # Act
+        models = available_models(["gemini/gemini-2.0-flash", "cerebras/llama-3.3-70b", "gemini/gemini-2.0-flash", "ollama/llama3"])
+
+        # Assert
+        assert models == ["gemini/gemini-2.0-flash", "ollama/llama3"]
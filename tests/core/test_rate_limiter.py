@@ -0,0 +1,229 @@
+import sqlite3
+from unittest.mock import Mock, patch
+
+import pytest
+from smolagents import ChatMessage, TokenUsage
+
+from dexter.agents.run_context import AgentCancelledError, CancellationToken, RunContext, run_context
+from dexter.core import rate_limiter
+from dexter.core.rate_limiter import BACKGROUND, INTERACTIVE, RateLimitedLiteLLMModel, RateLimiter, current_lane, estimate_request_tokens, get_rate_limiter, rate_limiter_stats
+
+
+class TestRateLimiter:
+
+    def test_acquire_within_capacity_does_not_wait(self, tmp_path):
+        """Test that requests within both buckets are admitted at once and counted per lane."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=10, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        waits = [limiter.acquire(100, INTERACTIVE), limiter.acquire(100, BACKGROUND)]
+
+        # Assert
+        assert all(wait < 0.1 for wait in waits)
+        stats = limiter.stats()
+        assert stats["lanes"][INTERACTIVE]["requests"] == 1
+        assert stats["lanes"][BACKGROUND]["requests"] == 1
+        assert stats["available_tokens"] == pytest.approx(9800, abs=5)
+
+    def test_acquire_times_out_when_bucket_is_empty(self, tmp_path):
+        """Test that a caller gives up once no capacity can free up within its timeout."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+        limiter.acquire(10)
+
+        # Act & Assert
+        with pytest.raises(TimeoutError):
+            limiter.acquire(10, timeout=0.2)
+
+    def test_background_lane_leaves_reserve_for_interactive(self, tmp_path):
+        """Test that background callers cannot draw the interactive reserve of the bucket."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=10, tokens_per_minute=100000, interactive_reserve=0.2, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        admitted = 0
+        while limiter.try_acquire(10, BACKGROUND):
+            admitted += 1
+
+        # Assert
+        assert admitted == 8
+        assert limiter.try_acquire(10, INTERACTIVE)
+
+    def test_waiting_interactive_caller_holds_back_background(self, tmp_path):
+        """Test that no background request is admitted while an interactive one is waiting."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=100, tokens_per_minute=1000, interactive_reserve=0.0, path=tmp_path / "limits.sqlite3")
+        limiter.acquire(900)
+
+        # Act
+        with pytest.raises(TimeoutError):
+            limiter.acquire(500, INTERACTIVE, timeout=0.01)
+
+        # Assert
+        assert not limiter.try_acquire(10, BACKGROUND)
+        assert limiter.try_acquire(10, INTERACTIVE)
+
+    def test_processes_share_one_budget(self, tmp_path):
+        """Test that limiters opened on the same state file, as in agent worker processes, draw on one bucket."""
+        # Arrange
+        api_process = RateLimiter("test", requests_per_minute=2, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+        worker = RateLimiter("test", requests_per_minute=2, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        api_process.acquire(10)
+        worker.acquire(10)
+
+        # Assert
+        assert not api_process.try_acquire(10)
+        assert not worker.try_acquire(10)
+        assert worker.stats()["lanes"][INTERACTIVE]["requests"] == 1
+
+    def test_unusable_state_file_lets_requests_through(self, tmp_path):
+        """Test that a broken state file does not block LLM calls."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        with patch.object(limiter, '_take', side_effect=sqlite3.OperationalError("disk I/O error")):
+            wait = limiter.acquire(10)
+
+        # Assert
+        assert wait < 0.1
+
+    def test_settle_returns_overestimated_tokens(self, tmp_path):
+        """Test that reported usage below the estimate gives the difference back."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=10, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+        limiter.acquire(5000)
+
+        # Act
+        limiter.settle(5000, 1000)
+
+        # Assert
+        assert limiter.stats()["available_tokens"] == pytest.approx(9000, abs=5)
+
+    def test_throttled_pauses_all_lanes(self, tmp_path):
+        """Test that a 429 stops every caller until the provider's Retry-After has passed."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=100, tokens_per_minute=100000, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        limiter.throttled(retry_after=5)
+
+        # Assert
+        assert not limiter.try_acquire(10, INTERACTIVE)
+        assert not limiter.try_acquire(10, BACKGROUND)
+        assert limiter.stats()["throttled"] == 1
+
+    def test_acquire_stops_when_run_is_cancelled(self, tmp_path):
+        """Test that an agent run waiting for capacity stops once it is cancelled."""
+        # Arrange
+        limiter = RateLimiter("test", requests_per_minute=1, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+        limiter.acquire(10)
+        token = CancellationToken()
+        token.cancel("stop")
+
+        # Act & Assert
+        with run_context(RunContext("run-1", "test", token)):
+            with pytest.raises(AgentCancelledError):
+                limiter.acquire(10, BACKGROUND, timeout=5)
+
+
+class TestRateLimiterHelpers:
+
+    def test_current_lane_follows_agent_runs(self):
+        """Test that agent runs use the background lane and everything else the interactive one."""
+        # Act
+        outside = current_lane()
+        with run_context(RunContext("run-1", "test", CancellationToken())):
+            inside = current_lane()
+
+        # Assert
+        assert (outside, inside) == (INTERACTIVE, BACKGROUND)
+
+    def test_estimate_request_tokens_counts_text_and_images(self):
+        """Test that text is counted by length and images at a flat rate, plus the expected output."""
+        # Arrange
+        messages = [
+            {"role": "system", "content": "x" * 400},
+            {"role": "user", "content": [{"type": "text", "text": "y" * 40}, {"type": "image"}]},
+        ]
+
+        # Act
+        tokens = estimate_request_tokens(messages, expected_output=100)
+
+        # Assert
+        assert tokens == 100 + 10 + rate_limiter.IMAGE_TOKENS + 100
+
+    def test_get_rate_limiter_is_shared_per_provider(self, tmp_path):
+        """Test that models of one provider share a limiter and unlimited providers get none."""
+        # Arrange
+        limits = {"gemini": {"requests_per_minute": 15, "tokens_per_minute": 1000}}
+
+        # Act
+        with patch.object(rate_limiter.settings, 'RATE_LIMITS', limits), \
+             patch.object(rate_limiter.settings, 'RATE_LIMIT_STATE_PATH', tmp_path / "limits.sqlite3"), \
+             patch.dict(rate_limiter._limiters, clear=True):
+            first = get_rate_limiter("gemini/gemini-2.0-flash")
+            second = get_rate_limiter("gemini/gemini-2.5-pro")
+            other = get_rate_limiter("openai/gpt-4o")
+
+        # Assert
+        assert first is second
+        assert first.request_capacity == 15
+        assert other is None
+
+    def test_rate_limiter_stats_reports_unreadable_state(self, tmp_path):
+        """Test that a limiter whose state file cannot be read is reported instead of failing the metrics."""
+        # Arrange
+        limiter = RateLimiter("gemini", requests_per_minute=10, tokens_per_minute=10000, path=tmp_path / "limits.sqlite3")
+
+        # Act
+        with patch.dict(rate_limiter._limiters, {"gemini": limiter}, clear=True), \
+             patch.object(limiter, '_bucket', side_effect=sqlite3.OperationalError("database is locked")):
+            stats = rate_limiter_stats()
+
+        # Assert
+        assert stats == {"gemini": {"available": False, "error": "database is locked"}}
+
+
+class TestRateLimitedLiteLLMModel:
+
+    @patch('dexter.core.rate_limiter.LiteLLMModel.generate')
+    @patch('dexter.core.rate_limiter.get_rate_limiter')
+    def test_generate_acquires_and_settles(self, mock_get_limiter, mock_generate):
+        """Test that agent model calls wait for capacity and settle their reported usage."""
+        # Arrange
+        limiter = Mock()
+        mock_get_limiter.return_value = limiter
+        mock_generate.return_value = ChatMessage(role="assistant", content="ok", token_usage=TokenUsage(input_tokens=300, output_tokens=50))
+        model = RateLimitedLiteLLMModel(model_id="gemini/gemini-2.0-flash", api_key="key")
+        messages = [{"role": "user", "content": "z" * 400}]
+
+        # Act
+        message = model.generate(messages)
+
+        # Assert
+        assert message.content == "ok"
+        estimate = estimate_request_tokens(messages)
+        limiter.acquire.assert_called_once_with(estimate, INTERACTIVE)
+        limiter.settle.assert_called_once_with(estimate, 350)
+
+    @patch('dexter.core.rate_limiter.LiteLLMModel.generate')
+    @patch('dexter.core.rate_limiter.get_rate_limiter')
+    def test_generate_reports_429(self, mock_get_limiter, mock_generate):
+        """Test that a 429 from the provider pauses the shared limiter before it is raised."""
+        # Arrange
+        limiter = Mock()
+        mock_get_limiter.return_value = limiter
+        error = Exception("rate limited")
+        error.status_code = 429
+        mock_generate.side_effect = error
+        model = RateLimitedLiteLLMModel(model_id="gemini/gemini-2.0-flash", api_key="key")
+
+        # Act & Assert
+        with pytest.raises(Exception, match="rate limited"):
+            model.generate([{"role": "user", "content": "hi"}])
+        limiter.throttled.assert_called_once()
+        limiter.settle.assert_not_called()
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+import httpx
+from litellm.exceptions import AuthenticationError, BadRequestError, RateLimitError, ServiceUnavailableError
+
+from dexter.core.resilience import (
+    AUTH_ERROR, RATE_LIMITED, REQUEST_ERROR, TRANSIENT, UNEXPECTED,
+    CircuitBreaker, RetryBudget, classify_error, retry_after_seconds,
+)
+
+
+def rate_limit_error(headers: dict) -> RateLimitError:
+    return RateLimitError("slow down", "gemini", "gemini-2.0-flash", response=httpx.Response(429, headers=headers))
+
+
+class TestErrorClassification:
+
+    def test_classify_litellm_errors(self):
+        """Test that LiteLLM exceptions map to the expected error classes."""
+        assert classify_error(rate_limit_error({})) == RATE_LIMITED
+        assert classify_error(AuthenticationError("bad key", "gemini", "m")) == AUTH_ERROR
+        assert classify_error(BadRequestError("bad request", "m", "gemini")) == REQUEST_ERROR
+        assert classify_error(ServiceUnavailableError("down", "gemini", "m")) == TRANSIENT
+        assert classify_error(TimeoutError("deadline exceeded")) == TRANSIENT
+        assert classify_error(httpx.ConnectError("refused")) == TRANSIENT
+
+    def test_classify_other_errors_as_unexpected(self):
+        """Test that exceptions that are neither transport errors nor HTTP errors are not retried."""
+        assert classify_error(KeyError("choices")) == UNEXPECTED
+        assert classify_error(TypeError("bad argument")) == UNEXPECTED
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After parsing from seconds and millisecond headers."""
+        assert retry_after_seconds(rate_limit_error({"retry-after": "7"})) == 7.0
+        assert retry_after_seconds(rate_limit_error({"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(rate_limit_error({})) is None
+        assert retry_after_seconds(TimeoutError()) is None
+
+
+@patch('dexter.core.resilience.time')
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_rejects(self, mock_time):
+        """Test that consecutive failures open the breaker and reject calls."""
+        # Arrange
+        mock_time.time.return_value = 100.0
+        breaker = CircuitBreaker("gemini", failure_threshold=2, recovery_seconds=30)
+
+        # Act
+        breaker.record_failure()
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_half_open_allows_single_probe(self, mock_time):
+        """Test that after the recovery period one probe is let through and success closes the breaker."""
+        # Arrange
+        mock_time.time.return_value = 100.0
+        breaker = CircuitBreaker("gemini", failure_threshold=1, recovery_seconds=30)
+        breaker.record_failure()
+
+        # Act
+        mock_time.time.return_value = 131.0
+        first, second = breaker.allow_request(), breaker.allow_request()
+        breaker.record_success()
+
+        # Assert
+        assert (first, second) == (True, False)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self, mock_time):
+        """Test that a failing half-open probe opens the breaker again."""
+        # Arrange
+        mock_time.time.return_value = 100.0
+        breaker = CircuitBreaker("gemini", failure_threshold=1, recovery_seconds=30)
+        breaker.record_failure()
+        mock_time.time.return_value = 131.0
+        breaker.allow_request()
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_retry_after_opens_immediately(self, mock_time):
+        """Test that a provider's Retry-After opens the breaker for that long."""
+        # Arrange
+        mock_time.time.return_value = 100.0
+        breaker = CircuitBreaker("gemini", failure_threshold=5, recovery_seconds=30)
+
+        # Act
+        breaker.record_failure(retry_after=4.0)
+
+        # Assert
+        assert breaker.state == CircuitBreaker.OPEN
+        mock_time.time.return_value = 104.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+class TestRetryBudget:
+
+    def test_budget_limits_retries_to_ratio(self):
+        """Test that retries are capped by the burst and refilled per request."""
+        # Arrange
+        budget = RetryBudget(ratio=0.5, burst=1.0)
+
+        # Act & Assert
+        assert budget.try_acquire() is True
+        assert budget.try_acquire() is False
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_acquire() is True
+        assert budget.stats()["denied"] == 1
@@ -0,0 +1,163 @@
+from unittest.mock import patch
+
+from dexter.core.response_cache import ResponseCache, normalize_prompt
+
+
+class TestNormalizePrompt:
+
+    def test_strips_timestamp_punctuation_and_case(self):
+        """Test prompt normalization for exact-match keys."""
+        assert normalize_prompt("[16/09/2025 10:59:22] What's the  Weather?") == "whats the weather"
+
+
+class TestResponseCache:
+
+    def setup_method(self):
+        """Create a cache with a known similarity threshold."""
+        self.cache = ResponseCache(max_entries=3, similarity_threshold=0.9)
+        self.system_prompt = "system"
+
+    def test_exact_hit(self):
+        """Test that the same prompt in the same context is served from cache."""
+        # Arrange
+        self.cache.store("Capital of France?", self.system_prompt, [], "Paris")
+
+        # Act
+        result = self.cache.lookup("capital of france", self.system_prompt, [])
+
+        # Assert
+        assert result == "Paris"
+        assert self.cache.stats()["exact_hits"] == 1
+
+    def test_similar_hit(self):
+        """Test that a paraphrase with the same content is served by the similarity tier."""
+        # Arrange
+        self.cache.store("What is the capital of France?", self.system_prompt, [], "Paris")
+
+        # Act
+        result = self.cache.lookup("Hey Dexter, what's the capital of France please", self.system_prompt, [])
+
+        # Assert
+        assert result == "Paris"
+        assert self.cache.stats()["similar_hits"] == 1
+
+    def test_different_entity_misses(self):
+        """Test that prompts about different things do not match."""
+        # Arrange
+        self.cache.store("What is the capital of France?", self.system_prompt, [], "Paris")
+
+        # Act & Assert
+        assert self.cache.lookup("What is the capital of Spain?", self.system_prompt, []) is None
+        assert self.cache.stats()["misses"] == 1
+
+    def test_different_place_in_long_prompt_misses(self):
+        """Test that long prompts sharing most words but differing in one content word do not match."""
+        # Arrange
+        self.cache.store("Make a report about electric vehicles in Europe with charts", self.system_prompt, [], "Report on Europe")
+
+        # Act & Assert
+        assert self.cache.lookup("Make a report about electric vehicles in Asia with charts", self.system_prompt, []) is None
+
+    def test_code_response_is_only_served_exactly(self):
+        """Test that responses with code, which are executed again, never come from the similarity tier."""
+        # Arrange
+        response = "Starting the report.\n```python\nreport_agent('electric vehicles')\n```"
+        self.cache.store("What is the capital of France?", self.system_prompt, [], response)
+
+        # Act
+        similar = self.cache.lookup("Hey Dexter, what's the capital of France please", self.system_prompt, [])
+        exact = self.cache.lookup("What is the capital of France?", self.system_prompt, [])
+
+        # Assert
+        assert similar is None
+        assert exact == response
+
+    def test_different_numbers_miss(self):
+        """Test that prompts differing only in numbers do not match."""
+        # Arrange
+        self.cache.store("Convert 10 euros to dollars", self.system_prompt, [], "About 11 dollars")
+
+        # Act & Assert
+        assert self.cache.lookup("Convert 12 euros to dollars", self.system_prompt, []) is None
+
+    def test_system_prompt_change_misses(self):
+        """Test that the context hash includes the system prompt."""
+        # Arrange
+        self.cache.store("Capital of France?", self.system_prompt, [], "Paris")
+
+        # Act & Assert
+        assert self.cache.lookup("Capital of France?", "another system prompt", []) is None
+
+    def test_context_dependent_prompt_includes_history(self):
+        """Test that prompts referring to earlier turns are keyed on those turns."""
+        # Arrange
+        history_a = [{"role": "user", "content": "Tell me about Paris"}, {"role": "assistant", "content": "Paris is..."}]
+        history_b = [{"role": "user", "content": "Tell me about Rome"}, {"role": "assistant", "content": "Rome is..."}]
+        self.cache.store("How big is it?", self.system_prompt, history_a, "105 km2")
+
+        # Act & Assert
+        assert self.cache.lookup("How big is it?", self.system_prompt, history_a) == "105 km2"
+        assert self.cache.lookup("How big is it?", self.system_prompt, history_b) is None
+
+    def test_zero_ttl_intent_is_never_cached(self):
+        """Test that time-of-day prompts bypass the cache."""
+        # Arrange
+        self.cache.store("What time is it in Tokyo?", self.system_prompt, [], "10:00")
+
+        # Act
+        result = self.cache.lookup("What time is it in Tokyo?", self.system_prompt, [])
+
+        # Assert
+        assert result is None
+        assert self.cache.stats()["bypassed"] == 1
+        assert self.cache.stats()["entries"] == 0
+
+    @patch('dexter.core.response_cache.time')
+    def test_intent_ttl_expires(self, mock_time):
+        """Test that entries expire after their intent TTL."""
+        # Arrange
+        mock_time.time.return_value = 1000.0
+        self.cache.store("What's the weather in Madrid?", self.system_prompt, [], "Sunny")
+
+        # Act
+        mock_time.time.return_value = 1000.0 + 15 * 60 + 1
+
+        # Assert
+        assert self.cache.lookup("What's the weather in Madrid?", self.system_prompt, []) is None
+
+    def test_invalidate_intent(self):
+        """Test that invalidation only drops entries of the given intents."""
+        # Arrange
+        self.cache.store("Read my last report", self.system_prompt, [], "Report A")
+        self.cache.store("Capital of France?", self.system_prompt, [], "Paris")
+
+        # Act
+        dropped = self.cache.invalidate(["reports"])
+
+        # Assert
+        assert dropped == 1
+        assert self.cache.lookup("Read my last report", self.system_prompt, []) is None
+        assert self.cache.lookup("Capital of France?", self.system_prompt, []) == "Paris"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted past max_entries."""
+        # Arrange
+        for city in ["Paris", "Rome", "Berlin", "Lisbon"]:
+            self.cache.store(f"Tell me a fact about {city}", self.system_prompt, [], city)
+
+        # Act & Assert
+        assert self.cache.stats()["entries"] == 3
+        assert self.cache.lookup("Tell me a fact about Paris", self.system_prompt, []) is None
+
+    def test_hit_rate(self):
+        """Test the reported hit rate excludes bypassed lookups."""
+        # Arrange
+        self.cache.store("Capital of France?", self.system_prompt, [], "Paris")
+
+        # Act
+        self.cache.lookup("Capital of France?", self.system_prompt, [])
+        self.cache.lookup("Capital of Italy?", self.system_prompt, [])
+        self.cache.lookup("What time is it?", self.system_prompt, [])
+
+        # Assert
+        assert self.cache.stats()["hit_rate"] == 0.5
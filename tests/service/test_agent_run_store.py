@@ -0,0 +1,150 @@
+from unittest.mock import patch
+
+from dexter.service.agent_run_store import AgentRunStore
+
+
+class TestAgentRunStore:
+
+    def setup_method(self):
+        self.store = None
+
+    def make_store(self, tmp_path, **kwargs) -> AgentRunStore:
+        return AgentRunStore(path=tmp_path / "runs.sqlite3", **kwargs)
+
+    def test_create_update_and_get(self, tmp_path):
+        """Test that a run's status, timings and result are persisted."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        store.create("run-1", "report", "Make a report")
+
+        # Act
+        store.update("run-1", status="completed", started_at=1.0, finished_at=2.0, result="report.pdf")
+        run = store.get("run-1")
+
+        # Assert
+        assert run["status"] == "completed"
+        assert run["result_preview"] == "report.pdf"
+        assert run["result_size"] == len("report.pdf")
+        assert run["result_truncated"] is False
+        assert (run["started_at"], run["finished_at"]) == (1.0, 2.0)
+
+    def test_large_result_is_loaded_lazily(self, tmp_path):
+        """Test that lookups only read a preview and the full result is loaded on demand."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        store.create("run-1", "report", "Make a report")
+        store.update("run-1", status="completed", result="x" * 5000)
+
+        # Act
+        run = store.get("run-1", preview_chars=100)
+
+        # Assert
+        assert len(run["result_preview"]) == 100
+        assert run["result_truncated"] is True
+        assert store.get_result("run-1") == "x" * 5000
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that runs survive a restart."""
+        # Arrange
+        self.make_store(tmp_path).create("run-1", "youtube", "Find a video")
+
+        # Act
+        run = self.make_store(tmp_path).get("run-1")
+
+        # Assert
+        assert run["agent_type"] == "youtube"
+
+    def test_list_is_paginated_and_filtered(self, tmp_path):
+        """Test newest-first pagination with status filtering."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        with patch('dexter.service.agent_run_store.time') as mock_time:
+            for i in range(5):
+                mock_time.time.return_value = 1000.0 + i
+                store.create(f"run-{i}", "test", f"task {i}")
+        store.update("run-4", status="failed", error="boom")
+
+        # Act
+        page, total = store.list(offset=1, limit=2)
+        failed, failed_total = store.list(status="failed")
+
+        # Assert
+        assert total == 5
+        assert [run["run_id"] for run in page] == ["run-3", "run-2"]
+        assert "result" not in page[0]
+        assert failed_total == 1 and failed[0]["error"] == "boom"
+
+    def test_evicts_expired_and_overflow_finished_runs(self, tmp_path):
+        """Test TTL and size eviction only drop finished runs."""
+        # Arrange
+        store = self.make_store(tmp_path, ttl_seconds=100, max_runs=2)
+        with patch('dexter.service.agent_run_store.time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            store.create("old-finished", "test", "task")
+            store.create("old-running", "test", "task")
+            store.update("old-finished", status="completed")
+            mock_time.time.return_value = 1200.0
+            for i in range(3):
+                store.create(f"new-{i}", "test", "task")
+                store.update(f"new-{i}", status="completed")
+
+            # Act
+            store.evict()
+
+        # Assert
+        remaining = {run["run_id"] for run in store.list(limit=10)[0]}
+        assert remaining == {"old-running", "new-1", "new-2"}
+
+    def test_delete(self, tmp_path):
+        """Test deleting a run."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        store.create("run-1", "test", "task")
+
+        # Act & Assert
+        assert store.delete("run-1") is True
+        assert store.get("run-1") is None
+
+    def test_events_are_sequenced_per_run(self, tmp_path):
+        """Test that progress events are numbered per run and resumable from an offset."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        store.create("run-1", "test", "task")
+        store.create("run-2", "test", "task")
+
+        # Act
+        store.add_event("run-1", "status", {"status": "running"})
+        store.add_event("run-2", "status", {"status": "running"})
+        store.add_event("run-1", "step", {"step_number": 1, "tools": ["web_search"]})
+
+        # Assert
+        assert [event["seq"] for event in store.events_since("run-1")] == [1, 2]
+        resumed = store.events_since("run-1", offset=1)
+        assert resumed[0]["type"] == "step"
+        assert resumed[0]["data"]["tools"] == ["web_search"]
+        assert len(store.events_since("run-2")) == 1
+
+    def test_events_of_untracked_runs_are_not_stored(self, tmp_path):
+        """Test that events for runs the store does not know (assistant-launched agents) are dropped."""
+        # Arrange
+        store = self.make_store(tmp_path)
+
+        # Act
+        seq = store.add_event("assistant-run", "step", {"step_number": 1})
+
+        # Assert
+        assert seq is None
+        assert store.events_since("assistant-run") == []
+
+    def test_deleting_run_drops_its_events(self, tmp_path):
+        """Test that events go away with their run."""
+        # Arrange
+        store = self.make_store(tmp_path)
+        store.create("run-1", "test", "task")
+        store.add_event("run-1", "status", {"status": "running"})
+
+        # Act
+        store.delete("run-1")
+
+        # Assert
+        assert store.events_since("run-1") == []
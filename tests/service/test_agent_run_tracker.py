@@ -0,0 +1,86 @@
+import threading
+
+from dexter.agents.run_context import current_run
+from dexter.agents.scheduler import AgentScheduler
+from dexter.service.agent_run_store import AgentRunStore
+from dexter.service.agent_run_tracker import AgentRunTracker
+
+
+class TestAgentRunTracker:
+    """Test cases for callback-based agent run bookkeeping."""
+
+    def setup_method(self):
+        self.scheduler = AgentScheduler(max_workers=2, max_queue_depth=16, priorities={}, limits={})
+
+    def teardown_method(self):
+        self.scheduler.shutdown()
+
+    def make_tracker(self, tmp_path) -> AgentRunTracker:
+        return AgentRunTracker(AgentRunStore(path=tmp_path / "runs.sqlite3"))
+
+    def test_records_outcome_and_timings(self, tmp_path):
+        """Test that a finished run's outcome, timings and status events reach the store."""
+        # Arrange
+        tracker = self.make_tracker(tmp_path)
+        future = self.scheduler.submit(lambda: "done", agent_type="test")
+
+        # Act
+        tracker.track(future, "test", "task")
+        future.result(timeout=5)
+        self.scheduler.shutdown()
+
+        # Assert
+        run = tracker.store.get(future.run_id)
+        assert run["status"] == "completed"
+        assert run["result_preview"] == "done"
+        assert run["started_at"] <= run["finished_at"]
+        statuses = [event["data"]["status"] for event in tracker.store.events_since(future.run_id)]
+        assert statuses == ["queued", "running", "completed"]
+        assert tracker.get(future.run_id) is None
+        assert tracker.stats()["agents"]["test"]["run_time"]["samples"] == 1
+
+    def test_records_failures_and_cancellations(self, tmp_path):
+        """Test that failed and cancelled runs are recorded with their outcome."""
+        # Arrange
+        tracker = self.make_tracker(tmp_path)
+        release = threading.Event()
+
+        def failing_run():
+            raise ValueError("boom")
+
+        def cancellable_run():
+            release.wait(timeout=5)
+            current_run().token.raise_if_cancelled()
+
+        failed = self.scheduler.submit(failing_run, agent_type="test")
+        cancelled = self.scheduler.submit(cancellable_run, agent_type="test")
+        tracker.track(failed, "test", "task")
+        tracker.track(cancelled, "test", "task")
+
+        # Act
+        self.scheduler.cancel(cancelled)
+        release.set()
+        self.scheduler.shutdown()
+
+        # Assert
+        assert tracker.store.get(failed.run_id)["error"] == "boom"
+        assert tracker.store.get(cancelled.run_id)["status"] == "cancelled"
+        stats = tracker.stats()
+        assert (stats["failed"], stats["cancelled"], stats["active"]) == (1, 1, 0)
+
+    def test_thread_count_stays_flat(self, tmp_path):
+        """Test that tracking many queued runs does not start a thread per run."""
+        # Arrange
+        tracker = self.make_tracker(tmp_path)
+        release = threading.Event()
+        futures = [self.scheduler.submit(release.wait, 5, agent_type="test") for _ in range(10)]
+        baseline = threading.active_count()
+
+        # Act
+        for future in futures:
+            tracker.track(future, "test", "task")
+
+        # Assert
+        assert threading.active_count() == baseline
+        assert tracker.stats()["active"] == 10
+        release.set()
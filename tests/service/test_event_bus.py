@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from dexter.service.event_bus import EventBus
+
+
+class TestEventBus:
+
+    def test_publish_assigns_increasing_ids(self):
+        """Test that published events are numbered and buffered."""
+        # Arrange
+        bus = EventBus(replay_size=10)
+
+        # Act
+        first = bus.publish("agent_result", {"response": "one"})
+        second = bus.publish("agent_result", {"response": "two"})
+
+        # Assert
+        assert (first["id"], second["id"]) == (1, 2)
+        assert [e["data"]["response"] for e in bus.events_since(1)] == ["two"]
+
+    def test_replay_buffer_is_bounded(self):
+        """Test that only the last replay_size events are kept."""
+        # Arrange
+        bus = EventBus(replay_size=2)
+
+        # Act
+        for i in range(3):
+            bus.publish("agent_result", {"n": i})
+
+        # Assert
+        assert [e["data"]["n"] for e in bus.events_since(0)] == [1, 2]
+
+    def test_subscribe_replays_missed_then_receives_live_events(self):
+        """Test that a subscriber gets events after its last id, then events published from another thread."""
+        # Arrange
+        bus = EventBus(replay_size=10)
+        bus.publish("agent_result", {"n": 0})
+        bus.publish("agent_result", {"n": 1})
+
+        async def collect():
+            received = []
+            async for event in bus.subscribe(last_event_id=1, heartbeat=5):
+                received.append(event["data"]["n"])
+                if len(received) == 1:
+                    threading.Thread(target=bus.publish, args=("agent_result", {"n": 2})).start()
+                if len(received) == 2:
+                    break
+            return received
+
+        # Act
+        received = asyncio.run(collect())
+
+        # Assert
+        assert received == [1, 2]
+        assert bus.subscriber_count == 0
+
+    def test_subscribe_yields_heartbeat_when_idle(self):
+        """Test that an idle subscription yields None at the heartbeat interval."""
+        # Arrange
+        bus = EventBus(replay_size=10)
+
+        async def first_item():
+            async for event in bus.subscribe(heartbeat=0.01):
+                return event
+
+        # Act & Assert
+        assert asyncio.run(first_item()) is None
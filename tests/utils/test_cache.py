@@ -0,0 +1,140 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from dexter.utils.cache import SingleFlight, SQLiteCache, TTLCache
+
+
+class TestTTLCache:
+    """Test cases for the in-memory TTL cache."""
+
+    def test_get_returns_value_until_expired(self):
+        # Arrange
+        cache = TTLCache(max_entries=4, default_ttl=10)
+        with patch('dexter.utils.cache.time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            cache.set("key", "value")
+
+            # Act
+            fresh = cache.get("key")
+            mock_time.time.return_value = 1011.0
+            expired = cache.get("key")
+
+        # Assert
+        assert fresh == "value"
+        assert expired is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        # Arrange
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3)
+
+        # Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_zero_ttl_is_not_stored(self):
+        # Arrange
+        cache = TTLCache()
+
+        # Act
+        cache.set("key", "value", ttl=0)
+
+        # Assert
+        assert len(cache) == 0
+
+
+class TestSQLiteCache:
+    """Test cases for the persistent SQLite cache tier."""
+
+    def test_entries_are_shared_between_instances_until_expired(self, tmp_path):
+        # Arrange
+        writer = SQLiteCache(tmp_path / "cache.sqlite3")
+        reader = SQLiteCache(tmp_path / "cache.sqlite3")
+        with patch('dexter.utils.cache.time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            writer.set("key", "value", ttl=10)
+
+            # Act
+            fresh = reader.get("key")
+            mock_time.time.return_value = 1011.0
+            expired = reader.get("key")
+            purged = reader.purge()
+
+        # Assert
+        assert fresh == ("value", 1010.0)
+        assert expired is None
+        assert purged == 1
+
+    def test_expired_entries_are_purged_on_write(self, tmp_path):
+        # Arrange
+        cache = SQLiteCache(tmp_path / "cache.sqlite3", purge_every=2)
+        with patch('dexter.utils.cache.time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            cache.set("old", "value", ttl=10)
+            mock_time.time.return_value = 1011.0
+
+            # Act
+            cache.set("new", "value", ttl=10)
+
+        # Assert
+        with cache._connect() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM cache")]
+        assert keys == ["new"]
+
+
+class TestSingleFlight:
+    """Test cases for deduplication of concurrent identical calls."""
+
+    def test_concurrent_callers_share_one_call(self):
+        # Arrange
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+
+        # Act
+        follower.start()
+        while flight.shared == 0:
+            pass
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        # Assert
+        assert results == ["result", "result"]
+        assert len(calls) == 1
+        assert flight.shared == 1
+
+    def test_errors_are_not_remembered(self):
+        # Arrange
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        # Act
+        with pytest.raises(ValueError):
+            flight.do("key", fail)
+        result = flight.do("key", lambda: "ok")
+
+        # Assert
+        assert result == "ok"
@@ -0,0 +1,48 @@
+from dexter.utils.page_store import PageStore, content_hash
+
+
+class TestPageStore:
+    """Test cases for the content-addressed page store."""
+
+    def test_put_and_lookup(self, tmp_path):
+        # Arrange
+        store = PageStore(tmp_path, max_bytes=10_000)
+
+        # Act
+        digest = store.put("https://example.com", b"<p>Hello</p>", "Hello", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        entry = store.lookup("https://example.com")
+
+        # Assert
+        assert digest == content_hash(b"<p>Hello</p>")
+        assert entry.content_hash == digest
+        assert entry.etag == '"v1"'
+        assert store.markdown(digest) == "Hello"
+
+    def test_identical_content_is_stored_once(self, tmp_path):
+        # Arrange
+        store = PageStore(tmp_path, max_bytes=10_000)
+
+        # Act
+        store.put("https://example.com/a", b"<p>Same</p>", "Same")
+        store.put("https://example.com/b", b"<p>Same</p>", "Same")
+
+        # Assert
+        stats = store.stats()
+        assert stats["pages"] == 2
+        assert stats["contents"] == 1
+
+    def test_least_recently_used_pages_are_evicted_over_budget(self, tmp_path):
+        # Arrange
+        store = PageStore(tmp_path, max_bytes=250)
+        old = store.put("https://example.com/old", b"o" * 100, "old")
+        store.put("https://example.com/recent", b"r" * 100, "recent")
+        store.lookup("https://example.com/old")
+
+        # Act
+        store.put("https://example.com/new", b"n" * 100, "new")
+
+        # Assert
+        assert store.lookup("https://example.com/recent") is None
+        assert store.lookup("https://example.com/old") is not None
+        assert store.markdown(old) == "old"
+        assert store.stats()["bytes"] <= 250
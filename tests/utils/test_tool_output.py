@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from dexter.utils.tool_output import (
+    chunk_text,
+    compact_output,
+    estimate_tokens,
+    rank_chunks,
+    strip_boilerplate,
+    tool_budget,
+    tool_outputs,
+)
+
+
+class TestStripBoilerplate:
+    """Test cases for page chrome removal."""
+
+    def test_navigation_and_footer_lines_are_removed(self):
+        # Arrange
+        page = "\n".join([
+            "* [Home](/) [News](/news) [Sport](/sport)",
+            "![logo](/logo.png)",
+            "# Solar panels in winter",
+            "Solar output drops in winter because the days are shorter.",
+            "Accept all cookies",
+            "© 2024 Example. All rights reserved.",
+        ])
+
+        # Act
+        result = strip_boilerplate(page)
+
+        # Assert
+        assert result == "# Solar panels in winter\nSolar output drops in winter because the days are shorter."
+
+
+class TestCompactOutput:
+    """Test cases for token-budgeted tool outputs."""
+
+    def test_short_output_is_unchanged(self):
+        # Act & Assert
+        assert compact_output("short", "query", budget=100) == "short"
+
+    def test_long_output_keeps_relevant_chunks_and_reference(self):
+        # Arrange
+        filler = ["Unrelated paragraph about gardening and tomatoes. " * 8 for _ in range(20)]
+        text = "\n\n".join(["Intro paragraph."] + filler[:10] + ["Battery storage capacity is measured in kilowatt hours."] + filler[10:])
+
+        # Act
+        with patch('dexter.utils.tool_output.settings.TOOL_OUTPUT_CHUNK_TOKENS', 120):
+            result = compact_output(text, "battery capacity", budget=300)
+
+        # Assert
+        assert "Intro paragraph." in result
+        assert "Battery storage capacity" in result
+        assert estimate_tokens(result) < estimate_tokens(text) / 3
+        ref = result.split("read_tool_output('")[1].split("'")[0]
+        assert tool_outputs.read(ref).startswith("Intro paragraph.")
+
+    def test_stripped_output_keeps_reference(self):
+        # Arrange
+        text = "\n".join(["Accept all cookies"] * 40 + ["Solar output drops in winter."])
+
+        # Act
+        result = compact_output(text, "solar", budget=50, strip=True)
+
+        # Assert
+        assert result.startswith("Solar output drops in winter.")
+        ref = result.split("read_tool_output('")[1].split("'")[0]
+        assert tool_outputs.read(ref) == text
+
+    def test_rank_chunks_prefers_matching_terms(self):
+        # Arrange
+        chunks = ["cats and dogs", "python asyncio event loop", "weather today"]
+
+        # Act & Assert
+        assert rank_chunks(chunks, "How does the asyncio loop work?")[0] == 1
+
+    def test_chunk_text_respects_size(self):
+        # Act
+        chunks = chunk_text("a" * 50 + "\n\n" + "b" * 50 + "\n\n" + "c" * 250, 100)
+
+        # Assert
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert "".join(chunks).replace("\n", "") == "a" * 50 + "b" * 50 + "c" * 250
+
+    def test_tool_budget_sums_called_tools(self):
+        # Arrange
+        with patch('dexter.utils.tool_output.settings.TOOL_OUTPUT_TOKEN_BUDGETS', {"visit_webpage": 2000, "web_search": 800}):
+            # Act & Assert
+            assert tool_budget("print(visit_webpage('https://a'))\nprint(web_search('b'))") == 2800
+            assert tool_budget("print(1 + 1)") > 0